@@ -0,0 +1,69 @@
+"""
+Benchmark - Subprocess AWS CLI calls vs the pooled in-process boto3 client
+
+Compares sequential describe-route-tables latency for 1, 10 and 100 calls
+against a local moto server. When the AWS CLI is not installed, a one-shot
+`python -c "import boto3 ..."` process stands in for it, which has the same
+fork + interpreter start-up cost the CLI pays on every call.
+
+Usage (from backend/):
+    python -m benchmarks.bench_aws_clients
+"""
+
+import shutil
+import subprocess
+import sys
+
+import boto3
+
+from benchmarks.common import BENCH_REGION, moto_server, print_table, time_calls
+from services.aws_clients import AWSClientPool
+from services.aws_service import AWSService
+from utils.moto_vpc import create_test_vpc
+
+CALL_COUNTS = [1, 10, 100]
+
+def _subprocess_command(endpoint_url: str, vpc_id: str) -> list:
+    if shutil.which("aws"):
+        return [
+            "aws", "ec2", "describe-route-tables",
+            "--filters", f"Name=vpc-id,Values={vpc_id}",
+            "--query", "RouteTables[].RouteTableId",
+            "--region", BENCH_REGION,
+            "--endpoint-url", endpoint_url,
+            "--output", "json"
+        ]
+    code = (
+        "import boto3;"
+        f"boto3.client('ec2', region_name='{BENCH_REGION}', endpoint_url='{endpoint_url}')"
+        f".describe_route_tables(Filters=[{{'Name': 'vpc-id', 'Values': ['{vpc_id}']}}])"
+    )
+    return [sys.executable, "-c", code]
+
+def run() -> list:
+    rows = []
+    with moto_server() as endpoint_url:
+        ec2 = boto3.client("ec2", region_name=BENCH_REGION, endpoint_url=endpoint_url)
+        vpc_id = create_test_vpc(ec2)["vpc_id"]
+
+        command = _subprocess_command(endpoint_url, vpc_id)
+        mode = "subprocess (aws cli)" if command[0] == "aws" else "subprocess (python one-shot)"
+
+        pool = AWSClientPool(endpoint_url=endpoint_url)
+        service = AWSService(pool=pool)
+        # Warm the pool so the in-process numbers show steady-state cost
+        service.describe_route_tables(vpc_id, BENCH_REGION)
+
+        for count in CALL_COUNTS:
+            result = time_calls(
+                lambda: subprocess.run(command, check=True, capture_output=True, text=True),
+                count
+            )
+            rows.append({"mode": mode, **result})
+
+            result = time_calls(lambda: service.describe_route_tables(vpc_id, BENCH_REGION), count)
+            rows.append({"mode": "in-process (pooled boto3)", **result})
+    return rows
+
+if __name__ == "__main__":
+    print_table("describe-route-tables: subprocess vs in-process", run())
@@ -0,0 +1,120 @@
+"""
+Benchmark - /health latency while endpoint creations run concurrently
+
+Starts the real app under uvicorn (one event loop) against a local moto
+server, probes /health sequentially while 20 /api/execute/native requests
+run at once, and reports the probe latency percentiles. The "inline" mode
+calls the blocking AWS work directly on the event loop, as the handlers did
+before it was offloaded, for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.bench_event_loop
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import boto3
+import httpx
+import uvicorn
+
+from benchmarks.common import BENCH_REGION, free_port, moto_server, print_table
+from utils.moto_vpc import create_test_vpc
+
+CONCURRENT_EXECUTIONS = 20
+SERVICES = ["sqs", "ecr.api"]
+IDLE_PROBES = 200
+PROBE_INTERVAL_SECONDS = 0.01
+
+async def _inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "probes": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 2),
+        "max_ms": round(ordered[-1], 2)
+    }
+
+def _probe(client: httpx.Client, stop: threading.Event, limit: int = 0) -> List[float]:
+    """GET /health back to back until stopped (or `limit` probes), returning latencies in ms"""
+    samples = []
+    while not stop.is_set() and (not limit or len(samples) < limit):
+        start = time.perf_counter()
+        client.get("/health").raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(PROBE_INTERVAL_SECONDS)
+    return samples
+
+def _run_mode(base_url: str, bodies: List[dict]) -> Dict[str, object]:
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        idle = _probe(client, threading.Event(), limit=IDLE_PROBES)
+
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(bodies) + 1) as pool:
+            probes = pool.submit(_probe, client, stop)
+            start = time.perf_counter()
+            responses = list(pool.map(lambda body: client.post("/api/execute/native", json=body), bodies))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            loaded = probes.result()
+
+    failed = sum(1 for r in responses if r.status_code != 200)
+    return {"idle": _percentiles(idle), "loaded": _percentiles(loaded), "elapsed": elapsed, "failed": failed}
+
+def run() -> list:
+    rows = []
+    with moto_server() as endpoint_url:
+        from config import settings
+        settings.AWS_ENDPOINT_URL = endpoint_url
+        from services.aws_clients import client_pool
+        client_pool.endpoint_url = endpoint_url
+        from main import app
+        from routes import endpoints
+
+        ec2 = boto3.client("ec2", region_name=BENCH_REGION, endpoint_url=endpoint_url)
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        offloaded = endpoints.run_blocking
+        try:
+            for mode, runner in [("inline (blocking)", _inline), ("offloaded", offloaded)]:
+                endpoints.run_blocking = runner
+                # A fresh VPC per execution so every run creates its endpoints
+                bodies = []
+                for _ in range(CONCURRENT_EXECUTIONS):
+                    vpc = create_test_vpc(ec2)
+                    bodies.append({
+                        "endpoint_type": "Interface",
+                        "region": BENCH_REGION,
+                        "vpc_id": vpc["vpc_id"],
+                        "service_names": [f"com.amazonaws.{BENCH_REGION}.{s}" for s in SERVICES],
+                        "subnets": vpc["subnets"],
+                        "security_groups": vpc["security_groups"]
+                    })
+                result = _run_mode(f"http://127.0.0.1:{port}", bodies)
+                for phase in ("idle", "loaded"):
+                    rows.append({
+                        "mode": mode,
+                        "phase": phase if phase == "idle" else f"{CONCURRENT_EXECUTIONS} executions",
+                        **result[phase],
+                        "executions_s": round(result["elapsed"], 2) if phase == "loaded" else "",
+                        "failed": result["failed"] if phase == "loaded" else ""
+                    })
+        finally:
+            endpoints.run_blocking = offloaded
+            server.should_exit = True
+            thread.join()
+    return rows
+
+if __name__ == "__main__":
+    print_table("/health latency during concurrent native executions", run())
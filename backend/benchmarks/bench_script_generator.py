@@ -0,0 +1,47 @@
+"""
+Benchmark - PowerShell script generation for 1, 50 and 500 services
+
+Reports generation latency and the size of the generated script, which
+should grow by roughly one line per service.
+
+Usage (from backend/):
+    python -m benchmarks.bench_script_generator
+"""
+
+from benchmarks.common import print_table, time_calls
+from services.script_generator import ScriptGenerator
+
+SERVICE_COUNTS = [1, 50, 500]
+REPEAT = 50
+
+def _service_names(count: int) -> list:
+    return [f"com.amazonaws.us-east-1.service{i}" for i in range(count)]
+
+def run() -> list:
+    generator = ScriptGenerator()
+    rows = []
+    for count in SERVICE_COUNTS:
+        names = _service_names(count)
+
+        def generate():
+            return generator.generate_script(
+                endpoint_type="Interface",
+                region="us-east-1",
+                vpc_id="vpc-0123456789abcdef0",
+                service_names=names,
+                tag_prefix="bench",
+                subnets=["subnet-0123456789abcdef0", "subnet-0123456789abcdef1"],
+                security_groups=["sg-0123456789abcdef0"]
+            )
+
+        ps1_content, _ = generate()
+        rows.append({
+            "services": count,
+            **time_calls(generate, REPEAT),
+            "script_bytes": len(ps1_content),
+            "script_lines": ps1_content.count("\n")
+        })
+    return rows
+
+if __name__ == "__main__":
+    print_table(f"ScriptGenerator.generate_script ({REPEAT} runs each)", run())
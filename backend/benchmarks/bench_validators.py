@@ -0,0 +1,89 @@
+"""
+Benchmark - Resource ID validation for 10,000 IDs
+
+Compares the original per-call validators (re.match with an uncompiled
+pattern per ID, region lookup in a list) against the compiled per-call
+functions and the batch validate_endpoint_ids.
+
+Usage (from backend/):
+    python -m benchmarks.bench_validators
+"""
+
+import re
+
+from benchmarks.common import print_table, time_calls
+from utils.validators import (
+    VALID_REGIONS,
+    validate_endpoint_ids,
+    validate_region,
+    validate_route_table_id,
+    validate_sg_id,
+    validate_subnet_id
+)
+
+ID_COUNT = 10_000
+REPEAT = 20
+
+def _ids(prefix: str, count: int) -> list:
+    return [f"{prefix}-{i:017x}" for i in range(count)]
+
+def _legacy_validate(subnets: list, security_groups: list, route_tables: list, regions: list) -> list:
+    """The per-call checks as they were before the batch validator"""
+    errors = []
+    for subnet in subnets:
+        if not bool(re.match(r"^subnet-[0-9a-f]{8,17}$", subnet)):
+            errors.append(f"Invalid subnet ID format: {subnet}")
+    for sg in security_groups:
+        if not bool(re.match(r"^sg-[0-9a-f]{8,17}$", sg)):
+            errors.append(f"Invalid security group ID format: {sg}")
+    for rt in route_tables:
+        if not bool(re.match(r"^rtb-[0-9a-f]{8,17}$", rt)):
+            errors.append(f"Invalid route table ID format: {rt}")
+    for region in regions:
+        if region not in VALID_REGIONS:
+            errors.append(f"Unsupported region: {region}")
+    return errors
+
+def _compiled_validate(subnets: list, security_groups: list, route_tables: list, regions: list) -> list:
+    """The same loop over the compiled per-call functions"""
+    errors = []
+    errors.extend(f"Invalid subnet ID format: {s}" for s in subnets if not validate_subnet_id(s))
+    errors.extend(f"Invalid security group ID format: {g}" for g in security_groups if not validate_sg_id(g))
+    errors.extend(f"Invalid route table ID format: {r}" for r in route_tables if not validate_route_table_id(r))
+    errors.extend(f"Unsupported region: {r}" for r in regions if not validate_region(r))
+    return errors
+
+def _batch_validate(subnets: list, security_groups: list, route_tables: list, regions: list) -> dict:
+    """Batch validator; also reports duplicates, which the per-call loops cannot"""
+    errors = validate_endpoint_ids(
+        None, subnets=subnets, security_groups=security_groups, route_tables=route_tables
+    )
+    bad_regions = [r for r in regions if not validate_region(r)]
+    if bad_regions:
+        errors["region"] = [f"Unsupported region: {r}" for r in bad_regions]
+    return errors
+
+def run() -> list:
+    # 10,000 IDs in total, split across the three ID fields, plus one region per ID
+    per_field = ID_COUNT // 4
+    subnets = _ids("subnet", per_field)
+    security_groups = _ids("sg", per_field)
+    route_tables = _ids("rtb", per_field)
+    regions = [VALID_REGIONS[i % len(VALID_REGIONS)] for i in range(per_field)]
+    args = (subnets, security_groups, route_tables, regions)
+
+    # The same lists with one malformed ID per field, forcing the per-ID fallback
+    invalid_args = (subnets + ["subnet-XYZ"], security_groups + ["sg-1"], route_tables + ["rtb-"], regions)
+
+    rows = []
+    for case, case_args in (("all valid", args), ("one bad ID per field", invalid_args)):
+        for name, func in (
+            ("legacy re.match", _legacy_validate),
+            ("compiled per-call", _compiled_validate),
+            ("batch", _batch_validate)
+        ):
+            rows.append({"case": case, "validator": name, **time_calls(lambda: func(*case_args), REPEAT)})
+    return rows
+
+if __name__ == "__main__":
+    print_table(f"Validating {ID_COUNT} IDs ({REPEAT} runs each)", run())
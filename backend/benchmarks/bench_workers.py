@@ -0,0 +1,120 @@
+"""
+Benchmark - /api/generate requests per second with 1 worker vs N workers
+
+Starts server.py as a subprocess with WORKERS=1 and WORKERS=N (default: the
+CPU count, at least 2) and drives /api/generate from several client
+processes for a fixed duration. Request bodies cycle through a set of
+distinct requests so each worker renders as well as serves cached scripts.
+/api/generate makes no AWS calls, so no moto server is needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_workers [N]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import BENCH_REGION, free_port, print_table
+
+DURATION_SECONDS = 10
+CLIENT_PROCESSES = 4
+THREADS_PER_CLIENT = 8
+DISTINCT_REQUESTS = 64
+SERVICES = ["ec2", "ecr.api", "ecr.dkr", "logs", "sqs", "sns", "sts", "ssm", "kms", "secretsmanager"]
+
+def _bodies() -> List[dict]:
+    return [
+        {
+            "endpoint_type": "Interface",
+            "region": BENCH_REGION,
+            "vpc_id": "vpc-0123456789abcdef0",
+            "service_names": [f"com.amazonaws.{BENCH_REGION}.{s}" for s in SERVICES],
+            "subnets": ["subnet-0123456789abcdef0", "subnet-0123456789abcdef1"],
+            "security_groups": ["sg-0123456789abcdef0"],
+            "tag_prefix": f"bench{i}-"
+        }
+        for i in range(DISTINCT_REQUESTS)
+    ]
+
+def _client(base_url: str, deadline: float) -> Dict[str, object]:
+    """One client process: THREADS_PER_CLIENT keep-alive connections posting until the deadline"""
+    bodies = _bodies()
+
+    def loop(offset: int) -> List[float]:
+        samples = []
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            i = offset
+            while time.time() < deadline:
+                start = time.perf_counter()
+                response = client.post("/api/generate", json=bodies[i % len(bodies)])
+                if response.status_code == 200:
+                    samples.append((time.perf_counter() - start) * 1000)
+                i += 1
+        return samples
+
+    with ThreadPoolExecutor(max_workers=THREADS_PER_CLIENT) as pool:
+        results = list(pool.map(loop, range(0, THREADS_PER_CLIENT * 7, 7)))
+    return {"latencies": [s for samples in results for s in samples]}
+
+def _start_server(workers: int, port: int, state_dir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WORKERS": str(workers),
+        "API_HOST": "127.0.0.1",
+        "API_PORT": str(port),
+        "DEBUG": "False",
+        "HISTORY_DB_PATH": os.path.join(state_dir, "history.sqlite3"),
+        "SHARED_STATE_PATH": os.path.join(state_dir, "state.sqlite3")
+    }
+    process = subprocess.Popen(
+        [sys.executable, "server.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                # Give the remaining workers a moment to come up too
+                time.sleep(1 if workers > 1 else 0)
+                return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server.py with {workers} workers did not start")
+
+def run(worker_counts: List[int]) -> list:
+    rows = []
+    for workers in worker_counts:
+        port = free_port()
+        with tempfile.TemporaryDirectory() as state_dir:
+            process = _start_server(workers, port, state_dir)
+            try:
+                deadline = time.time() + DURATION_SECONDS
+                with ProcessPoolExecutor(max_workers=CLIENT_PROCESSES) as pool:
+                    futures = [
+                        pool.submit(_client, f"http://127.0.0.1:{port}", deadline)
+                        for _ in range(CLIENT_PROCESSES)
+                    ]
+                    latencies = sorted(s for f in futures for s in f.result()["latencies"])
+            finally:
+                process.terminate()
+                process.wait(timeout=60)
+        rows.append({
+            "workers": workers,
+            "requests": len(latencies),
+            "req_per_s": round(len(latencies) / DURATION_SECONDS, 1),
+            "p50_ms": round(statistics.median(latencies), 2) if latencies else "",
+            "p99_ms": round(latencies[int(len(latencies) * 0.99)], 2) if latencies else ""
+        })
+    return rows
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else max(2, os.cpu_count() or 1)
+    print_table(f"/api/generate throughput ({os.cpu_count()} CPUs)", run([1, n]))
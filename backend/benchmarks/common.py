@@ -0,0 +1,89 @@
+"""
+Benchmark helpers - Local moto server and timing utilities
+
+Benchmarks are run from the backend directory, e.g.:
+    python -m benchmarks.bench_aws_clients
+and need the packages in requirements-dev.txt.
+"""
+
+import logging
+import os
+import socket
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+BENCH_REGION = "us-east-1"
+
+def free_port() -> int:
+    """An unused localhost TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@contextmanager
+def moto_server() -> Iterator[str]:
+    """
+    Start a local moto server and point boto3 at it
+
+    Yields:
+        The endpoint URL of the running server
+    """
+    from moto.server import ThreadedMotoServer
+
+    # The embedded werkzeug server logs every request
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{port}"
+
+    # Dummy credentials so nothing ever reaches a real account
+    os.environ.update({
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": BENCH_REGION,
+        "AWS_ENDPOINT_URL": endpoint_url
+    })
+    try:
+        yield endpoint_url
+    finally:
+        server.stop()
+
+def time_calls(func: Callable[[], object], count: int) -> Dict[str, float]:
+    """
+    Run func `count` times sequentially and summarise the latencies
+
+    Returns:
+        Dictionary with total, mean, p50, p95 and max in milliseconds
+    """
+    samples: List[float] = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Total, mean, p50, p95 and max of latency samples in milliseconds"""
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "total_ms": round(sum(ordered), 2),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+def print_table(title: str, rows: List[Dict[str, object]]) -> None:
+    """Print benchmark rows as an aligned text table"""
+    print(f"\n{title}")
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    widths = {h: max(len(h), *(len(str(r[h])) for r in rows)) for h in headers}
+    print("  ".join(h.ljust(widths[h]) for h in headers))
+    for row in rows:
+        print("  ".join(str(row[h]).ljust(widths[h]) for h in headers))
@@ -0,0 +1,348 @@
+"""
+Benchmark suite - Reproducible scenarios with JSON results and baseline comparison
+
+Runs every scenario at each of its sizes (services per request, or VPCs per
+call) and prints one table per scenario. The API scenarios go through an
+in-process ASGI client, so no server or network is involved; the AWS
+scenarios run against a local moto server.
+
+    generate_ps1              ScriptGenerator PowerShell rendering, 1-500 services
+    api_generate              POST /api/generate, new body every call (plan and script caches miss)
+    api_generate_cached       POST /api/generate, same body every call (cache hits)
+    api_validate              POST /api/validate, 1-500 services
+    api_validate_availability POST /api/validate?check_availability=true (catalog + describe-subnets)
+    aws_describe_endpoints    AWSService.describe_vpc_endpoints across 1-100 VPCs
+    native_create             POST /api/execute/native, 1-50 services
+    batch                     POST /api/batch, 1-100 VPCs with 2 services each
+
+--output writes the results as JSON. --baseline compares p50 latencies with
+an earlier JSON file and exits with status 1 when any scenario is more than
+--threshold slower (and at least --min-delta-ms slower, to ignore noise on
+sub-millisecond scenarios).
+
+Usage (from backend/):
+    python -m benchmarks.run
+    python -m benchmarks.run --quick --output before.json
+    python -m benchmarks.run --baseline before.json --output after.json
+    python -m benchmarks.run --scenario api_generate --scenario batch
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import boto3
+import httpx
+
+from benchmarks.common import BENCH_REGION, moto_server, print_table, summarize, time_calls
+from utils.moto_vpc import create_test_vpc
+
+VPC_ID = "vpc-0123456789abcdef0"
+SUBNETS = ["subnet-0123456789abcdef0", "subnet-0123456789abcdef1"]
+SECURITY_GROUPS = ["sg-0123456789abcdef0"]
+
+class Scenario(NamedTuple):
+    name: str
+    sizes: List[int]
+    repeat: int
+    run: Callable[["Context", int, int], Dict[str, Any]]
+    aws: bool = False
+
+class Context:
+    """State shared by scenarios: the app client, and the moto VPCs and catalog once started"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client: Optional[httpx.AsyncClient] = None
+        self.ec2 = None
+        self.interface_services: List[str] = []
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        if self.client is None:
+            from main import app
+            self.client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600
+            )
+            # First requests pay for imports and lazy setup; keep that out of every scenario
+            self.loop.run_until_complete(self.client.post("/api/generate", json=_body(_service_names(1), "warmup-")))
+        return self.loop.run_until_complete(self.client.request(method, url, **kwargs))
+
+    def time_requests(self, make_request: Callable[[int], httpx.Response], count: int) -> Dict[str, Any]:
+        """Like time_calls, but every response must be a 2xx"""
+        samples = []
+        for i in range(count):
+            start = time.perf_counter()
+            response = make_request(i)
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 300:
+                raise RuntimeError(f"{response.request.url} returned {response.status_code}: {response.text[:500]}")
+        return summarize(samples)
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.loop.run_until_complete(self.client.aclose())
+        self.loop.close()
+
+def _service_names(count: int) -> List[str]:
+    return [f"com.amazonaws.{BENCH_REGION}.service{i}" for i in range(count)]
+
+def _body(service_names: List[str], tag_prefix: str = "bench-", **overrides: Any) -> Dict[str, Any]:
+    return {
+        "endpoint_type": "Interface",
+        "region": BENCH_REGION,
+        "vpc_id": VPC_ID,
+        "service_names": service_names,
+        "subnets": SUBNETS,
+        "security_groups": SECURITY_GROUPS,
+        "tag_prefix": tag_prefix,
+        **overrides
+    }
+
+# In-process scenarios
+def _generate_ps1(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    from services.script_generator import ScriptGenerator
+    generator = ScriptGenerator()
+    names = _service_names(size)
+
+    def generate():
+        return generator.generate_script(
+            endpoint_type="Interface",
+            region=BENCH_REGION,
+            vpc_id=VPC_ID,
+            service_names=names,
+            tag_prefix="bench",
+            subnets=SUBNETS,
+            security_groups=SECURITY_GROUPS
+        )
+
+    content, _ = generate()
+    return {**time_calls(generate, repeat), "script_bytes": len(content)}
+
+def _api_generate(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    names = _service_names(size)
+    # A distinct tag prefix per call defeats the plan and script caches
+    run_id = time.time_ns()
+    return ctx.time_requests(
+        lambda i: ctx.request("POST", "/api/generate", json=_body(names, f"b{run_id}-{i}-")), repeat
+    )
+
+def _api_generate_cached(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    body = _body(_service_names(size))
+    ctx.request("POST", "/api/generate", json=body)
+    return ctx.time_requests(lambda i: ctx.request("POST", "/api/generate", json=body), repeat)
+
+def _api_validate(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    names = _service_names(size)
+    run_id = time.time_ns()
+    return ctx.time_requests(
+        lambda i: ctx.request("POST", "/api/validate", json=_body(names, f"v{run_id}-{i}-")), repeat
+    )
+
+# moto scenarios
+def _fresh_vpcs(ctx: Context, count: int) -> List[Dict[str, Any]]:
+    return [create_test_vpc(ctx.ec2) for _ in range(count)]
+
+def _api_validate_availability(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    vpc = _fresh_vpcs(ctx, 1)[0]
+    body = _body(
+        ctx.interface_services[:size], vpc_id=vpc["vpc_id"], subnets=vpc["subnets"],
+        security_groups=vpc["security_groups"]
+    )
+    return ctx.time_requests(
+        lambda i: ctx.request("POST", "/api/validate?check_availability=true", json=body), repeat
+    )
+
+def _aws_describe_endpoints(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    from services.aws_service import AWSService
+    vpcs = _fresh_vpcs(ctx, size)
+    for vpc in vpcs:
+        ctx.ec2.create_vpc_endpoint(
+            VpcId=vpc["vpc_id"],
+            VpcEndpointType="Interface",
+            ServiceName=ctx.interface_services[0],
+            SubnetIds=vpc["subnets"][:1],
+            SecurityGroupIds=vpc["security_groups"]
+        )
+    vpc_ids = [vpc["vpc_id"] for vpc in vpcs]
+    aws_service = AWSService()
+    return {
+        **time_calls(lambda: aws_service.describe_vpc_endpoints(vpc_ids, BENCH_REGION), repeat),
+        "endpoints": len(aws_service.describe_vpc_endpoints(vpc_ids, BENCH_REGION))
+    }
+
+def _native_create(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    vpcs = _fresh_vpcs(ctx, repeat)
+    bodies = [
+        _body(
+            ctx.interface_services[:size], vpc_id=vpc["vpc_id"], subnets=vpc["subnets"],
+            security_groups=vpc["security_groups"]
+        )
+        for vpc in vpcs
+    ]
+    return ctx.time_requests(lambda i: ctx.request("POST", "/api/execute/native", json=bodies[i]), repeat)
+
+def _batch(ctx: Context, size: int, repeat: int) -> Dict[str, Any]:
+    summaries = []
+
+    def provision(i: int) -> httpx.Response:
+        targets = [
+            _body(
+                ctx.interface_services[:2], vpc_id=vpc["vpc_id"], subnets=vpc["subnets"],
+                security_groups=vpc["security_groups"]
+            )
+            for vpc in batches[i]
+        ]
+        response = ctx.request("POST", "/api/batch", json={"targets": targets})
+        summaries.append(json.loads(response.text.strip().splitlines()[-1]))
+        return response
+
+    batches = [_fresh_vpcs(ctx, size) for _ in range(repeat)]
+    result = ctx.time_requests(provision, repeat)
+    failed = sum(summary["endpoints_failed"] for summary in summaries)
+    if failed:
+        raise RuntimeError(f"{failed} endpoints failed in the batch scenario")
+    return {**result, "endpoints_per_minute": summaries[-1]["endpoints_per_minute"]}
+
+SCENARIOS = [
+    Scenario("generate_ps1", [1, 10, 100, 500], 50, _generate_ps1),
+    Scenario("api_generate", [1, 10, 100, 500], 20, _api_generate),
+    Scenario("api_generate_cached", [1, 100, 500], 50, _api_generate_cached),
+    Scenario("api_validate", [1, 10, 100, 500], 20, _api_validate),
+    Scenario("api_validate_availability", [1, 10, 50], 10, _api_validate_availability, aws=True),
+    Scenario("aws_describe_endpoints", [1, 10, 100], 10, _aws_describe_endpoints, aws=True),
+    Scenario("native_create", [1, 10, 50], 3, _native_create, aws=True),
+    Scenario("batch", [1, 10, 100], 1, _batch, aws=True),
+]
+
+def _start_moto(ctx: Context, endpoint_url: str) -> None:
+    from config import settings
+    from services.aws_clients import client_pool
+    from services.aws_service import AWSService
+    from services.creation_scheduler import rate_limiters
+    settings.AWS_ENDPOINT_URL = endpoint_url
+    client_pool.endpoint_url = endpoint_url
+    # Measure the code rather than EC2_MUTATE_RATE_PER_SECOND, and don't let one
+    # scenario's spent burst slow down the next
+    rate_limiters.rate = rate_limiters.burst = 100_000
+    rate_limiters._buckets.clear()
+    ctx.ec2 = boto3.client("ec2", region_name=BENCH_REGION, endpoint_url=endpoint_url)
+    catalog = AWSService().describe_vpc_endpoint_services(BENCH_REGION)
+    ctx.interface_services = sorted(
+        service["ServiceName"] for service in catalog
+        if any(t.get("ServiceType") == "Interface" for t in service.get("ServiceType", []))
+    )
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+def run(names: Optional[List[str]] = None, quick: bool = False) -> Dict[str, Any]:
+    """
+    Run the selected scenarios (all by default)
+
+    Args:
+        names: Scenario names to run
+        quick: Only the two smallest sizes, with at most 5 repeats
+
+    Returns:
+        {"environment": {...}, "results": [{"scenario", "size", "calls", "p50_ms", ...}]}
+    """
+    scenarios = [s for s in SCENARIOS if not names or s.name in names]
+    from services.history_store import history_store
+    # Keep the disk out of the measurements and the history database out of the tree
+    history_store.enabled = False
+
+    ctx = Context()
+    results = []
+
+    def run_scenario(scenario: Scenario) -> None:
+        sizes = scenario.sizes[:2] if quick else scenario.sizes
+        repeat = min(scenario.repeat, 5) if quick else scenario.repeat
+        # Untimed pass at the smallest size: first calls pay for lazy clients, catalogs and imports
+        scenario.run(ctx, sizes[0], 1)
+        for size in sizes:
+            results.append({"scenario": scenario.name, "size": size, **scenario.run(ctx, size, repeat)})
+            print(f"  {scenario.name} size={size}: p50 {results[-1]['p50_ms']} ms", file=sys.stderr)
+
+    try:
+        for scenario in [s for s in scenarios if not s.aws]:
+            run_scenario(scenario)
+        aws_scenarios = [s for s in scenarios if s.aws]
+        if aws_scenarios:
+            with moto_server() as endpoint_url:
+                _start_moto(ctx, endpoint_url)
+                for scenario in aws_scenarios:
+                    run_scenario(scenario)
+    finally:
+        ctx.close()
+    return {"environment": _environment(), "results": results}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """p50 change per (scenario, size) present in both runs; "regressed" marks the ones over threshold"""
+    before = {(r["scenario"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = before.get((result["scenario"], result["size"]))
+        if old is None:
+            continue
+        delta = result["p50_ms"] - old["p50_ms"]
+        ratio = result["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+        rows.append({
+            "scenario": result["scenario"],
+            "size": result["size"],
+            "baseline_p50_ms": old["p50_ms"],
+            "p50_ms": result["p50_ms"],
+            "change": f"{(ratio - 1) * 100:+.1f}%",
+            "regressed": ratio > 1 + threshold and delta >= min_delta_ms
+        })
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS],
+                        help="Run only this scenario (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Two smallest sizes, at most 5 repeats")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p50 slowdown (default 0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    current = run(args.scenario, args.quick)
+    for name in dict.fromkeys(r["scenario"] for r in current["results"]):
+        print_table(name, [{k: v for k, v in r.items() if k != "scenario"} for r in current["results"] if r["scenario"] == name])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.threshold, args.min_delta_ms)
+        print_table(f"Compared with {args.baseline} ({baseline['environment'].get('commit')})", rows)
+        regressions = [row for row in rows if row["regressed"]]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@ Configuration settings for the backend application
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -16,6 +16,13 @@ class Settings(BaseSettings):
     API_HOST: str = "127.0.0.1"
     API_PORT: int = 8000
     
+    # Production server (server.py)
+    WORKERS: int = 1  # Worker processes; above 1, sessions and jobs live in the shared state store
+    KEEP_ALIVE_SECONDS: int = 5
+    BACKLOG: int = 2048
+    GRACEFUL_SHUTDOWN_SECONDS: int = 90  # Wait for in-flight requests and running jobs on shutdown
+    SHARED_STATE_PATH: Optional[str] = None  # Defaults to /dev/shm/vpc-endpoint-generator/state.sqlite3; must be memory-backed
+    
     # CORS settings
     CORS_ORIGINS: List[str] = [
         "http://localhost:5173",
@@ -25,6 +32,97 @@ class Settings(BaseSettings):
     
     # AWS settings
     AWS_REGION: str = "ap-southeast-1"
+    AWS_PROFILE: str = "default"
+    
+    # AWS client pool settings
+    AWS_MAX_POOL_CONNECTIONS: int = 10
+    AWS_RETRY_MODE: str = "adaptive"  # legacy, standard or adaptive
+    AWS_MAX_ATTEMPTS: int = 5  # Read calls only; mutating calls are retried by CreationScheduler
+    AWS_ENDPOINT_URL: Optional[str] = None  # Override for local stand-ins such as moto
+    
+    # Credential sessions (/api/configure); credentials stay in memory per session
+    SESSION_TTL_SECONDS: int = 43200
+    SESSION_IDLE_TIMEOUT_SECONDS: int = 3600
+    SESSION_TEMPORARY_TTL_SECONDS: int = 3600  # Cap for credentials with a session token
+    SESSION_TOKEN_KEY: Optional[str] = None  # Fernet key sealing credentials into session IDs when WORKERS > 1
+    AWS_WRITE_SHARED_PROFILE: bool = False  # Also write credentials to the shared ~/.aws profile
+    
+    # VPC topology cache (route tables, endpoint services, ...)
+    TOPOLOGY_CACHE_TTL_SECONDS: int = 300
+    TOPOLOGY_CACHE_MAX_ENTRIES: int = 1024
+    CACHE_SYNC_INTERVAL_SECONDS: float = 1.0  # How soon other workers apply an invalidation when WORKERS > 1
+    
+    # Service catalog (/api/services) snapshot settings
+    SERVICE_CATALOG_DIR: str = ".cache/service_catalog"
+    SERVICE_CATALOG_TTL_SECONDS: int = 86400
+    SERVICE_CATALOG_MAX_REGIONS: int = 64  # Regions kept in memory per account
+    
+    # Validated request plans, cached by content hash
+    REQUEST_PLAN_CACHE_SIZE: int = 512
+    REQUEST_PLAN_TTL_SECONDS: int = 600
+    SCRIPT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # Generated scripts kept for re-download and /execute by script_id
+    
+    # Endpoint creation scheduler settings
+    CREATE_MAX_WORKERS: int = 8
+    EC2_MUTATE_RATE_PER_SECOND: float = 5.0  # Token refill rate per account and region
+    EC2_MUTATE_BURST: int = 50
+    CREATE_MAX_RETRIES: int = 5
+    CREATE_RETRY_BASE_DELAY: float = 0.5  # Seconds
+    CREATE_RETRY_MAX_DELAY: float = 20.0  # Seconds
+    
+    # Batch/fleet settings
+    BATCH_REGION_CONCURRENCY: int = 4  # Targets provisioned at once per region
+    BATCH_MAX_TARGETS: int = 500
+    
+    # Run estimates (/api/plan); latencies are used until enough calls have been observed
+    PLAN_READ_LATENCY_SECONDS: float = 0.3  # Per describe call
+    PLAN_CREATE_LATENCY_SECONDS: float = 1.0  # Per CreateVpcEndpoint call
+    PLAN_INTERFACE_ENDPOINT_HOUR_USD: float = 0.01  # Price per Interface endpoint per AZ-hour
+    
+    # Bulk delete/modify/retag settings
+    LIFECYCLE_DELETE_BATCH_SIZE: int = 25  # Endpoint IDs per DeleteVpcEndpoints call
+    LIFECYCLE_TAG_BATCH_SIZE: int = 500  # Resources per CreateTags/DeleteTags call (API maximum 1000)
+    LIFECYCLE_MAX_ENDPOINTS: int = 5000  # Endpoints one bulk request may select
+    
+    # Endpoint state tracking (wait_until_available); one batched describe poller per process
+    STATE_POLL_MIN_INTERVAL_SECONDS: float = 2.0  # Interval while states are changing
+    STATE_POLL_MAX_INTERVAL_SECONDS: float = 15.0  # Backed off to while nothing changes
+    STATE_POLL_BACKOFF: float = 1.5
+    STATE_WAIT_TIMEOUT_SECONDS: int = 600  # Default wait_timeout_seconds
+    STATE_WAIT_MAX_TIMEOUT_SECONDS: int = 1800
+    
+    # Script execution settings
+    POWERSHELL_EXECUTABLE: Optional[str] = None  # Default: pwsh when on the PATH, else powershell.exe
+    POWERSHELL_POOL_SIZE: int = 0  # Warm PowerShell hosts reused across runs; 0 starts a process per script
+    POWERSHELL_HOST_MAX_RUNS: int = 100  # Scripts a warm host runs before it is replaced
+    EXECUTION_TIMEOUT_SECONDS: int = 60
+    STREAM_EXECUTION_TIMEOUT_SECONDS: int = 900
+    STREAM_BUFFER_LINES: int = 1000  # Lines held between the script and a slow client
+    STREAM_MAX_LINE_CHARS: int = 4000
+    
+    # Provisioning history (SQLite, WAL mode, written in batches by a background thread)
+    HISTORY_ENABLED: bool = True
+    HISTORY_DB_PATH: str = ".cache/history.sqlite3"
+    HISTORY_BATCH_SIZE: int = 500
+    HISTORY_FLUSH_INTERVAL_SECONDS: float = 0.2
+    HISTORY_QUEUE_MAX: int = 10000  # Rows waiting to be written; beyond this they are dropped
+    HISTORY_MAX_OUTPUT_CHARS: int = 100000  # Tail of each execution's output that is kept
+    HISTORY_PAGE_MAX: int = 500
+    
+    # Prometheus /metrics (per-stage spans, AWS call latency, throttles and retries)
+    METRICS_ENABLED: bool = True
+    METRICS_PUBLISH_SECONDS: float = 5.0  # How often each worker shares its metrics when WORKERS > 1
+    
+    # Worker threads for blocking calls made from request handlers and streams
+    BLOCKING_MAX_THREADS: int = 40
+    
+    # Background job settings
+    JOB_MAX_WORKERS: int = 4
+    JOB_MAX_PENDING: int = 100  # Queued + running jobs before new submissions are rejected
+    JOB_MAX_COMPLETED: int = 200  # Finished jobs kept for status/result polling (LRU)
+    JOB_RESULT_TTL_SECONDS: int = 3600
+    JOB_CANCEL_POLL_SECONDS: float = 0.5  # How often workers check for cancels sent to another worker
+    JOB_HEARTBEAT_TIMEOUT_SECONDS: float = 15.0  # Unfinished jobs of a worker silent this long are reported failed
     
     class Config:
         env_file = ".env"
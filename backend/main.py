@@ -3,9 +3,19 @@ AWS VPC Endpoint Generator - FastAPI Backend
 Main entry point for the application
 """
 
-from fastapi import FastAPI
+import os
+
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from routes import endpoints
+from config import settings
+from services.cache_sync import invalidation_bus
+from services.history_store import history_store
+from services.job_manager import job_manager
+from services.shared_state import shared_state
+from utils.metrics import MetricsMiddleware, collect, metrics, start_publisher
+from utils.offload import configure_thread_pool, run_blocking
+from utils.powershell_executor import host_pool
 import uvicorn
 
 # Initialize FastAPI app
@@ -30,6 +40,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latency per route for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routes
 app.include_router(endpoints.router, prefix="/api", tags=["endpoints"])
 
@@ -42,10 +55,49 @@ async def root():
         "docs": "/docs"
     }
 
+# Size the thread pool that blocking AWS/SQLite calls are offloaded to
+@app.on_event("startup")
+async def size_thread_pool():
+    configure_thread_pool()
+
+# Share this worker's metrics so /metrics on any worker covers all of them
+@app.on_event("startup")
+async def publish_metrics():
+    if metrics.enabled and shared_state is not None:
+        start_publisher(shared_state, str(os.getpid()))
+
+# Apply cache invalidations made through other workers
+@app.on_event("startup")
+async def sync_caches():
+    invalidation_bus.start()
+
+# Let running jobs finish (they record history), then write out queued history rows
+@app.on_event("shutdown")
+async def drain_jobs():
+    await run_blocking(job_manager.drain, settings.GRACEFUL_SHUTDOWN_SECONDS)
+
+# Write out queued history rows before the process exits
+@app.on_event("shutdown")
+async def flush_history():
+    history_store.close()
+
+# Stop idle warm PowerShell hosts
+@app.on_event("shutdown")
+async def close_powershell_hosts():
+    host_pool.close()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def metrics_endpoint():
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body = await run_blocking(collect, shared_state, str(os.getpid()))
+    return Response(content=body, media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
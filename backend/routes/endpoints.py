@@ -2,13 +2,38 @@
 API Endpoints for VPC Endpoint management
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from services.aws_service import AWSService
-from services.script_generator import ScriptGenerator
-from utils.validators import validate_vpc_id, validate_subnet_id, validate_sg_id, validate_route_table_id
+from typing import Any, Callable, Deque, Dict, Generator, List, Optional, Tuple, Union
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from services.aws_service import AWSService, topology_cache
+from services.cache_sync import invalidation_bus
+from services.request_plan import RequestPlan, get_request_plan, plan_cache_stats
+from services.script_cache import CachedScript, script_cache
+from services.history_store import history_store, parse_script_header, parse_script_output
+from services.credential_sessions import CredentialSession, session_registry
+from services.endpoint_creator import EndpointCreator
+from services.endpoint_planner import CREATE, EndpointPlanner, summarize
+from services.endpoint_lifecycle import EndpointLifecycle
+from services.service_catalog import ServiceCatalog
+from services.az_preflight import AZPreflight
+from services.creation_scheduler import CreationScheduler
+from services.batch_runner import BatchRunner
+from services.run_estimator import RunEstimator
+from services.state_tracker import is_settled, state_tracker
+from utils.offload import run_blocking
+from utils.timing import StageTimer
+from utils.validators import validate_lifecycle_ids, validate_targets
 from utils.powershell_executor import PowerShellExecutor
+from services.job_manager import job_manager, JobQueueFull, FINISHED_STATES
 
 router = APIRouter()
 
@@ -33,23 +58,96 @@ class EndpointRequest(BaseModel):
     private_dns_enabled: Optional[bool] = True  # For Interface
     route_tables: Optional[List[str]] = None  # For Gateway
     select_all_route_tables: Optional[bool] = False  # For Gateway
+    max_workers: Optional[int] = None  # Native execution concurrency (capped by CREATE_MAX_WORKERS)
+    format: Optional[str] = "powershell"  # /generate output: powershell, bash, python, cloudformation, terraform
+    skip_existing: Optional[bool] = True  # Skip services that already have an endpoint in the VPC
+    wait_until_available: Optional[bool] = False  # Native execution: return once endpoints leave "pending"
+    wait_timeout_seconds: Optional[int] = None  # Defaults to STATE_WAIT_TIMEOUT_SECONDS
+
+class BatchRequest(BaseModel):
+    targets: List[EndpointRequest]  # One entry per (region, VPC)
+    region_concurrency: Optional[int] = None  # Targets at once per region (capped by BATCH_REGION_CONCURRENCY)
+
+class EndpointSelection(BaseModel):
+    region: str
+    endpoint_ids: Optional[List[str]] = None  # Explicit endpoints; otherwise every endpoint in vpc_id/vpc_ids
+    vpc_id: Optional[str] = None  # As in EndpointRequest, so a create request selects what it created
+    vpc_ids: Optional[List[str]] = None  # Fleet-wide selection
+    service_names: Optional[List[str]] = None  # Full or region-less names; omit for every service
+    endpoint_type: Optional[str] = None  # "Interface" or "Gateway"; omit for both
+
+class BulkModifyRequest(EndpointSelection):
+    subnets: Optional[List[str]] = None  # Added to Interface endpoints
+    remove_subnets: Optional[List[str]] = None
+    security_groups: Optional[List[str]] = None  # Added to Interface endpoints
+    remove_security_groups: Optional[List[str]] = None
+    route_tables: Optional[List[str]] = None  # Added to Gateway endpoints
+    remove_route_tables: Optional[List[str]] = None
+    private_dns_enabled: Optional[bool] = None  # Interface endpoints; omit to leave unchanged
+
+class BulkTagRequest(EndpointSelection):
+    tags: Optional[Dict[str, str]] = None  # Set on every selected endpoint
+    remove_tags: Optional[List[str]] = None  # Tag keys to remove
+    tag_prefix: Optional[str] = None  # With tag_suffix, rebuilds each Name tag the way new endpoints are named
+    tag_suffix: Optional[str] = None
+
+class CacheInvalidateRequest(BaseModel):
+    region: Optional[str] = None  # Omit region and vpc_id to clear everything
+    vpc_id: Optional[str] = None
 
 class ExecuteScriptRequest(BaseModel):
-    ps1_content: str
-    script_name: Optional[str] = "vpc-endpoint-script.ps1"
+    ps1_content: Optional[str] = None
+    script_id: Optional[str] = None  # A PowerShell script_id from /generate, instead of ps1_content
+    wait_until_available: Optional[bool] = False  # Wait for the endpoints the script created
+    wait_timeout_seconds: Optional[int] = None  # Defaults to STATE_WAIT_TIMEOUT_SECONDS
 
 # Response models
 class ScriptGeneratedResponse(BaseModel):
     success: bool
-    ps1_content: str
+    ps1_content: Optional[str] = None  # Only set for the powershell format
+    content: str
+    format: str
+    file_name: str
     file_path: Optional[str] = None
     command: str
+    script_id: Optional[str] = None  # Content address; GET /scripts/{script_id} or /execute by ID
+
+# Credential sessions
+def _session(x_session_id: Optional[str] = Header(None)) -> Optional[CredentialSession]:
+    """
+    The caller's credential session from the X-Session-Id header (None without the header)
+    
+    Raises:
+        HTTPException(401) when the session is unknown or expired
+    """
+    if not x_session_id:
+        return None
+    session = session_registry.get(x_session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=401,
+            detail="AWS session expired or unknown. Please configure your AWS credentials again."
+        )
+    return session
+
+def _aws_service(session: Optional[CredentialSession] = Depends(_session)) -> AWSService:
+    """AWSService for the caller's session; the server's default credential chain without one"""
+    return AWSService(profile=session.profile) if session else AWSService()
+
+def _script_env(session: Optional[CredentialSession]) -> Optional[Dict[str, str]]:
+    """Environment for PowerShell runs, so the AWS CLI uses the session's credentials"""
+    return session.environment() if session else None
 
 # AWS Configuration endpoint
 @router.post("/configure")
-async def configure_aws(request: AWSConfigRequest):
+async def configure_aws(request: AWSConfigRequest, x_session_id: Optional[str] = Header(None)):
     """
-    Configure AWS CLI with provided credentials
+    Register AWS credentials and return a session ID for the X-Session-Id header
+    
+    Credentials stay in memory; each session gets its own pooled clients,
+    so concurrent users never see each other's credentials. Sending a live
+    X-Session-Id replaces that session's credentials. The shared AWS CLI
+    profile is only written when AWS_WRITE_SHARED_PROFILE is enabled.
     """
     # Validate required fields
     if not request.access_key or not request.access_key.strip():
@@ -62,159 +160,204 @@ async def configure_aws(request: AWSConfigRequest):
         raise HTTPException(status_code=400, detail="Region is required")
     
     try:
-        aws_service = AWSService()
-        result = aws_service.configure_credentials(
+        session = await run_blocking(
+            session_registry.create,
             access_key=request.access_key,
             secret_key=request.secret_key,
             region=request.region,
-            output_format=request.output_format,
-            session_token=request.session_token
+            session_token=request.session_token,
+            session_id=x_session_id
         )
-        return {"success": True, "message": "AWS CLI configured successfully", "details": result}
+        result = {
+            "status": "success",
+            "region": session.region,
+            "expires_at": session.expires_at,
+            "message": "AWS credentials configured successfully"
+        }
+        if settings.AWS_WRITE_SHARED_PROFILE:
+            result["profile"] = await run_blocking(
+                AWSService().configure_credentials,
+                access_key=request.access_key,
+                secret_key=request.secret_key,
+                region=request.region,
+                output_format=request.output_format,
+                session_token=request.session_token
+            )
+        return {
+            "success": True,
+            "message": "AWS credentials configured successfully",
+            "session_id": session.session_id,
+            "details": result
+        }
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"AWS configuration failed: {str(e)}")
 
+@router.delete("/configure")
+async def end_session(x_session_id: str = Header(...)):
+    """
+    Forget a credential session and its cached clients
+    """
+    if not session_registry.delete(x_session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"success": True}
+
 # Validate inputs
 @router.post("/validate")
-async def validate_inputs(request: EndpointRequest):
+async def validate_inputs(
+    request: EndpointRequest,
+    response: Response,
+    check_availability: bool = False,
+    aws_service: AWSService = Depends(_aws_service)
+):
     """
     Validate all user inputs before script generation
+    
+    The validated request is cached by content hash, so a following
+    /generate or native execution with the same body skips validation.
+    With check_availability=true, also checks every service against the
+    region's catalog and resolves the subnets to AZs (one describe-subnets
+    call), returning per-service usable subnets or an exact error for each.
     """
+    timer = StageTimer()
     try:
-        errors = []
-        
-        # Validate common fields
-        if not validate_vpc_id(request.vpc_id):
-            errors.append(f"Invalid VPC ID format: {request.vpc_id}")
-        
-        # Validate Interface-specific fields
-        if request.endpoint_type.lower() == "interface":
-            if not request.subnets:
-                errors.append("At least one subnet is required for Interface endpoints")
-            else:
-                for subnet in request.subnets:
-                    if not validate_subnet_id(subnet):
-                        errors.append(f"Invalid subnet ID format: {subnet}")
-            
-            if not request.security_groups:
-                errors.append("At least one security group is required for Interface endpoints")
-            else:
-                for sg in request.security_groups:
-                    if not validate_sg_id(sg):
-                        errors.append(f"Invalid security group ID format: {sg}")
+        plan = get_request_plan(request.model_dump(), timer)
+        if not plan.valid:
+            raise HTTPException(
+                status_code=422,
+                detail={"errors": list(plan.errors), "field_errors": plan.field_errors},
+                headers=timer.headers()
+            )
         
-        # Validate Gateway-specific fields
-        elif request.endpoint_type.lower() == "gateway":
-            if not request.route_tables and not request.select_all_route_tables:
-                errors.append("At least one route table is required for Gateway endpoints")
-            elif request.route_tables:
-                for rt in request.route_tables:
-                    if not validate_route_table_id(rt):
-                        errors.append(f"Invalid route table ID format: {rt}")
+        if not check_availability:
+            response.headers.update(timer.headers())
+            return {"success": True, "message": "All inputs are valid"}
         
-        if errors:
-            raise HTTPException(status_code=422, detail={"errors": errors})
+        with timer.stage("preflight"):
+            report = await run_blocking(
+                AZPreflight(aws_service).check,
+                request.region, request.vpc_id, request.endpoint_type, list(plan.service_names), request.subnets
+            )
+        if report["errors"]:
+            raise HTTPException(
+                status_code=422,
+                detail={"errors": report["errors"], "availability": report},
+                headers=timer.headers()
+            )
         
-        return {"success": True, "message": "All inputs are valid"}
+        response.headers.update(timer.headers())
+        return {"success": True, "message": "All inputs are valid", "availability": report}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
 
-# Generate PowerShell script
-@router.post("/generate", response_model=ScriptGeneratedResponse)
-async def generate_script(request: EndpointRequest):
+# Shared validation for endpoint requests
+def _request_plan(request: EndpointRequest, timer: Optional[StageTimer] = None) -> RequestPlan:
     """
-    Generate PowerShell script for VPC Endpoint creation
-    """
-    # Validate required fields
-    validation_errors = []
-    
-    if not request.endpoint_type or request.endpoint_type.strip() == "":
-        validation_errors.append("endpoint_type is required")
-    elif request.endpoint_type not in ["Interface", "Gateway"]:
-        validation_errors.append("endpoint_type must be 'Interface' or 'Gateway'")
-    
-    if not request.region or request.region.strip() == "":
-        validation_errors.append("region is required")
-    
-    if not request.vpc_id or request.vpc_id.strip() == "":
-        validation_errors.append("vpc_id is required")
+    Validate an EndpointRequest once and return its plan (cached by content hash)
     
-    # Support both service_names (new) and service_name (legacy)
-    service_names = request.service_names or (([request.service_name] if request.service_name else []))
-    if not service_names or len(service_names) == 0:
-        validation_errors.append("service_name(s) is required")
+    Returns:
+        The RequestPlan, whose service_names are the services to process
     
-    # Tag prefix and suffix are optional - allow empty strings
-    tag_prefix = request.tag_prefix or ""
-    tag_suffix = request.tag_suffix or ""
+    Raises:
+        HTTPException(422) listing every validation error
+    """
+    timer = timer or StageTimer()
+    plan = get_request_plan(request.model_dump(), timer)
+    if not plan.valid:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "validation_errors": list(plan.errors),
+                "message": "Request validation failed"
+            },
+            headers=timer.headers()
+        )
+    return plan
+
+# Catalog and AZ pre-flight for requests that write to AWS
+def _preflight(
+    request: EndpointRequest,
+    service_names: List[str],
+    aws_service: Optional[AWSService] = None
+) -> Optional[Dict[str, List[str]]]:
+    """
+    Reject services and subnets that would make a create call fail, before any writes
     
-    # Validate endpoint-specific requirements
-    if request.endpoint_type == "Interface":
-        if not request.subnets or len(request.subnets) == 0:
-            validation_errors.append("subnets are required for Interface endpoints")
-        if not request.security_groups or len(request.security_groups) == 0:
-            validation_errors.append("security_groups are required for Interface endpoints")
+    When the catalog or subnets cannot be looked up the check is skipped and
+    the creation call reports the problem instead.
     
-    if request.endpoint_type == "Gateway":
-        if not request.route_tables or len(request.route_tables) == 0:
-            if not request.select_all_route_tables:
-                validation_errors.append("route_tables are required for Gateway endpoints or select_all_route_tables must be true")
+    Returns:
+        Per-service subnet lists for services not offered in every chosen
+        subnet's AZ (None when nothing needs trimming)
     
-    if validation_errors:
+    Raises:
+        HTTPException(422) listing every problem found
+    """
+    preflight = AZPreflight(aws_service)
+    try:
+        report = preflight.check(
+            request.region, request.vpc_id, request.endpoint_type, service_names, request.subnets
+        )
+    except Exception:
+        return None
+    if report["errors"]:
         raise HTTPException(
             status_code=422,
             detail={
-                "validation_errors": validation_errors,
+                "validation_errors": report["errors"],
                 "message": "Request validation failed"
             }
         )
+    return preflight.subnets_by_service(report) or None
+
+# Generate script or template
+@router.post("/generate", response_model=ScriptGeneratedResponse)
+async def generate_script(request: EndpointRequest, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Generate a script or template for VPC Endpoint creation in the requested format
+    
+    Scripts are cached by a hash of the normalized request and format; the
+    response carries that script_id and an ETag, and a matching
+    If-None-Match gets 304 without rendering. Stage durations (plan,
+    render) are reported in the Server-Timing header.
+    """
+    timer = StageTimer()
+    plan = _request_plan(request, timer)
+    output_format = (request.format or "powershell").lower()
+    
+    etag = f'"{plan.script_id(output_format)}"'
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, **timer.headers()})
     
     try:
-        generator = ScriptGenerator()
-        
-        # Support both single and multiple services
-        service_names_to_process = service_names if service_names else []
-        
-        # Generate scripts for all services
-        all_ps1_content = """# AWS VPC Endpoint Generation Script
-# Created by AWS VPC Endpoint Generator
-# This script will create multiple VPC endpoints
-
-$ErrorActionPreference = "Stop"
-
-"""
-        
-        # Generate a script section for each service
-        all_commands = []
-        for service_name in service_names_to_process:
-            ps1_content, command = generator.generate_ps1(
-                endpoint_type=request.endpoint_type,
-                region=request.region,
-                vpc_id=request.vpc_id,
-                service_name=service_name,
-                tag_prefix=tag_prefix,
-                tag_suffix=tag_suffix,
-                subnets=request.subnets,
-                security_groups=request.security_groups,
-                private_dns_enabled=request.private_dns_enabled,
-                route_tables=request.route_tables,
-                select_all_route_tables=request.select_all_route_tables
-            )
-            
-            # Extract just the try-catch block from the generated script
-            # Skip the header, add to combined script  
-            lines = ps1_content.split('\n')
-            script_body = '\n'.join([l for l in lines if l.strip() and not l.startswith('#')])
-            all_ps1_content += f"\n# Service: {service_name}\n{script_body}\n"
-            all_commands.append(command)
+        # One script for all services: shared skeleton plus one row per service
+        with timer.stage("render"):
+            script = await run_blocking(plan.render, output_format)
+        content, all_commands = script.content, script.commands
+        history_store.record_generation(
+            region=request.region,
+            vpc_id=request.vpc_id,
+            endpoint_type=request.endpoint_type,
+            output_format=output_format,
+            script_id=script.script_id,
+            file_name=script.file_name,
+            content=content,
+            service_count=len(plan.service_names)
+        )
+        response.headers.update({"ETag": script.etag, **timer.headers()})
         
         # Combine all commands as comments
         combined_command = " && ".join(all_commands) if all_commands else ""
         
         return ScriptGeneratedResponse(
             success=True,
-            ps1_content=all_ps1_content,
-            command=combined_command
+            ps1_content=content if output_format == "powershell" else None,
+            content=content,
+            format=output_format,
+            file_name=script.file_name,
+            command=combined_command,
+            script_id=script.script_id
         )
     except Exception as e:
         error_msg = str(e)
@@ -237,28 +380,61 @@ $ErrorActionPreference = "Stop"
         else:
             raise HTTPException(status_code=400, detail=f"Script generation failed: {error_msg}")
 
+# Fetch a generated script by ID
+@router.get("/scripts/{script_id}")
+async def get_script(script_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Return a previously generated script from the cache or the history store
+    
+    The ETag is the script ID, so a matching If-None-Match gets 304.
+    """
+    script = await run_blocking(_cached_script, script_id)
+    if script is None:
+        raise HTTPException(status_code=404, detail=f"Script not found: {script_id}")
+    if if_none_match and script.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": script.etag})
+    return Response(
+        content=script.content,
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "ETag": script.etag,
+            "Content-Disposition": f'attachment; filename="{script.file_name}"'
+        }
+    )
+
+def _cached_script(script_id: str) -> Optional[CachedScript]:
+    """A generated script from memory, falling back to the history store after eviction or a restart"""
+    script = script_cache.get(script_id)
+    if script is None:
+        stored = history_store.get_script(script_id) if history_store.enabled else None
+        if stored is not None:
+            script = CachedScript(
+                script_id=stored["script_id"],
+                format=stored["format"],
+                file_name=stored["file_name"] or "",
+                content=stored["content"],
+                commands=[]
+            )
+    return script
+
 # Execute PowerShell script
 @router.post("/execute")
-async def execute_script(request: ExecuteScriptRequest):
+async def execute_script(request: ExecuteScriptRequest, session: Optional[CredentialSession] = Depends(_session)):
     """
     Execute generated PowerShell script
     """
-    # Validate request
-    if not request.ps1_content or request.ps1_content.strip() == "":
-        raise HTTPException(
-            status_code=422,
-            detail={
-                "validation_errors": ["ps1_content is required and cannot be empty"],
-                "message": "Request validation failed"
-            }
-        )
+    ps1_content = await run_blocking(_script_content, request)
+    wait_timeout = _wait_timeout(request)
     
     try:
-        executor = PowerShellExecutor()
-        output, error, exit_code = executor.execute(
-            ps1_content=request.ps1_content,
-            script_name=request.script_name
+        # Run on the job pool so the event loop stays free while the script runs
+        job = await run_blocking(
+            _submit_job,
+            "script",
+            _script_job(ps1_content, request.script_id, session, wait_timeout)
         )
+        result = await asyncio.wrap_future(job.future)
+        output, error, exit_code = result["output"], result["error"], result["exit_code"]
         
         if exit_code != 0:
             raise HTTPException(
@@ -277,6 +453,7 @@ async def execute_script(request: ExecuteScriptRequest):
             "output": output,
             "error": error if error else None,
             "exit_code": exit_code,
+            **{key: result[key] for key in ("wait", "endpoints") if key in result},
             "message": "Script executed successfully"
         }
     except HTTPException:
@@ -295,3 +472,1020 @@ async def execute_script(request: ExecuteScriptRequest):
                 "message": "Script execution failed with an unexpected error"
             }
         )
+
+def _creation_kwargs(
+    request: EndpointRequest,
+    service_names: List[str],
+    subnets_by_service: Optional[Dict[str, List[str]]] = None
+) -> Dict[str, Any]:
+    """Map a validated request (and its pre-flight subnet sets) onto EndpointCreator arguments"""
+    return dict(
+        endpoint_type=request.endpoint_type,
+        region=request.region,
+        vpc_id=request.vpc_id,
+        service_names=service_names,
+        tag_prefix=request.tag_prefix or "",
+        tag_suffix=request.tag_suffix or "",
+        subnets=request.subnets,
+        subnets_by_service=subnets_by_service,
+        security_groups=request.security_groups,
+        private_dns_enabled=request.private_dns_enabled,
+        route_tables=request.route_tables,
+        select_all_route_tables=request.select_all_route_tables,
+        skip_existing=bool(request.skip_existing)
+    )
+
+def _create_endpoints(
+    request: EndpointRequest,
+    service_names: List[str],
+    existing: Optional[Dict[tuple, Dict[str, Any]]] = None,
+    subnets_by_service: Optional[Dict[str, List[str]]] = None,
+    aws_service: Optional[AWSService] = None
+) -> Dict[str, Any]:
+    """Run the native creation engine for one validated request"""
+    creator = EndpointCreator(aws_service, scheduler=CreationScheduler(max_workers=request.max_workers))
+    run = creator.create_endpoints(
+        **_creation_kwargs(request, service_names, subnets_by_service),
+        existing=existing
+    )
+    history_store.record_native(request.region, request.vpc_id, request.endpoint_type, run["results"])
+    return run
+
+def _count_results(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count created, skipped (already existing) and failed endpoints"""
+    created = sum(1 for r in results if r["success"] and r["action"] == CREATE)
+    failed = sum(1 for r in results if not r["success"])
+    return {"created": created, "skipped": len(results) - created - failed, "failed": failed}
+
+# Waiting for endpoints to become available
+def _wait_timeout(request: Any) -> Optional[float]:
+    """
+    Seconds to wait for endpoints to settle, or None when the request does not wait
+    
+    Raises:
+        HTTPException(422) when wait_timeout_seconds is out of range
+    """
+    if not request.wait_until_available:
+        return None
+    timeout = request.wait_timeout_seconds
+    if timeout is None:
+        timeout = settings.STATE_WAIT_TIMEOUT_SECONDS
+    if not 0 < timeout <= settings.STATE_WAIT_MAX_TIMEOUT_SECONDS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "validation_errors": [f"wait_timeout_seconds must be between 1 and {settings.STATE_WAIT_MAX_TIMEOUT_SECONDS}"],
+                "message": "Request validation failed"
+            }
+        )
+    return float(timeout)
+
+def _iter_endpoint_states(
+    results: List[Dict[str, Any]],
+    region: str,
+    timeout: float,
+    aws_service: Optional[AWSService] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> Generator[Tuple[str, str], None, Dict[str, Any]]:
+    """
+    Follow every endpoint in results on the shared state tracker, keeping each result's state current
+    
+    Yields (endpoint_id, state) per change and returns
+    {"timed_out", "waited_seconds", "pending": endpoint IDs that had not settled}.
+    """
+    by_id = {r["endpoint_id"]: r for r in results if r.get("endpoint_id")}
+    changes = state_tracker.iter_wait(
+        aws_service or AWSService(),
+        region,
+        {endpoint_id: result.get("state") for endpoint_id, result in by_id.items()},
+        timeout,
+        cancel_event
+    )
+    try:
+        while True:
+            endpoint_id, state = next(changes)
+            by_id[endpoint_id]["state"] = state
+            yield endpoint_id, state
+    except StopIteration as stop:
+        wait = stop.value
+    finally:
+        changes.close()
+    return {
+        "timed_out": wait["timed_out"],
+        "waited_seconds": wait["waited_seconds"],
+        "pending": [endpoint_id for endpoint_id, state in wait["states"].items() if not is_settled(state)]
+    }
+
+def _wait_for_endpoints(
+    results: List[Dict[str, Any]],
+    region: str,
+    timeout: float,
+    aws_service: Optional[AWSService] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> Dict[str, Any]:
+    """Block until every endpoint in results settles or the timeout passes; see _iter_endpoint_states"""
+    changes = _iter_endpoint_states(results, region, timeout, aws_service, cancel_event)
+    while True:
+        try:
+            next(changes)
+        except StopIteration as stop:
+            return stop.value
+
+def _state_events(
+    results: List[Dict[str, Any]],
+    region: str,
+    timeout: float,
+    aws_service: Optional[AWSService] = None
+) -> Generator[str, None, Dict[str, Any]]:
+    """SSE "state" events while waiting on the endpoints in results; returns the wait summary"""
+    changes = _iter_endpoint_states(results, region, timeout, aws_service)
+    try:
+        while True:
+            try:
+                endpoint_id, state = next(changes)
+            except StopIteration as stop:
+                return stop.value
+            yield _sse("state", {"endpoint_id": endpoint_id, "state": state})
+    finally:
+        # Release the watch if the client disconnects mid-wait
+        changes.close()
+
+def _iter_target_waits(
+    waits: List[Tuple[EndpointRequest, float, List[Dict[str, Any]]]],
+    aws_service: AWSService
+) -> Generator[Tuple[EndpointRequest, List[Dict[str, Any]], Dict[str, Any]], None, None]:
+    """
+    Yield (target, results, wait summary) for each waiting target as soon as it settles or times out
+    
+    Every target gets a watch on the shared state tracker, followed from the
+    calling thread with no thread per target. The watches are released when
+    the generator ends or is closed (e.g. when the client disconnects).
+    """
+    start = time.monotonic()
+    stop = threading.Event()
+    pending = []
+    try:
+        for target, timeout, results in waits:
+            by_id = {r["endpoint_id"]: r for r in results if r.get("endpoint_id")}
+            watch = state_tracker.watch(
+                aws_service, target.region, {endpoint_id: r.get("state") for endpoint_id, r in by_id.items()}
+            )
+            pending.append((target, results, by_id, watch, start + timeout))
+        while pending:
+            now = time.monotonic()
+            for entry in [e for e in pending if e[3].done.is_set() or now >= e[4]]:
+                pending.remove(entry)
+                target, results, by_id, watch, _ = entry
+                state_tracker.unwatch(watch)
+                for endpoint_id, state in watch.states.items():
+                    by_id[endpoint_id]["state"] = state
+                unsettled = watch.pending()
+                yield target, results, {
+                    "timed_out": bool(unsettled),
+                    "waited_seconds": round(now - start, 3),
+                    "pending": unsettled
+                }
+            if pending:
+                stop.wait(0.5)
+    finally:
+        stop.set()
+        for entry in pending:
+            state_tracker.unwatch(entry[3])
+
+def _script_endpoints(ps1_content: str, output: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Region and created/skipped endpoints of a finished PowerShell run, for waiting on them"""
+    region = parse_script_header(ps1_content)["region"]
+    endpoints = [
+        {"service_name": r["service_name"], "endpoint_id": r["endpoint_id"], "state": None}
+        for r in parse_script_output(output) if r["endpoint_id"]
+    ]
+    return region, endpoints
+
+def _script_content(request: ExecuteScriptRequest) -> str:
+    """
+    The PowerShell script to run: the cached script for script_id, else ps1_content
+    
+    Raises:
+        HTTPException(404) when script_id is no longer cached, 422 when
+        neither field is usable
+    """
+    if request.script_id:
+        script = _cached_script(request.script_id)
+        if script is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Script not found: {request.script_id}. Generate it again or send ps1_content."
+            )
+        if script.format != "powershell":
+            raise HTTPException(
+                status_code=422,
+                detail={
+                    "validation_errors": [f"script_id refers to a {script.format} script; only PowerShell scripts can be executed"],
+                    "message": "Request validation failed"
+                }
+            )
+        return script.content
+    if not request.ps1_content or request.ps1_content.strip() == "":
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "validation_errors": ["ps1_content or script_id is required and cannot be empty"],
+                "message": "Request validation failed"
+            }
+        )
+    return request.ps1_content
+
+def _script_job(
+    ps1_content: str,
+    script_id: Optional[str] = None,
+    session: Optional[CredentialSession] = None,
+    wait_timeout: Optional[float] = None
+):
+    """
+    Build a job function that runs a PowerShell script and records it in the history
+    
+    With wait_timeout, a successful run then waits for the endpoints named in
+    its output (and the region in its header) to become available.
+    """
+    def run(cancel_event: threading.Event) -> Dict[str, Any]:
+        output, error, exit_code = PowerShellExecutor().execute(
+            ps1_content=ps1_content,
+            cancel_event=cancel_event,
+            env=_script_env(session)
+        )
+        history_store.record_script_execution(ps1_content, output, exit_code, script_id)
+        result = {"success": exit_code == 0, "output": output, "error": error or None, "exit_code": exit_code}
+        if wait_timeout is not None and exit_code == 0 and not cancel_event.is_set():
+            region, endpoints = _script_endpoints(ps1_content, output)
+            if region and endpoints:
+                result["wait"] = _wait_for_endpoints(
+                    endpoints, region, wait_timeout, _aws_service(session), cancel_event
+                )
+                result["endpoints"] = endpoints
+        return result
+    return run
+
+def _native_job(
+    request: EndpointRequest,
+    service_names: List[str],
+    subnets_by_service: Optional[Dict[str, List[str]]] = None,
+    aws_service: Optional[AWSService] = None,
+    wait_timeout: Optional[float] = None
+):
+    """Build a job function that creates endpoints natively, stopping early on cancel"""
+    def run(cancel_event: threading.Event) -> Dict[str, Any]:
+        start = time.perf_counter()
+        creator = EndpointCreator(aws_service, scheduler=CreationScheduler(max_workers=request.max_workers))
+        results = []
+        for result in creator.iter_create_endpoints(**_creation_kwargs(request, service_names, subnets_by_service)):
+            results.append(result)
+            if cancel_event.is_set():
+                break
+        results.sort(key=lambda result: result["index"])
+        for result in results:
+            del result["index"]
+        history_store.record_native(request.region, request.vpc_id, request.endpoint_type, results)
+        run = {
+            "success": len(results) == len(service_names) and all(r["success"] for r in results),
+            "results": results,
+            "wall_clock_seconds": round(time.perf_counter() - start, 3),
+            "max_workers": creator.scheduler.max_workers
+        }
+        if wait_timeout is not None and not cancel_event.is_set():
+            run["wait"] = _wait_for_endpoints(results, request.region, wait_timeout, aws_service, cancel_event)
+        return run
+    return run
+
+def _submit_job(kind: str, func):
+    """Queue a job, mapping a full queue to 429"""
+    try:
+        return job_manager.submit(kind, func)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Diff requested endpoints against the VPC
+@router.post("/diff")
+async def diff_endpoints(
+    request: EndpointRequest,
+    response: Response,
+    aws_service: AWSService = Depends(_aws_service)
+):
+    """
+    Plan which endpoints would be created, skipped or modified, without writing anything
+    
+    Takes the same request as /api/generate. Existing endpoints are matched
+    by (service name, endpoint type); "modify" lists the subnets, security
+    groups, route tables or private DNS setting the existing endpoint lacks.
+    """
+    timer = StageTimer()
+    service_names = list(_request_plan(request, timer).service_names)
+    with timer.stage("preflight"):
+        subnets_by_service = await run_blocking(_preflight, request, service_names, aws_service)
+    
+    try:
+        with timer.stage("diff"):
+            plan = await run_blocking(
+                EndpointPlanner(aws_service).plan,
+                **_creation_kwargs(request, service_names, subnets_by_service)
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Endpoint diff failed: {str(e)}")
+    
+    response.headers.update(timer.headers())
+    return {
+        "success": True,
+        "region": request.region,
+        "vpc_id": request.vpc_id,
+        "endpoint_type": request.endpoint_type,
+        "plan": plan,
+        "summary": summarize(plan)
+    }
+
+# Create endpoints natively (no PowerShell / AWS CLI)
+@router.post("/execute/native")
+async def execute_native(
+    request: EndpointRequest,
+    response: Response,
+    aws_service: AWSService = Depends(_aws_service)
+):
+    """
+    Create VPC endpoints directly through in-process EC2 calls
+    
+    Takes the same request as /api/generate and returns a structured result
+    per service instead of script output. Services are created concurrently
+    under a per-account/region rate limit. With wait_until_available the
+    response waits until every endpoint has left "pending" (or the timeout).
+    """
+    timer = StageTimer()
+    wait_timeout = _wait_timeout(request)
+    service_names = list(_request_plan(request, timer).service_names)
+    with timer.stage("preflight"):
+        subnets_by_service = await run_blocking(_preflight, request, service_names, aws_service)
+    
+    try:
+        with timer.stage("create"):
+            run = await run_blocking(
+                _create_endpoints, request, service_names, subnets_by_service=subnets_by_service, aws_service=aws_service
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Endpoint creation failed: {str(e)}")
+    
+    results = run["results"]
+    if wait_timeout is not None:
+        with timer.stage("wait"):
+            run["wait"] = await run_blocking(_wait_for_endpoints, results, request.region, wait_timeout, aws_service)
+    failed = [r for r in results if not r["success"]]
+    if failed:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                **run,
+                "error": f"{len(failed)} of {len(results)} endpoints failed",
+                "message": "Endpoint creation failed"
+            },
+            headers=timer.headers()
+        )
+    
+    counts = _count_results(results)
+    response.headers.update(timer.headers())
+    return {
+        "success": True,
+        **run,
+        "message": f"Created {counts['created']} endpoints, {counts['skipped']} already existed"
+    }
+
+# Provision endpoints across many VPCs and regions
+async def _batch_jobs(
+    request: BatchRequest,
+    aws_service: AWSService
+) -> List[Tuple[EndpointRequest, List[str], Optional[Dict[str, List[str]]], Optional[float]]]:
+    """
+    Validate and pre-flight every target of a batch before any writes happen
+    
+    Returns:
+        (target, service_names, subnets_by_service, wait_timeout) per target
+    
+    Raises:
+        HTTPException(422) with the errors of every failing target
+    """
+    if not request.targets:
+        raise HTTPException(
+            status_code=422,
+            detail={"validation_errors": ["targets cannot be empty"], "message": "Request validation failed"}
+        )
+    if len(request.targets) > settings.BATCH_MAX_TARGETS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "validation_errors": [f"at most {settings.BATCH_MAX_TARGETS} targets are allowed per batch"],
+                "message": "Request validation failed"
+            }
+        )
+    
+    # Validate every target before any writes happen; ID formats, duplicates
+    # and IDs shared across VPCs are checked for the whole batch in one pass
+    id_report = validate_targets([target.model_dump() for target in request.targets])
+    target_errors = {
+        index: [message for messages in fields.values() for message in messages]
+        for index, fields in id_report["target_errors"].items()
+    }
+    if target_errors or id_report["cross_vpc_errors"]:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "target_errors": target_errors,
+                "cross_vpc_errors": id_report["cross_vpc_errors"],
+                "message": "Request validation failed"
+            }
+        )
+    
+    jobs = []
+    for index, target in enumerate(request.targets):
+        try:
+            wait_timeout = _wait_timeout(target)
+            service_names = list(_request_plan(target).service_names)
+            jobs.append((
+                target,
+                service_names,
+                await run_blocking(_preflight, target, service_names, aws_service),
+                wait_timeout
+            ))
+        except HTTPException as e:
+            target_errors[index] = e.detail["validation_errors"]
+    if target_errors:
+        raise HTTPException(
+            status_code=422,
+            detail={"target_errors": target_errors, "message": "Request validation failed"}
+        )
+    return jobs
+
+def _region_concurrency(request: BatchRequest) -> int:
+    """Targets at once per region, capped by BATCH_REGION_CONCURRENCY"""
+    return min(request.region_concurrency or settings.BATCH_REGION_CONCURRENCY, settings.BATCH_REGION_CONCURRENCY)
+
+@router.post("/batch")
+async def batch_provision(request: BatchRequest, aws_service: AWSService = Depends(_aws_service)):
+    """
+    Provision endpoints for many (region, VPC) targets in one request
+    
+    Targets run on per-region worker pools and results stream back as
+    newline-delimited JSON as soon as each target finishes, followed by a
+    "wait" line per target that set wait_until_available and a summary
+    line with the overall throughput.
+    """
+    jobs = await _batch_jobs(request, aws_service)
+    
+    runner = BatchRunner(region_concurrency=_region_concurrency(request))
+    
+    # One describe-vpc-endpoints call per region covers every target VPC in it
+    existing_by_region: Dict[str, Any] = {}
+    # Targets that wait_until_available, with their create results
+    waits: List[Tuple[EndpointRequest, float, List[Dict[str, Any]]]] = []
+    
+    def prefetch_existing(region: str) -> None:
+        vpc_ids = [target.vpc_id for target, *_ in jobs if target.region == region and target.skip_existing]
+        try:
+            existing_by_region[region] = EndpointPlanner(aws_service).existing_endpoints(region, vpc_ids)
+        except Exception:
+            # Targets fall back to their own lookup and report the error there
+            existing_by_region[region] = None
+    
+    def provision(job) -> Dict[str, Any]:
+        target, service_names, subnets_by_service, wait_timeout = job
+        index = existing_by_region.get(target.region)
+        existing = index.get(target.vpc_id, {}) if index is not None and target.skip_existing else None
+        run = _create_endpoints(target, service_names, existing, subnets_by_service, aws_service)
+        if wait_timeout is not None:
+            waits.append((target, wait_timeout, run["results"]))
+        return {
+            "vpc_id": target.vpc_id,
+            "success": all(r["success"] for r in run["results"]),
+            **run
+        }
+    
+    def stream():
+        start = time.perf_counter()
+        regions = {target.region for target, *_ in jobs if target.skip_existing}
+        if regions:
+            with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+                list(pool.map(prefetch_existing, regions))
+        created = skipped = failed = 0
+        for row in runner.run(jobs, provision, region_of=lambda job: job[0].region):
+            counts = _count_results(row.get("results", []))
+            created += counts["created"]
+            skipped += counts["skipped"]
+            failed += counts["failed"]
+            yield json.dumps({"type": "target", **row}) + "\n"
+        # Waiting targets are held until every create has been issued, so they
+        # don't occupy region slots; all of them share one state poller
+        waiting = _iter_target_waits(waits, aws_service)
+        try:
+            for target, results, wait in waiting:
+                yield json.dumps({
+                    "type": "wait",
+                    "vpc_id": target.vpc_id,
+                    "region": target.region,
+                    "endpoints": [
+                        {"service_name": r["service_name"], "endpoint_id": r["endpoint_id"], "state": r["state"]}
+                        for r in results if r.get("endpoint_id")
+                    ],
+                    **wait
+                }) + "\n"
+        finally:
+            # Release the watches if the client disconnects mid-wait
+            waiting.close()
+        elapsed = time.perf_counter() - start
+        yield json.dumps({
+            "type": "summary",
+            "targets": len(jobs),
+            "regions": len({job[0].region for job in jobs}),
+            "endpoints_created": created,
+            "endpoints_skipped": skipped,
+            "endpoints_failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "endpoints_per_minute": round(created * 60 / elapsed, 1) if elapsed > 0 else None
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# Estimate a run before executing it
+@router.post("/plan")
+async def plan_run(
+    request: Union[BatchRequest, EndpointRequest],
+    response: Response,
+    aws_service: AWSService = Depends(_aws_service)
+):
+    """
+    Estimate the AWS calls, duration and endpoint-hours of a native run, without writing anything
+    
+    Takes the body of /execute/native (one EndpointRequest) or of /batch
+    (targets). Create calls are replayed against the configured rate limit,
+    CREATE_MAX_WORKERS and BATCH_REGION_CONCURRENCY to find the critical
+    path. Interface endpoints are billed per AZ; Gateway endpoints are free.
+    """
+    timer = StageTimer()
+    if isinstance(request, BatchRequest):
+        with timer.stage("preflight"):
+            jobs = await _batch_jobs(request, aws_service)
+        region_concurrency = _region_concurrency(request)
+    else:
+        service_names = list(_request_plan(request, timer).service_names)
+        with timer.stage("preflight"):
+            jobs = [(request, service_names, await run_blocking(_preflight, request, service_names, aws_service), None)]
+        region_concurrency = 1
+    
+    targets = [
+        {**_creation_kwargs(target, service_names, subnets_by_service), "max_workers": target.max_workers}
+        for target, service_names, subnets_by_service, _ in jobs
+    ]
+    try:
+        with timer.stage("estimate"):
+            estimate = await run_blocking(RunEstimator(aws_service).estimate, targets, region_concurrency)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Run estimate failed: {str(e)}")
+    
+    response.headers.update(timer.headers())
+    return {"success": True, **estimate}
+
+# Bulk lifecycle operations on existing endpoints
+def _select_endpoints(
+    request: EndpointSelection,
+    lifecycle: EndpointLifecycle,
+    errors: Optional[List[str]] = None
+) -> tuple:
+    """
+    Validate a bulk request and resolve the endpoints it selects
+    
+    Returns:
+        Tuple of (VpcEndpoint descriptions, requested endpoint IDs that do not exist)
+    
+    Raises:
+        HTTPException(422) listing every validation error, 400 when the lookup fails
+    """
+    errors = list(errors or [])
+    if not request.region or not request.region.strip():
+        errors.append("region is required")
+    if not request.endpoint_ids and not request.vpc_id and not request.vpc_ids:
+        errors.append("endpoint_ids, vpc_id or vpc_ids is required")
+    if request.endpoint_type and request.endpoint_type not in ["Interface", "Gateway"]:
+        errors.append("endpoint_type must be 'Interface' or 'Gateway'")
+    for messages in validate_lifecycle_ids(request.model_dump()).values():
+        errors.extend(messages)
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={"validation_errors": errors, "message": "Request validation failed"}
+        )
+    
+    vpc_ids = list(dict.fromkeys([*(request.vpc_ids or []), *([request.vpc_id] if request.vpc_id else [])]))
+    try:
+        endpoints, missing = lifecycle.select(
+            request.region,
+            endpoint_ids=request.endpoint_ids,
+            vpc_ids=vpc_ids or None,
+            service_names=request.service_names,
+            endpoint_type=request.endpoint_type
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Endpoint lookup failed: {str(e)}")
+    
+    if len(endpoints) > settings.LIFECYCLE_MAX_ENDPOINTS:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "validation_errors": [
+                    f"{len(endpoints)} endpoints selected; at most {settings.LIFECYCLE_MAX_ENDPOINTS} are allowed per request"
+                ],
+                "message": "Request validation failed"
+            }
+        )
+    return endpoints, missing
+
+async def _run_lifecycle(
+    request: EndpointSelection,
+    lifecycle: EndpointLifecycle,
+    apply: Callable[[List[Dict[str, Any]], List[str]], Dict[str, Any]],
+    errors: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Select the endpoints, apply one bulk operation off the event loop and record it in the history"""
+    def run() -> Dict[str, Any]:
+        endpoints, missing = _select_endpoints(request, lifecycle, errors)
+        return apply(endpoints, missing)
+    
+    try:
+        result = await run_blocking(run)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Bulk operation failed: {str(e)}")
+    
+    results = result["results"]
+    history_store.record_lifecycle(result["operation"], request.region, results)
+    failed = sum(1 for r in results if not r["success"])
+    changed = sum(1 for r in results if r["changed"])
+    return {
+        "success": failed == 0,
+        "region": request.region,
+        **result,
+        "summary": {
+            "selected": len(results),
+            "changed": changed,
+            "unchanged": len(results) - changed - failed,
+            "failed": failed
+        }
+    }
+
+@router.post("/endpoints/delete")
+async def bulk_delete(request: EndpointSelection, aws_service: AWSService = Depends(_aws_service)):
+    """
+    Delete many VPC endpoints with multi-ID DeleteVpcEndpoints calls
+    
+    Selects by endpoint_ids, or by vpc_id/vpc_ids narrowed by service_names
+    and endpoint_type (an EndpointRequest body selects the endpoints it
+    created). Returns one result per endpoint, including requested IDs that
+    do not exist, and the number of API calls made.
+    """
+    lifecycle = EndpointLifecycle(aws_service)
+    return await _run_lifecycle(
+        request,
+        lifecycle,
+        lambda endpoints, missing: lifecycle.delete(request.region, endpoints, missing)
+    )
+
+@router.post("/endpoints/modify")
+async def bulk_modify(request: BulkModifyRequest, aws_service: AWSService = Depends(_aws_service)):
+    """
+    Add or remove subnets, security groups and route tables on many VPC endpoints
+    
+    subnets/security_groups/route_tables are added, remove_* removed;
+    changes an endpoint already has are skipped, so re-posting the request
+    of a /diff "modify" entry applies exactly the missing settings.
+    """
+    changes = request.model_dump(include={
+        "subnets", "remove_subnets", "security_groups", "remove_security_groups",
+        "route_tables", "remove_route_tables", "private_dns_enabled"
+    })
+    errors = [] if any(value not in (None, []) for value in changes.values()) else ["no changes requested"]
+    lifecycle = EndpointLifecycle(aws_service)
+    return await _run_lifecycle(
+        request,
+        lifecycle,
+        lambda endpoints, missing: lifecycle.modify(request.region, endpoints, missing, **changes),
+        errors
+    )
+
+@router.post("/endpoints/tags")
+async def bulk_retag(request: BulkTagRequest, aws_service: AWSService = Depends(_aws_service)):
+    """
+    Set or remove tags on many VPC endpoints with multi-resource CreateTags/DeleteTags calls
+    
+    With tag_prefix or tag_suffix, Name tags are rebuilt per service the way
+    new endpoints are named. Endpoints needing the same tag values share
+    calls of up to LIFECYCLE_TAG_BATCH_SIZE resources.
+    """
+    errors = []
+    if not request.tags and not request.remove_tags and request.tag_prefix is None and request.tag_suffix is None:
+        errors.append("tags, remove_tags, tag_prefix or tag_suffix is required")
+    lifecycle = EndpointLifecycle(aws_service)
+    return await _run_lifecycle(
+        request,
+        lifecycle,
+        lambda endpoints, missing: lifecycle.retag(
+            request.region,
+            endpoints,
+            missing,
+            tags=request.tags,
+            remove_tags=request.remove_tags,
+            tag_prefix=request.tag_prefix,
+            tag_suffix=request.tag_suffix
+        ),
+        errors
+    )
+
+@router.post("/execute/stream")
+async def execute_script_stream(request: ExecuteScriptRequest, session: Optional[CredentialSession] = Depends(_session)):
+    """
+    Execute a generated PowerShell script and stream its output as Server-Sent Events
+    
+    Emits "line" for every output line, "service" for [OK]/[FAIL] lines,
+    then "exit" with the exit code (or "error" on timeout/spawn failure).
+    With wait_until_available, a successful run is followed by a "state"
+    event per endpoint state change and a final "wait" event.
+    """
+    ps1_content = await run_blocking(_script_content, request)
+    wait_timeout = _wait_timeout(request)
+    executor = PowerShellExecutor()
+    
+    def stream():
+        # Keep the output tail for the history record
+        output: Deque[str] = deque()
+        output_chars = 0
+        exit_code = None
+        try:
+            for event in executor.stream(ps1_content=ps1_content, env=_script_env(session)):
+                if event["event"] in ("line", "service"):
+                    output.append(event["data"]["line"])
+                    output_chars += len(event["data"]["line"]) + 1
+                    while output_chars > settings.HISTORY_MAX_OUTPUT_CHARS and len(output) > 1:
+                        output_chars -= len(output.popleft()) + 1
+                elif event["event"] == "exit":
+                    exit_code = event["data"]["exit_code"]
+                yield _sse(event["event"], event["data"])
+        finally:
+            history_store.record_script_execution(ps1_content, "\n".join(output), exit_code, request.script_id)
+        
+        if wait_timeout is not None and exit_code == 0:
+            region, endpoints = _script_endpoints(ps1_content, "\n".join(output))
+            if region and endpoints:
+                wait = yield from _state_events(endpoints, region, wait_timeout, _aws_service(session))
+                yield _sse("wait", {**wait, "endpoints": endpoints})
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# Stream native endpoint creation
+@router.post("/execute/native/stream")
+async def execute_native_stream(request: EndpointRequest, aws_service: AWSService = Depends(_aws_service)):
+    """
+    Create VPC endpoints natively and stream one "service" event per endpoint as it finishes
+    
+    Ends with a "done" event carrying the wall-clock time and counts. With
+    wait_until_available, "state" events for each endpoint state change come
+    before "done", which then also carries the wait summary.
+    """
+    wait_timeout = _wait_timeout(request)
+    service_names = list(_request_plan(request).service_names)
+    subnets_by_service = await run_blocking(_preflight, request, service_names, aws_service)
+    creator = EndpointCreator(aws_service, scheduler=CreationScheduler(max_workers=request.max_workers))
+    
+    def stream():
+        start = time.perf_counter()
+        results = []
+        try:
+            for result in creator.iter_create_endpoints(**_creation_kwargs(request, service_names, subnets_by_service)):
+                results.append(result)
+                yield _sse("service", result)
+        except Exception as e:
+            yield _sse("error", {"error": f"Endpoint creation failed: {str(e)}"})
+            return
+        finally:
+            history_store.record_native(request.region, request.vpc_id, request.endpoint_type, results)
+        counts = _count_results(results)
+        wait = None
+        if wait_timeout is not None:
+            wait = yield from _state_events(results, request.region, wait_timeout, aws_service)
+        yield _sse("done", {
+            "success": counts["failed"] == 0,
+            **counts,
+            **({"wait": wait} if wait is not None else {}),
+            "wall_clock_seconds": round(time.perf_counter() - start, 3)
+        })
+    
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# Background jobs
+@router.post("/jobs", status_code=202)
+async def submit_script_job(request: ExecuteScriptRequest, session: Optional[CredentialSession] = Depends(_session)):
+    """
+    Queue a PowerShell script for background execution and return its job ID immediately
+    """
+    ps1_content = await run_blocking(_script_content, request)
+    wait_timeout = _wait_timeout(request)
+    job = await run_blocking(
+        _submit_job,
+        "script",
+        _script_job(ps1_content, request.script_id, session, wait_timeout)
+    )
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/jobs/native", status_code=202)
+async def submit_native_job(request: EndpointRequest, aws_service: AWSService = Depends(_aws_service)):
+    """
+    Queue native endpoint creation for background execution and return its job ID immediately
+    """
+    wait_timeout = _wait_timeout(request)
+    service_names = list(_request_plan(request).service_names)
+    subnets_by_service = await run_blocking(_preflight, request, service_names, aws_service)
+    job = await run_blocking(
+        _submit_job,
+        "native",
+        _native_job(request, service_names, subnets_by_service, aws_service, wait_timeout)
+    )
+    return {"job_id": job.id, "status": job.status}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of a background job
+    """
+    job = await run_blocking(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get the result of a finished background job (409 while it is still running)
+    """
+    job = await run_blocking(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job.status not in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail={"message": "Job has not finished", **job.to_dict()})
+    return {**job.to_dict(), "result": job.result}
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running background job
+    """
+    job = await run_blocking(job_manager.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+# Service catalog
+@router.get("/services")
+async def list_services(
+    region: str,
+    endpoint_type: Optional[str] = None,
+    refresh: bool = False,
+    aws_service: AWSService = Depends(_aws_service)
+):
+    """
+    List the VPC endpoint services offered in a region, with their endpoint types and AZs
+    
+    Loaded lazily per region from an on-disk snapshot (refreshed from
+    describe-vpc-endpoint-services once it expires, or when refresh=true).
+    """
+    if not region.strip():
+        raise HTTPException(
+            status_code=422,
+            detail={"validation_errors": ["region is required"], "message": "Request validation failed"}
+        )
+    if endpoint_type and endpoint_type not in ["Interface", "Gateway"]:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "validation_errors": ["endpoint_type must be 'Interface' or 'Gateway'"],
+                "message": "Request validation failed"
+            }
+        )
+    
+    try:
+        services = await run_blocking(ServiceCatalog(aws_service).list_services, region, endpoint_type, refresh=refresh)
+        return {"success": True, **services}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to load service catalog: {str(e)}")
+
+# Topology cache
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters for the VPC topology cache; every hit is an AWS API call saved
+    
+    request_plans and scripts have the same counters for the validated
+    request plan cache and the generated script cache; state_tracker shows
+    the shared endpoint state poller. With several workers the counters are
+    those of the worker that answered; invalidations reports the
+    invalidations shared with the other workers.
+    """
+    stats = topology_cache.stats()
+    return {
+        **stats,
+        "api_calls_saved": stats["hits"],
+        "request_plans": plan_cache_stats(),
+        "scripts": script_cache.stats(),
+        "state_tracker": state_tracker.stats(),
+        "invalidations": invalidation_bus.stats(),
+        "worker": os.getpid()
+    }
+
+@router.post("/cache/invalidate")
+async def invalidate_cache(request: CacheInvalidateRequest):
+    """
+    Drop cached topology lookups for a region and/or VPC, in every worker
+    
+    "removed" counts this worker's entries; the others drop theirs within
+    CACHE_SYNC_INTERVAL_SECONDS.
+    """
+    removed = AWSService().invalidate_topology_cache(region=request.region, vpc_id=request.vpc_id)
+    return {"success": True, "removed": removed}
+
+# Provisioning history
+def _require_history() -> None:
+    if not history_store.enabled:
+        raise HTTPException(status_code=404, detail="Provisioning history is disabled (HISTORY_ENABLED=false)")
+
+@router.get("/history/events")
+async def history_events(
+    kind: Optional[str] = None,
+    region: Optional[str] = None,
+    vpc_id: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: int = 50,
+    cursor: Optional[int] = None
+):
+    """
+    Page through recorded generate/execute/native events, newest first
+    
+    since/until are Unix timestamps; pass next_cursor back as cursor for the next page.
+    """
+    _require_history()
+    return await run_blocking(history_store.query_events, kind, region, vpc_id, since, until, limit, cursor)
+
+@router.get("/history/events/{event_id}")
+async def history_event(event_id: str):
+    """
+    One recorded event with its output and per-service endpoint rows
+    """
+    _require_history()
+    event = await run_blocking(history_store.get_event, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail=f"Event not found: {event_id}")
+    return event
+
+@router.get("/history/endpoints")
+async def history_endpoints(
+    service: Optional[str] = None,
+    status: Optional[str] = None,
+    region: Optional[str] = None,
+    vpc_id: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: int = 50,
+    cursor: Optional[int] = None
+):
+    """
+    Page through recorded endpoint results, newest first
+    
+    service matches the full name or the name without its region prefix
+    ("ecr.api"); "*" makes it a pattern (e.g. "ecr*").
+    status is created, skipped or failed.
+    """
+    _require_history()
+    return await run_blocking(history_store.query_endpoints, service, status, region, vpc_id, since, until, limit, cursor)
+
+@router.get("/history/vpcs")
+async def history_vpcs(service: str, region: Optional[str] = None, limit: int = 50, cursor: Optional[int] = None):
+    """
+    VPCs that have an endpoint for a service according to the history, e.g. ?service=ecr*
+    
+    Answered from the local index without any describe calls; endpoints
+    changed outside this tool are not reflected.
+    """
+    _require_history()
+    return await run_blocking(history_store.vpcs_with_service, service, region, limit, cursor)
+
+@router.get("/history/stats")
+async def history_stats():
+    """
+    Writer counters for the history store (queued, written, dropped rows)
+    """
+    return await run_blocking(history_store.stats)
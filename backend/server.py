@@ -0,0 +1,29 @@
+"""
+AWS VPC Endpoint Generator - Production server
+Runs the API with WORKERS processes and no auto-reload; main.py remains the dev entry point
+"""
+
+import os
+
+import uvicorn
+from cryptography.fernet import Fernet
+
+from config import settings
+
+if __name__ == "__main__":
+    if settings.WORKERS > 1 and not settings.SESSION_TOKEN_KEY:
+        # Workers inherit the environment, so they all seal and open session IDs with
+        # the same key; it lives in memory only and sessions end with the server
+        os.environ["SESSION_TOKEN_KEY"] = Fernet.generate_key().decode()
+    uvicorn.run(
+        "main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.WORKERS,
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.KEEP_ALIVE_SECONDS,
+        # In-flight requests (including streamed executions) get this long after SIGTERM;
+        # the shutdown handler then drains background jobs for up to the same time
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        log_level="debug" if settings.DEBUG else "info"
+    )
@@ -0,0 +1,199 @@
+"""
+AWS Clients - Pooled boto3 sessions and clients shared by all AWS calls
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config import settings
+from utils.aws_error_codes import THROTTLE_ERROR_CODES
+from utils.metrics import aws_errors, aws_latency, aws_retries, aws_throttles, metrics
+
+# After STS fails for a profile, its name stands in for the account this long before STS is tried again
+ACCOUNT_FALLBACK_TTL_SECONDS = 60
+
+class AWSClientPool:
+    """Caches one boto3 session per profile and one client per (profile, region, service)"""
+
+    def __init__(
+        self,
+        max_pool_connections: Optional[int] = None,
+        retry_mode: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        endpoint_url: Optional[str] = None
+    ):
+        self.max_pool_connections = max_pool_connections or settings.AWS_MAX_POOL_CONNECTIONS
+        self.retry_mode = retry_mode or settings.AWS_RETRY_MODE
+        self.max_attempts = max_attempts or settings.AWS_MAX_ATTEMPTS
+        self.endpoint_url = endpoint_url or settings.AWS_ENDPOINT_URL
+        self._sessions: Dict[str, boto3.Session] = {}
+        # Keyed by (profile, region, service, botocore retries enabled)
+        self._clients: Dict[Tuple[str, str, str, bool], Any] = {}
+        self._account_ids: Dict[str, str] = {}
+        # Profiles whose STS lookup failed, with when to try again
+        self._account_retry_at: Dict[str, float] = {}
+        # boto3 sessions are not thread-safe to create; clients are safe to share once built
+        self._lock = threading.Lock()
+
+    def _client_config(self, retry: bool = True) -> Config:
+        # Standard mode for single-attempt clients: adaptive mode's client-side
+        # limiter would otherwise delay calls the scheduler has already paced
+        retries = {"mode": self.retry_mode, "max_attempts": self.max_attempts} if retry else {"mode": "standard", "total_max_attempts": 1}
+        return Config(max_pool_connections=self.max_pool_connections, retries=retries)
+
+    def _instrument(self, client: Any, region: str) -> None:
+        """
+        Record latency, errors, throttles and retries of every call the client makes
+
+        Hooks botocore's events, so AWSService and other callers need no changes.
+        """
+        if not metrics.enabled:
+            return
+        service = client.meta.service_model.service_name
+
+        def before_call(context: Dict[str, Any], **kwargs: Any) -> None:
+            context["metrics_start"] = time.perf_counter()
+
+        def after_call(parsed: Dict[str, Any], model: Any, context: Dict[str, Any], **kwargs: Any) -> None:
+            start = context.get("metrics_start")
+            if start is not None:
+                aws_latency.observe(time.perf_counter() - start, service, model.name, region)
+            retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            if retries:
+                aws_retries.inc(service, model.name, region, amount=retries)
+            code = parsed.get("Error", {}).get("Code")
+            if code:
+                aws_errors.inc(service, model.name, region, code)
+
+        def after_call_error(exception: Exception, context: Dict[str, Any], event_name: str, **kwargs: Any) -> None:
+            # Connection errors and the like, raised before a response was parsed
+            operation = event_name.rsplit(".", 1)[-1]
+            start = context.get("metrics_start")
+            if start is not None:
+                aws_latency.observe(time.perf_counter() - start, service, operation, region)
+            aws_errors.inc(service, operation, region, type(exception).__name__)
+
+        def needs_retry(response: Any, operation: Any, **kwargs: Any) -> None:
+            # Runs after every attempt; only observes, botocore's retry handler decides
+            if response is not None and response[1].get("Error", {}).get("Code") in THROTTLE_ERROR_CODES:
+                aws_throttles.inc(service, operation.name, region)
+
+        events = client.meta.events
+        events.register("before-call", before_call)
+        events.register("after-call", after_call)
+        events.register("after-call-error", after_call_error)
+        events.register("needs-retry", needs_retry)
+
+    def session(self, profile: str = "default") -> boto3.Session:
+        """
+        Return the cached boto3 session for a profile
+
+        The "default" profile falls back to boto3's normal credential chain
+        (environment variables, shared files, instance role) so a missing
+        [default] section does not raise.
+        """
+        with self._lock:
+            session = self._sessions.get(profile)
+            if session is None:
+                session = boto3.Session(profile_name=None if profile == "default" else profile)
+                self._sessions[profile] = session
+            return session
+
+    def register_session(self, profile: str, session: boto3.Session) -> None:
+        """Use a prebuilt session (e.g. explicit per-user credentials) for a profile key"""
+        with self._lock:
+            self._sessions[profile] = session
+
+    def client(self, service: str, region: str, profile: str = "default", retry: bool = True) -> Any:
+        """
+        Return the cached low-level client for (profile, region, service)
+
+        Args:
+            service: boto3 service name, e.g. "ec2"
+            region: AWS region
+            profile: Credentials profile name
+            retry: False for a client that makes exactly one attempt per call,
+                for callers that retry (and rate-limit) every attempt themselves
+
+        Returns:
+            A botocore client
+        """
+        key = (profile, region, service, retry)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        session = self.session(profile)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = session.client(
+                    service,
+                    region_name=region,
+                    endpoint_url=self.endpoint_url,
+                    config=self._client_config(retry)
+                )
+                self._instrument(client, region)
+                self._clients[key] = client
+            return client
+
+    def ec2(self, region: str, profile: str = "default") -> Any:
+        """Shortcut for the EC2 client"""
+        return self.client("ec2", region, profile)
+
+    def ec2_mutating(self, region: str, profile: str = "default") -> Any:
+        """
+        EC2 client for create/modify/delete/tag calls, without botocore retries
+
+        These calls run under CreationScheduler, which takes a rate-limit
+        token per attempt and retries throttled or transient failures itself;
+        botocore retries on top would multiply the attempts and bypass the limiter.
+        """
+        return self.client("ec2", region, profile, retry=False)
+
+    def account_id(self, region: str, profile: str = "default") -> str:
+        """
+        Return the AWS account ID behind a profile, resolved once via STS
+
+        Falls back to the profile name when STS is unavailable so callers
+        still get a stable key for per-account bookkeeping. The fallback is
+        kept for ACCOUNT_FALLBACK_TTL_SECONDS, so hot paths that key on the
+        account do not each pay a failing STS call with its retries.
+        """
+        account = self._account_ids.get(profile)
+        if account is not None:
+            return account
+        if time.monotonic() < self._account_retry_at.get(profile, 0.0):
+            return profile
+        try:
+            account = self.client("sts", region, profile).get_caller_identity()["Account"]
+        except (ClientError, BotoCoreError):
+            self._account_retry_at[profile] = time.monotonic() + ACCOUNT_FALLBACK_TTL_SECONDS
+            return profile
+        self._account_ids[profile] = account
+        self._account_retry_at.pop(profile, None)
+        return account
+
+    def invalidate(self, profile: Optional[str] = None) -> None:
+        """Drop cached sessions and clients, for one profile or all of them"""
+        with self._lock:
+            if profile is None:
+                self._sessions.clear()
+                self._clients.clear()
+                self._account_ids.clear()
+                self._account_retry_at.clear()
+                return
+            self._sessions.pop(profile, None)
+            self._account_ids.pop(profile, None)
+            self._account_retry_at.pop(profile, None)
+            for key in [k for k in self._clients if k[0] == profile]:
+                del self._clients[key]
+
+
+# Shared pool used by every AWSService instance
+client_pool = AWSClientPool()
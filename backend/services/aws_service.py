@@ -2,17 +2,70 @@
 AWS Service - Handles AWS CLI configuration and AWS API interactions
 """
 
-import subprocess
-import json
-from typing import Dict, Any, Optional
+import configparser
 import os
+import tempfile
+from typing import Dict, Any, List, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from config import settings
+from services.aws_clients import AWSClientPool, client_pool
+from services.cache_sync import invalidation_bus
+from utils.ttl_cache import TTLCache
+
+# Read-through cache for VPC topology lookups, keyed by (account, region, vpc, query)
+topology_cache = TTLCache(
+    max_entries=settings.TOPOLOGY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOPOLOGY_CACHE_TTL_SECONDS
+)
+
+def _drop_topology(region: Optional[str], vpc_id: Optional[str]) -> int:
+    def matches(key) -> bool:
+        _, key_region, key_vpc, _ = key
+        return (region is None or key_region == region) and (vpc_id is None or key_vpc == vpc_id)
+    return topology_cache.invalidate(matches)
+
+# Invalidations made through another worker
+invalidation_bus.register("topology", lambda event: _drop_topology(event["region"], event["vpc_id"]))
+
+# EC2 accepts at most this many values per describe filter
+MAX_FILTER_VALUES = 200
 
 class AWSService:
     """Service for AWS operations"""
-    
-    def __init__(self):
-        self.profile = "default"
-    
+
+    def __init__(self, profile: str = "default", pool: Optional[AWSClientPool] = None):
+        self.profile = profile
+        self.pool = pool or client_pool
+
+    def _shared_file_path(self, env_var: str, default_name: str) -> str:
+        path = os.environ.get(env_var) or os.path.join("~", ".aws", default_name)
+        return os.path.expanduser(path)
+
+    def _update_shared_file(self, path: str, section: str, values: Dict[str, str]) -> None:
+        """Merge values into one section of an AWS shared config/credentials file"""
+        parser = configparser.RawConfigParser()
+        parser.read(path)
+        if not parser.has_section(section):
+            parser.add_section(section)
+        for key, value in values.items():
+            parser.set(section, key, value)
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a sibling temp file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                parser.write(f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
     def configure_credentials(
         self,
         access_key: str,
@@ -22,102 +75,362 @@ class AWSService:
         session_token: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Configure AWS CLI credentials using `aws configure set` commands
-        
+        Configure AWS CLI credentials by writing the shared credentials and config files
+
+        Produces the same files as `aws configure set` without spawning the CLI.
+
         Args:
             access_key: AWS access key ID
             secret_key: AWS secret access key
             region: AWS region
             output_format: Output format (json, yaml, text, table)
             session_token: Optional session token for temporary credentials
-        
+
         Returns:
             Dictionary with configuration status
         """
         try:
-            # Configure access key
-            subprocess.run(
-                ["aws", "configure", "set", "aws_access_key_id", access_key, "--profile", self.profile],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            # Configure secret key
-            subprocess.run(
-                ["aws", "configure", "set", "aws_secret_access_key", secret_key, "--profile", self.profile],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            # Configure region
-            subprocess.run(
-                ["aws", "configure", "set", "region", region, "--profile", self.profile],
-                check=True,
-                capture_output=True,
-                text=True
+            credentials = {
+                "aws_access_key_id": access_key,
+                "aws_secret_access_key": secret_key
+            }
+            if session_token:
+                credentials["aws_session_token"] = session_token
+            self._update_shared_file(
+                self._shared_file_path("AWS_SHARED_CREDENTIALS_FILE", "credentials"),
+                self.profile,
+                credentials
             )
-            
-            # Configure output format
-            subprocess.run(
-                ["aws", "configure", "set", "output", output_format, "--profile", self.profile],
-                check=True,
-                capture_output=True,
-                text=True
+
+            config_section = self.profile if self.profile == "default" else f"profile {self.profile}"
+            self._update_shared_file(
+                self._shared_file_path("AWS_CONFIG_FILE", "config"),
+                config_section,
+                {"region": region, "output": output_format}
             )
-            
-            # Configure session token if provided
-            if session_token:
-                subprocess.run(
-                    ["aws", "configure", "set", "aws_session_token", session_token, "--profile", self.profile],
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
-            
+
+            # Cached clients hold the previous credentials
+            self.pool.invalidate(self.profile)
+
             return {
                 "status": "success",
                 "profile": self.profile,
                 "region": region,
                 "message": "AWS credentials configured successfully"
             }
-        
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"AWS CLI configuration failed: {e.stderr}")
+
+        except OSError as e:
+            raise Exception(f"AWS CLI configuration failed: {str(e)}")
         except Exception as e:
             raise Exception(f"Unexpected error during AWS configuration: {str(e)}")
-    
+
+    def get_account_id(self, region: str) -> str:
+        """Return the account ID for this service's credentials (cached per profile)"""
+        return self.pool.account_id(region, self.profile)
+
+    def _cached(self, region: str, vpc_id: Optional[str], query: str, loader) -> Any:
+        key = (self.get_account_id(region), region, vpc_id, query)
+        return topology_cache.get_or_load(key, loader)
+
+    def invalidate_topology_cache(self, region: Optional[str] = None, vpc_id: Optional[str] = None) -> int:
+        """
+        Drop cached topology lookups for a region and/or VPC (everything when both are None)
+
+        Other workers drop the same entries within CACHE_SYNC_INTERVAL_SECONDS.
+
+        Returns:
+            Number of cache entries removed in this process
+        """
+        removed = _drop_topology(region, vpc_id)
+        invalidation_bus.publish("topology", region=region, vpc_id=vpc_id)
+        return removed
+
     def describe_route_tables(self, vpc_id: str, region: str) -> list:
         """
         Query AWS for all route tables in the given VPC
-        
+
+        Results are served from the topology cache while fresh.
+
         Args:
             vpc_id: VPC ID to query
             region: AWS region
-        
+
         Returns:
             List of route table IDs
         """
-        try:
-            result = subprocess.run(
-                [
-                    "aws", "ec2", "describe-route-tables",
-                    "--filters", f"Name=vpc-id,Values={vpc_id}",
-                    "--query", "RouteTables[].RouteTableId",
-                    "--region", region,
-                    "--profile", self.profile,
-                    "--output", "json"
-                ],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            route_tables = json.loads(result.stdout)
+        def load() -> list:
+            ec2 = self.pool.ec2(region, self.profile)
+            paginator = ec2.get_paginator("describe_route_tables")
+            route_tables = []
+            for page in paginator.paginate(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]):
+                route_tables.extend(rt["RouteTableId"] for rt in page.get("RouteTables", []))
             return route_tables
-        
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Failed to describe route tables: {e.stderr}")
+
+        try:
+            return list(self._cached(region, vpc_id, "route_tables", load))
+
+        except (ClientError, BotoCoreError) as e:
+            raise Exception(f"Failed to describe route tables: {str(e)}")
         except Exception as e:
             raise Exception(f"Error querying route tables: {str(e)}")
+
+    def describe_vpc_endpoint_services(self, region: str) -> List[Dict[str, Any]]:
+        """
+        Query AWS for every VPC endpoint service offered in a region
+
+        Results are served from the topology cache while fresh.
+
+        Args:
+            region: AWS region
+
+        Returns:
+            List of ServiceDetails entries (ServiceName, ServiceType, AvailabilityZones, ...)
+        """
+        def load() -> List[Dict[str, Any]]:
+            ec2 = self.pool.ec2(region, self.profile)
+            paginator = ec2.get_paginator("describe_vpc_endpoint_services")
+            details = []
+            for page in paginator.paginate():
+                details.extend(page.get("ServiceDetails", []))
+            return details
+
+        try:
+            return self._cached(region, None, "endpoint_services", load)
+
+        except (ClientError, BotoCoreError) as e:
+            raise Exception(f"Failed to describe VPC endpoint services: {str(e)}")
+
+    def describe_subnets(self, subnet_ids: List[str], region: str) -> Dict[str, Dict[str, str]]:
+        """
+        Resolve subnets to their availability zone and VPC
+
+        A subnet's AZ and VPC never change, so each subnet is cached on its
+        own in the topology cache and only unknown subnets are fetched, all
+        in one paginated call.
+
+        Args:
+            subnet_ids: Subnet IDs to resolve
+            region: AWS region
+
+        Returns:
+            {subnet_id: {"availability_zone": ..., "availability_zone_id": ..., "vpc_id": ...}};
+            subnets that do not exist are missing from the result
+        """
+        account = self.get_account_id(region)
+        resolved: Dict[str, Dict[str, str]] = {}
+        missing = []
+        for subnet_id in dict.fromkeys(subnet_ids):
+            cached = topology_cache.get((account, region, None, f"subnet:{subnet_id}"))
+            if cached is None:
+                missing.append(subnet_id)
+            else:
+                resolved[subnet_id] = cached
+
+        if missing:
+            ec2 = self.pool.ec2(region, self.profile)
+            paginator = ec2.get_paginator("describe_subnets")
+            try:
+                for start in range(0, len(missing), MAX_FILTER_VALUES):
+                    chunk = missing[start:start + MAX_FILTER_VALUES]
+                    for page in paginator.paginate(Filters=[{"Name": "subnet-id", "Values": chunk}]):
+                        for subnet in page.get("Subnets", []):
+                            info = {
+                                "availability_zone": subnet["AvailabilityZone"],
+                                "availability_zone_id": subnet.get("AvailabilityZoneId"),
+                                "vpc_id": subnet["VpcId"]
+                            }
+                            topology_cache.set((account, region, None, f"subnet:{subnet['SubnetId']}"), info)
+                            resolved[subnet["SubnetId"]] = info
+
+            except (ClientError, BotoCoreError) as e:
+                raise Exception(f"Failed to describe subnets: {str(e)}")
+
+        return resolved
+
+    def describe_vpc_endpoints(self, vpc_ids: List[str], region: str) -> List[Dict[str, Any]]:
+        """
+        Query AWS for the existing VPC endpoints in one or more VPCs
+
+        All VPCs are covered by a single paginated call (chunked only past the
+        API's filter value limit). Endpoint state changes with every write, so
+        results are never cached.
+
+        Args:
+            vpc_ids: VPC IDs to query
+            region: AWS region
+
+        Returns:
+            List of VpcEndpoint descriptions
+        """
+        ec2 = self.pool.ec2(region, self.profile)
+        paginator = ec2.get_paginator("describe_vpc_endpoints")
+        unique_ids = list(dict.fromkeys(vpc_ids))
+        endpoints = []
+        try:
+            for start in range(0, len(unique_ids), MAX_FILTER_VALUES):
+                chunk = unique_ids[start:start + MAX_FILTER_VALUES]
+                for page in paginator.paginate(Filters=[{"Name": "vpc-id", "Values": chunk}]):
+                    endpoints.extend(page.get("VpcEndpoints", []))
+            return endpoints
+
+        except (ClientError, BotoCoreError) as e:
+            raise Exception(f"Failed to describe VPC endpoints: {str(e)}")
+
+    def describe_vpc_endpoints_by_id(self, endpoint_ids: List[str], region: str) -> List[Dict[str, Any]]:
+        """
+        Query AWS for specific VPC endpoints
+
+        Uses the vpc-endpoint-id filter rather than VpcEndpointIds, so IDs that
+        no longer exist are simply absent instead of failing the whole call.
+
+        Args:
+            endpoint_ids: VPC endpoint IDs to query
+            region: AWS region
+
+        Returns:
+            List of VpcEndpoint descriptions
+        """
+        ec2 = self.pool.ec2(region, self.profile)
+        paginator = ec2.get_paginator("describe_vpc_endpoints")
+        unique_ids = list(dict.fromkeys(endpoint_ids))
+        endpoints = []
+        try:
+            for start in range(0, len(unique_ids), MAX_FILTER_VALUES):
+                chunk = unique_ids[start:start + MAX_FILTER_VALUES]
+                for page in paginator.paginate(Filters=[{"Name": "vpc-endpoint-id", "Values": chunk}]):
+                    endpoints.extend(page.get("VpcEndpoints", []))
+            return endpoints
+
+        except (ClientError, BotoCoreError) as e:
+            raise Exception(f"Failed to describe VPC endpoints: {str(e)}")
+
+    def create_vpc_endpoint(
+        self,
+        endpoint_type: str,
+        region: str,
+        vpc_id: str,
+        service_name: str,
+        tag_name: str,
+        subnets: Optional[List[str]] = None,
+        security_groups: Optional[List[str]] = None,
+        private_dns_enabled: bool = True,
+        route_tables: Optional[List[str]] = None,
+        client_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a single VPC endpoint
+
+        Args:
+            endpoint_type: "Interface" or "Gateway"
+            region: AWS region
+            vpc_id: Target VPC ID
+            service_name: Full service name, e.g. com.amazonaws.us-east-1.s3
+            tag_name: Value for the endpoint's Name tag
+            subnets: Subnet IDs (Interface)
+            security_groups: Security group IDs (Interface)
+            private_dns_enabled: Enable private DNS (Interface)
+            route_tables: Route table IDs (Gateway)
+            client_token: Idempotency token; retries passing the same token
+                return the endpoint created by an earlier attempt
+
+        Returns:
+            The VpcEndpoint description returned by EC2
+
+        Raises:
+            botocore ClientError on API errors, so callers can inspect the error code
+        """
+        params: Dict[str, Any] = {
+            "VpcId": vpc_id,
+            "VpcEndpointType": endpoint_type,
+            "ServiceName": service_name,
+            "TagSpecifications": [{
+                "ResourceType": "vpc-endpoint",
+                "Tags": [{"Key": "Name", "Value": tag_name}]
+            }]
+        }
+        if endpoint_type.lower() == "interface":
+            if subnets:
+                params["SubnetIds"] = list(subnets)
+            if security_groups:
+                params["SecurityGroupIds"] = list(security_groups)
+            params["PrivateDnsEnabled"] = bool(private_dns_enabled)
+        elif endpoint_type.lower() == "gateway" and route_tables:
+            params["RouteTableIds"] = list(route_tables)
+        if client_token:
+            params["ClientToken"] = client_token
+
+        ec2 = self.pool.ec2_mutating(region, self.profile)
+        return ec2.create_vpc_endpoint(**params)["VpcEndpoint"]
+
+    def delete_vpc_endpoints(self, endpoint_ids: List[str], region: str) -> List[Dict[str, Any]]:
+        """
+        Delete several VPC endpoints in one call
+
+        Returns:
+            The API's Unsuccessful entries ({"ResourceId", "Error": {"Code", "Message"}}),
+            one per endpoint that could not be deleted
+
+        Raises:
+            botocore ClientError when the call as a whole fails
+        """
+        ec2 = self.pool.ec2_mutating(region, self.profile)
+        return ec2.delete_vpc_endpoints(VpcEndpointIds=list(endpoint_ids)).get("Unsuccessful", [])
+
+    def modify_vpc_endpoint(
+        self,
+        endpoint_id: str,
+        region: str,
+        add_subnet_ids: Optional[List[str]] = None,
+        remove_subnet_ids: Optional[List[str]] = None,
+        add_security_group_ids: Optional[List[str]] = None,
+        remove_security_group_ids: Optional[List[str]] = None,
+        add_route_table_ids: Optional[List[str]] = None,
+        remove_route_table_ids: Optional[List[str]] = None,
+        private_dns_enabled: Optional[bool] = None
+    ) -> bool:
+        """
+        Add or remove subnets, security groups or route tables of one VPC endpoint
+
+        EC2 has no multi-endpoint form of this call.
+
+        Raises:
+            botocore ClientError on API errors
+        """
+        params: Dict[str, Any] = {"VpcEndpointId": endpoint_id}
+        lists = {
+            "AddSubnetIds": add_subnet_ids,
+            "RemoveSubnetIds": remove_subnet_ids,
+            "AddSecurityGroupIds": add_security_group_ids,
+            "RemoveSecurityGroupIds": remove_security_group_ids,
+            "AddRouteTableIds": add_route_table_ids,
+            "RemoveRouteTableIds": remove_route_table_ids
+        }
+        params.update({key: list(ids) for key, ids in lists.items() if ids})
+        if private_dns_enabled is not None:
+            params["PrivateDnsEnabled"] = bool(private_dns_enabled)
+
+        ec2 = self.pool.ec2_mutating(region, self.profile)
+        return bool(ec2.modify_vpc_endpoint(**params).get("Return", True))
+
+    def create_tags(self, resource_ids: List[str], tags: Dict[str, str], region: str) -> None:
+        """
+        Set the same tags on many resources in one call
+
+        Raises:
+            botocore ClientError on API errors (the call applies to all resources or none)
+        """
+        ec2 = self.pool.ec2_mutating(region, self.profile)
+        ec2.create_tags(
+            Resources=list(resource_ids),
+            Tags=[{"Key": key, "Value": value} for key, value in tags.items()]
+        )
+
+    def delete_tags(self, resource_ids: List[str], keys: List[str], region: str) -> None:
+        """
+        Remove tag keys from many resources in one call
+
+        Raises:
+            botocore ClientError on API errors
+        """
+        ec2 = self.pool.ec2_mutating(region, self.profile)
+        ec2.delete_tags(Resources=list(resource_ids), Tags=[{"Key": key} for key in keys])
@@ -0,0 +1,111 @@
+"""
+AZ Preflight - Matches Interface endpoint subnets to the AZs each service is offered in
+"""
+
+from typing import Any, Dict, List, Optional
+
+from services.aws_service import AWSService
+from services.service_catalog import ServiceCatalog, unsupported_reason
+
+class AZPreflight:
+    """Finds subnet/service AZ mismatches for a whole request before any endpoint is created"""
+
+    def __init__(self, aws_service: Optional[AWSService] = None, catalog: Optional[ServiceCatalog] = None):
+        self.aws_service = aws_service or AWSService()
+        self.catalog = catalog or ServiceCatalog(self.aws_service)
+
+    def _subnet_errors(
+        self,
+        vpc_id: str,
+        subnets: List[str],
+        subnet_info: Dict[str, Dict[str, str]]
+    ) -> List[str]:
+        """Subnets that do not exist, belong to another VPC, or share an AZ"""
+        errors = []
+        subnets_by_zone: Dict[str, List[str]] = {}
+        for subnet_id in subnets:
+            info = subnet_info.get(subnet_id)
+            if info is None:
+                errors.append(f"Subnet {subnet_id} does not exist")
+                continue
+            if info["vpc_id"] != vpc_id:
+                errors.append(f"Subnet {subnet_id} belongs to {info['vpc_id']}, not {vpc_id}")
+                continue
+            subnets_by_zone.setdefault(info["availability_zone"], []).append(subnet_id)
+        for zone, zone_subnets in subnets_by_zone.items():
+            if len(zone_subnets) > 1:
+                errors.append(
+                    f"Subnets {', '.join(zone_subnets)} are all in {zone}; "
+                    f"an Interface endpoint takes at most one subnet per AZ"
+                )
+        return errors
+
+    def check(
+        self,
+        region: str,
+        vpc_id: str,
+        endpoint_type: str,
+        service_names: List[str],
+        subnets: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Check every service of a request against the region's catalog and the subnets' AZs
+
+        Subnets are resolved to AZs in one describe-subnets call and
+        intersected with each service's AZs from the cached catalog.
+
+        Returns:
+            Dictionary with "errors" (empty when the request can run without a
+            failed write), "subnet_zones" and per-service "services" entries
+            carrying usable_subnets, dropped_subnets and error
+        """
+        services = self.catalog.get(region)["services"]
+        is_interface = endpoint_type.lower() == "interface"
+        subnets = list(subnets or []) if is_interface else []
+
+        subnet_info = self.aws_service.describe_subnets(subnets, region) if subnets else {}
+        errors = self._subnet_errors(vpc_id, subnets, subnet_info)
+        valid_subnets = [s for s in subnets if s in subnet_info and subnet_info[s]["vpc_id"] == vpc_id]
+
+        results = []
+        for service_name in service_names:
+            entry = services.get(service_name)
+            result: Dict[str, Any] = {
+                "service_name": service_name,
+                "availability_zones": entry["availability_zones"] if entry else [],
+                "usable_subnets": None,
+                "dropped_subnets": [],
+                "error": unsupported_reason(services, region, endpoint_type, service_name)
+            }
+            if result["error"] is None and is_interface:
+                zones = set(entry["availability_zones"])
+                # An empty zone list means the catalog does not say; assume every AZ
+                usable = [s for s in valid_subnets if not zones or subnet_info[s]["availability_zone"] in zones]
+                result["usable_subnets"] = usable
+                result["dropped_subnets"] = [
+                    {"subnet_id": s, "availability_zone": subnet_info[s]["availability_zone"]}
+                    for s in valid_subnets if s not in usable
+                ]
+                if valid_subnets and not usable:
+                    chosen = sorted({subnet_info[s]["availability_zone"] for s in valid_subnets})
+                    result["error"] = (
+                        f"{service_name} is not available in any AZ of the chosen subnets "
+                        f"({', '.join(chosen)}); it is offered in {', '.join(entry['availability_zones'])}"
+                    )
+            if result["error"]:
+                errors.append(result["error"])
+            results.append(result)
+
+        return {
+            "errors": errors,
+            "subnet_zones": {s: info["availability_zone"] for s, info in subnet_info.items()},
+            "services": results
+        }
+
+    def subnets_by_service(self, report: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Per-service subnet sets from a check() report, for services that lose a subnet"""
+        return {
+            result["service_name"]: result["usable_subnets"]
+            for result in report["services"]
+            if result["dropped_subnets"]
+        }
@@ -0,0 +1,68 @@
+"""
+Batch Runner - Fans fleet targets out over worker pools partitioned by region
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import settings
+
+class BatchRunner:
+    """Runs one job per target with a separate concurrency limit per region"""
+
+    def __init__(self, region_concurrency: Optional[int] = None):
+        self.region_concurrency = max(1, region_concurrency or settings.BATCH_REGION_CONCURRENCY)
+
+    def run(
+        self,
+        targets: List[Any],
+        func: Callable[[Any], Dict[str, Any]],
+        region_of: Callable[[Any], str] = lambda target: target.region
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run func(target) for every target and yield results as they finish
+
+        Each region gets its own pool, so a slow or throttled region never
+        holds back the others and throughput grows with the number of regions.
+
+        Yields:
+            {"index", "region", "elapsed_seconds"} plus func's result, or
+            "success": False and "error" when func raised
+        """
+        pools: Dict[str, ThreadPoolExecutor] = {}
+        pending: Dict[Future, Dict[str, Any]] = {}
+        start = time.perf_counter()
+
+        def timed(target: Any) -> Dict[str, Any]:
+            target_start = time.perf_counter()
+            result = func(target)
+            result["elapsed_seconds"] = round(time.perf_counter() - target_start, 3)
+            return result
+
+        try:
+            for index, target in enumerate(targets):
+                region = region_of(target)
+                pool = pools.get(region)
+                if pool is None:
+                    pool = ThreadPoolExecutor(
+                        max_workers=self.region_concurrency,
+                        thread_name_prefix=f"batch-{region}"
+                    )
+                    pools[region] = pool
+                pending[pool.submit(timed, target)] = {"index": index, "region": region}
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = pending.pop(future)
+                    try:
+                        row.update(future.result())
+                    except Exception as e:
+                        row.update(success=False, error=str(e))
+                    row["finished_at_seconds"] = round(time.perf_counter() - start, 3)
+                    yield row
+        finally:
+            # Also reached when the client disconnects mid-stream
+            for pool in pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
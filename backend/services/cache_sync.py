@@ -0,0 +1,102 @@
+"""
+Cache Sync - Broadcasts cache invalidations to the other worker processes through the shared state store
+"""
+
+import itertools
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from services.shared_state import SharedStateStore, shared_state
+
+_NAMESPACE = "invalidation"
+
+# Events outlive many sync intervals so a briefly busy worker still sees them
+_EVENT_TTL_SECONDS = 60
+
+class InvalidationBus:
+    """
+    Replays invalidations made in one worker in every other worker
+
+    Caches stay in each process's memory; only the invalidation events go
+    through the shared store. Each worker applies the others' events within
+    CACHE_SYNC_INTERVAL_SECONDS. Without a store (one worker) publish does
+    nothing and the local invalidation is all there is.
+    """
+
+    def __init__(self, store: Optional[SharedStateStore] = None):
+        self.store = store
+        # Unique per process, even where PIDs repeat across containers
+        self.origin = secrets.token_hex(8)
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._seen: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.published = 0
+        self.applied = 0
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Call handler(event) for every event of this kind published by another worker"""
+        self._handlers[kind] = handler
+
+    def publish(self, kind: str, **fields: Any) -> None:
+        """Tell the other workers to repeat an invalidation this worker has already applied"""
+        if self.store is None:
+            return
+        key = f"{time.time():.6f}:{self.origin}:{next(self._sequence)}"
+        self.store.put(_NAMESPACE, key, {"origin": self.origin, "kind": kind, **fields}, _EVENT_TTL_SECONDS)
+        self.published += 1
+
+    def poll(self) -> int:
+        """
+        Apply the other workers' events not seen yet
+
+        Returns:
+            Number of events applied
+        """
+        if self.store is None:
+            return 0
+        now = time.time()
+        applied = 0
+        with self._lock:
+            for key, event in sorted(self.store.values(_NAMESPACE).items()):
+                if key in self._seen:
+                    continue
+                self._seen[key] = now
+                handler = self._handlers.get(event["kind"])
+                if event["origin"] == self.origin or handler is None:
+                    continue
+                handler(event)
+                applied += 1
+            # Events have expired from the store by now and cannot come back
+            for key in [k for k, seen in self._seen.items() if now - seen > _EVENT_TTL_SECONDS * 2]:
+                del self._seen[key]
+            self.applied += applied
+        return applied
+
+    def start(self) -> Optional[threading.Thread]:
+        """Poll every CACHE_SYNC_INTERVAL_SECONDS on a daemon thread (only with a shared store)"""
+        if self.store is None or self._thread is not None:
+            return self._thread
+
+        def run() -> None:
+            while True:
+                try:
+                    self.poll()
+                except Exception:
+                    # A busy store only delays the next sync
+                    pass
+                time.sleep(settings.CACHE_SYNC_INTERVAL_SECONDS)
+
+        self._thread = threading.Thread(target=run, name="cache-sync", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stats(self) -> Dict[str, Any]:
+        return {"shared": self.store is not None, "published": self.published, "applied": self.applied}
+
+# Shared by every cache in the process
+invalidation_bus = InvalidationBus(shared_state)
@@ -0,0 +1,171 @@
+"""
+Creation Scheduler - Bounded-concurrency execution with per-account/region rate limiting
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+from config import settings
+from utils.aws_error_codes import THROTTLE_ERROR_CODES, TRANSIENT_ERROR_CODES
+from utils.metrics import scheduler_retries
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping while the bucket is empty
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class RateLimiterRegistry:
+    """One token bucket per (account, region), shared by every request in the process"""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        # Worker processes each get an equal share of the account's mutation budget
+        self.rate = rate or settings.EC2_MUTATE_RATE_PER_SECOND / max(1, settings.WORKERS)
+        self.burst = burst or settings.EC2_MUTATE_BURST
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, account: str, region: str) -> TokenBucket:
+        key = (account, region)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[key] = bucket
+            return bucket
+
+# Shared limiter registry so concurrent requests draw from the same buckets
+rate_limiters = RateLimiterRegistry()
+
+class CreationScheduler:
+    """Runs one call per item on a bounded worker pool with throttling-aware retries"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        cap = settings.CREATE_MAX_WORKERS
+        self.max_workers = max(1, min(max_workers or cap, cap))
+        self.max_retries = settings.CREATE_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay or settings.CREATE_RETRY_BASE_DELAY
+        self.max_delay = max_delay or settings.CREATE_RETRY_MAX_DELAY
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call_with_retry(self, func: Callable[[], Any], limiter: TokenBucket) -> Any:
+        """
+        Call func under the rate limiter, retrying throttling and transient errors with jittered backoff
+
+        Every attempt takes its own token, so func must not retry internally
+        (see AWSClientPool.ec2_mutating) or its extra attempts bypass the limiter.
+
+        Returns:
+            The return value of func
+
+        Raises:
+            The last error once retries are exhausted, or any other error immediately
+        """
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                return func()
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in THROTTLE_ERROR_CODES | TRANSIENT_ERROR_CODES or attempt >= self.max_retries:
+                    raise
+                scheduler_retries.inc(code)
+            except (BotoConnectionError, HTTPClientError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                scheduler_retries.inc(type(e).__name__)
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def run_iter(
+        self,
+        items: List[Any],
+        func: Callable[[Any], Any],
+        limiter: TokenBucket
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run func(item) for every item concurrently, yielding outcomes as they finish
+
+        Yields:
+            One outcome per item with "index", "item", "value" or "error",
+            "attempts" and "duration_seconds"
+        """
+        def task(index: int, item: Any) -> Dict[str, Any]:
+            start = time.perf_counter()
+            outcome: Dict[str, Any] = {"index": index, "item": item, "value": None, "error": None, "attempts": 0}
+
+            def attempt() -> Any:
+                outcome["attempts"] += 1
+                return func(item)
+
+            try:
+                outcome["value"] = self.call_with_retry(attempt, limiter)
+            except Exception as e:
+                outcome["error"] = e
+            outcome["duration_seconds"] = round(time.perf_counter() - start, 3)
+            return outcome
+
+        if not items:
+            return
+        workers = min(self.max_workers, len(items))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vpce-create")
+        try:
+            futures = [pool.submit(task, index, item) for index, item in enumerate(items)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(
+        self,
+        items: List[Any],
+        func: Callable[[Any], Any],
+        limiter: TokenBucket
+    ) -> List[Dict[str, Any]]:
+        """
+        Run func(item) for every item concurrently
+
+        Returns:
+            One outcome per item, in input order (see run_iter)
+        """
+        return sorted(self.run_iter(items, func, limiter), key=lambda outcome: outcome["index"])
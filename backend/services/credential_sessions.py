@@ -0,0 +1,275 @@
+"""
+Credential Sessions - In-memory registry of per-user AWS credentials behind opaque session IDs
+"""
+
+import hashlib
+import json
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import boto3
+from cryptography.fernet import Fernet, InvalidToken
+
+from config import settings
+from services.aws_clients import AWSClientPool, client_pool
+from services.shared_state import SharedStateStore, shared_state
+
+_NAMESPACE = "session"
+
+# How long a worker trusts its copy of a shared session before re-checking the
+# store (revocation and idle time); last_used is written at most this often
+_SYNC_INTERVAL_SECONDS = 2
+
+@dataclass
+class CredentialSession:
+    """One user's credentials; clients for it are cached in the pool under `profile`"""
+    session_id: str
+    access_key: str
+    secret_key: str
+    session_token: Optional[str]
+    region: str
+    created_at: float
+    expires_at: float
+    last_used: float
+
+    @property
+    def profile(self) -> str:
+        # Pool key for this session's boto3 session and clients; never a real profile name.
+        # Shared sessions are "<ref>.<encrypted credentials>"; only the ref names the pool entry
+        return f"session:{self.session_id.partition('.')[0]}"
+
+    def is_expired(self, now: float) -> bool:
+        return now >= self.expires_at or now - self.last_used >= settings.SESSION_IDLE_TIMEOUT_SECONDS
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables that make the AWS CLI use these credentials"""
+        env = {
+            "AWS_ACCESS_KEY_ID": self.access_key,
+            "AWS_SECRET_ACCESS_KEY": self.secret_key,
+            "AWS_DEFAULT_REGION": self.region,
+            "AWS_REGION": self.region
+        }
+        if self.session_token:
+            env["AWS_SESSION_TOKEN"] = self.session_token
+        return env
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class SessionRegistry:
+    """
+    Hands out session IDs for credentials and keeps a pooled boto3 session per ID
+
+    With one process, sessions live in memory only. With a shared store
+    (several worker processes), the session ID the client holds carries the
+    credentials encrypted with SESSION_TOKEN_KEY, so any worker can decrypt
+    them into its own memory; the store only keeps non-secret metadata
+    (expiry, idle time, which token is current) so sessions can be ended or
+    replaced through any worker.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[AWSClientPool] = None,
+        store: Optional[SharedStateStore] = None,
+        token_key: Optional[str] = None
+    ):
+        self.pool = pool or client_pool
+        self.store = store
+        self._sessions: Dict[str, CredentialSession] = {}
+        # Shared mode: when each local session was last checked against the store
+        self._synced: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._fernet: Optional[Fernet] = None
+        if store is not None:
+            token_key = token_key or settings.SESSION_TOKEN_KEY
+            if not token_key:
+                raise RuntimeError(
+                    "SESSION_TOKEN_KEY must be set when WORKERS > 1 "
+                    "(server.py generates one for its workers)"
+                )
+            self._fernet = Fernet(token_key.encode())
+
+    def _boto3_session(self, session: CredentialSession) -> boto3.Session:
+        return boto3.Session(
+            aws_access_key_id=session.access_key,
+            aws_secret_access_key=session.secret_key,
+            aws_session_token=session.session_token,
+            region_name=session.region
+        )
+
+    def _register(self, session: CredentialSession) -> None:
+        self.pool.invalidate(session.profile)
+        self.pool.register_session(session.profile, self._boto3_session(session))
+
+    def create(
+        self,
+        access_key: str,
+        secret_key: str,
+        region: str,
+        session_token: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> CredentialSession:
+        """
+        Register credentials and return their session
+
+        Passing the session_id of a live session replaces its credentials
+        (e.g. refreshed temporary credentials) and drops its cached clients.
+        With a shared store the returned session_id changes and the old one
+        stops working.
+        """
+        now = time.time()
+        ttl = settings.SESSION_TTL_SECONDS
+        if session_token:
+            # Temporary credentials expire on their own; do not keep them around longer
+            ttl = min(ttl, settings.SESSION_TEMPORARY_TTL_SECONDS)
+        if session_id is not None and self.get(session_id) is None:
+            session_id = None
+        ref = session_id.partition(".")[0] if session_id else secrets.token_urlsafe(32)
+        session = CredentialSession(
+            session_id=ref,
+            access_key=access_key,
+            secret_key=secret_key,
+            session_token=session_token or None,
+            region=region,
+            created_at=now,
+            expires_at=now + ttl,
+            last_used=now
+        )
+        if self.store is not None:
+            session.session_id = f"{ref}.{self._seal(session)}"
+            self.store.purge()
+            self.store.put(_NAMESPACE, ref, {
+                "token_digest": _digest(session.session_id),
+                "expires_at": session.expires_at,
+                "last_used": now
+            }, ttl)
+        with self._lock:
+            self._purge(now)
+            self._sessions[ref] = session
+            self._synced[ref] = now
+        self._register(session)
+        return session
+
+    def _seal(self, session: CredentialSession) -> str:
+        """Encrypt the credentials into the token half of a shared session ID"""
+        payload = [
+            session.access_key, session.secret_key, session.session_token,
+            session.region, session.created_at, session.expires_at
+        ]
+        return self._fernet.encrypt(json.dumps(payload).encode()).decode()
+
+    def _open(self, session_id: str, last_used: float) -> Optional[CredentialSession]:
+        """Decrypt a shared session ID; None when it was not issued with this key"""
+        token = session_id.partition(".")[2]
+        try:
+            payload = json.loads(self._fernet.decrypt(token.encode()))
+        except (InvalidToken, ValueError):
+            return None
+        access_key, secret_key, session_token, region, created_at, expires_at = payload
+        return CredentialSession(
+            session_id, access_key, secret_key, session_token, region, created_at, expires_at, last_used
+        )
+
+    def get(self, session_id: str) -> Optional[CredentialSession]:
+        """Return a live session (refreshing its idle timer), or None when unknown or expired"""
+        now = time.time()
+        if self.store is not None:
+            return self._get_shared(session_id, now)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session.is_expired(now):
+                del self._sessions[session_id]
+                expired = session
+                session = None
+            else:
+                session.last_used = now
+        if session is None:
+            self.pool.invalidate(expired.profile)
+        return session
+
+    def _forget(self, ref: str) -> None:
+        with self._lock:
+            local = self._sessions.pop(ref, None)
+            self._synced.pop(ref, None)
+        if local is not None:
+            self.pool.invalidate(local.profile)
+
+    def _get_shared(self, session_id: str, now: float) -> Optional[CredentialSession]:
+        ref = session_id.partition(".")[0]
+        with self._lock:
+            local = self._sessions.get(ref)
+            if local is not None and local.session_id != session_id:
+                local = None
+            if local is not None and now - self._synced.get(ref, 0) < _SYNC_INTERVAL_SECONDS:
+                # Served from memory; the store is consulted at most once per interval
+                if local.is_expired(now):
+                    local = None
+                else:
+                    local.last_used = now
+                    return local
+
+        meta = self.store.get(_NAMESPACE, ref)
+        if meta is None or meta["token_digest"] != _digest(session_id):
+            # Ended, expired or replaced through some worker
+            self._forget(ref)
+            return None
+        last_used = max(meta["last_used"], local.last_used if local is not None else 0)
+        session = local
+        if session is None:
+            session = self._open(session_id, last_used)
+            if session is None:
+                return None
+        session.last_used = last_used
+        if session.is_expired(now):
+            self.store.delete(_NAMESPACE, ref)
+            self._forget(ref)
+            return None
+        session.last_used = now
+        self.store.update(_NAMESPACE, ref, {"last_used": now})
+        with self._lock:
+            previous = self._sessions.get(ref)
+            self._sessions[ref] = session
+            self._synced[ref] = now
+        if previous is not session:
+            # First use in this process, or the credentials were replaced through another worker
+            self._register(session)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        ref = session_id.partition(".")[0]
+        with self._lock:
+            session = self._sessions.get(ref)
+            if session is not None and session.session_id == session_id:
+                del self._sessions[ref]
+                self._synced.pop(ref, None)
+            else:
+                # An ID replaced since it was issued no longer names the session
+                session = None
+        deleted = session is not None
+        if self.store is not None:
+            meta = self.store.get(_NAMESPACE, ref)
+            if meta is not None and meta["token_digest"] == _digest(session_id):
+                deleted = self.store.delete(_NAMESPACE, ref) or deleted
+        if not deleted:
+            return False
+        self.pool.invalidate(f"session:{ref}")
+        return True
+
+    def _purge(self, now: float) -> None:
+        # Caller holds the lock; drops expired sessions so abandoned ones do not accumulate
+        for ref in [ref for ref, s in self._sessions.items() if s.is_expired(now)]:
+            self._synced.pop(ref, None)
+            self.pool.invalidate(self._sessions.pop(ref).profile)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"active_sessions": len(self._sessions), "shared": self.store is not None}
+
+# Shared by every request in the process (and across workers through shared_state)
+session_registry = SessionRegistry(store=shared_state)
@@ -0,0 +1,611 @@
+"""
+Emitters - Render an EndpointSpec as PowerShell, Bash, Python/boto3, CloudFormation or Terraform
+
+Every emitter works from the same parsed EndpointSpec, so adding a service
+adds one data row to each output rather than another formatted block.
+"""
+
+import json
+import shlex
+from string import Template
+from typing import Dict, List, Optional
+
+from services.endpoint_planner import INACTIVE_STATES
+from services.endpoint_spec import EndpointSpec
+
+class _PSTemplate(Template):
+    """string.Template with a delimiter that cannot clash with PowerShell's $ and @"""
+    delimiter = "%%"
+
+# Compiled once at import; rendered with substitute() per request
+_SCRIPT_TEMPLATE = _PSTemplate("""# AWS VPC Endpoint Generation Script
+# Generated by AWS VPC Endpoint Generator
+# Endpoint Type: %%endpoint_type
+# VPC ID: %%vpc_id
+# Region: %%region
+# Services: %%service_count
+
+$ErrorActionPreference = "Stop"
+
+$vpcId        = %%vpc_id_literal
+$region       = %%region_literal
+$endpointType = %%endpoint_type_literal
+
+# Arguments shared by every endpoint
+$commonArgs = @('ec2', 'create-vpc-endpoint', '--vpc-id', $vpcId, '--vpc-endpoint-type', $endpointType, '--region', $region, '--output', 'json')
+%%type_args
+# One row per service
+$services = @(
+%%service_rows
+)
+%%existing_lookup
+foreach ($svc in $services) {
+%%skip_check    Write-Host "Creating VPC Endpoint for $($svc.service)..." -ForegroundColor Green
+
+    try {
+        $tagSpec = "ResourceType=vpc-endpoint,Tags=[{Key=Name,Value=$($svc.tag)}]"
+
+        Write-Host "Executing endpoint creation..." -ForegroundColor Yellow
+        $output = & aws @commonArgs --service-name $svc.service --tag-specifications $tagSpec 2>&1 | Out-String
+
+        # Display raw output for debugging
+        Write-Host "Raw AWS Response:" -ForegroundColor Gray
+        Write-Host $output -ForegroundColor Gray
+
+        # Check if output is empty
+        if ([string]::IsNullOrWhiteSpace($output)) {
+            Write-Host "[FAIL] $($svc.service): AWS CLI returned no output" -ForegroundColor Red
+            exit 1
+        }
+
+        # Parse the output
+        $result = $null
+        try {
+            $result = $output | ConvertFrom-Json
+        } catch {
+            Write-Host "[FAIL] $($svc.service): Failed to parse AWS response as JSON" -ForegroundColor Red
+            Write-Host "Error: $($_.Exception.Message)" -ForegroundColor Red
+            exit 1
+        }
+
+        # Check if AWS returned an error in the response
+        if ($null -eq $result -or $result.Error -or $result.Errors) {
+            Write-Host "[FAIL] $($svc.service): AWS API Error" -ForegroundColor Red
+            if ($result.Error) {
+                Write-Host "Code: $($result.Error.Code)" -ForegroundColor Red
+                Write-Host "Message: $($result.Error.Message)" -ForegroundColor Red
+            } elseif ($result.Errors) {
+                Write-Host ($result.Errors | ConvertTo-Json) -ForegroundColor Red
+            }
+            exit 1
+        }
+
+        # Check for successful response
+        if ($result.VpcEndpoint -and $result.VpcEndpoint.VpcEndpointId) {
+            Write-Host "[OK] $($svc.service): Endpoint created successfully" -ForegroundColor Green
+            Write-Host "ID: $($result.VpcEndpoint.VpcEndpointId)" -ForegroundColor Cyan
+            Write-Host "State: $($result.VpcEndpoint.State)" -ForegroundColor Cyan
+        } else {
+            Write-Host "[FAIL] $($svc.service): Unexpected response - VpcEndpoint not found" -ForegroundColor Red
+            Write-Host ($result | ConvertTo-Json -Depth 3) -ForegroundColor Red
+            exit 1
+        }
+    }
+    catch {
+        Write-Host "[FAIL] $($svc.service): Failed to create endpoint" -ForegroundColor Red
+        Write-Host $_.Exception.Message -ForegroundColor Red
+        Write-Host $_.ScriptStackTrace -ForegroundColor Red
+        exit 1
+    }
+}
+""")
+
+_SERVICE_ROW = _PSTemplate("    @{ service = %%service; tag = %%tag }")
+
+_INTERFACE_ARGS = _PSTemplate("""$commonArgs += @('--subnet-ids') + @(%%subnets)
+$commonArgs += @('--security-group-ids') + @(%%security_groups)
+$commonArgs += '%%private_dns_flag'
+""")
+
+_GATEWAY_ARGS = _PSTemplate("""$commonArgs += @('--route-table-ids') + @(%%route_tables)
+""")
+
+# Route tables are looked up once for the whole script, not once per service
+_GATEWAY_ALL_ROUTE_TABLES_ARGS = """# Query all route tables in the VPC
+$routeTables = aws ec2 describe-route-tables --filters "Name=vpc-id,Values=$vpcId" --region $region --query "RouteTables[].RouteTableId" --output json | Out-String | ConvertFrom-Json
+if ($routeTables) {
+    $commonArgs += @('--route-table-ids') + @($routeTables)
+}
+"""
+
+# JMESPath filter for endpoints that already exist: same type, still active
+_EXISTING_QUERY = (
+    "VpcEndpoints[?VpcEndpointType=='{endpoint_type}' && !contains([{states}], State)]"
+    ".[ServiceName,VpcEndpointId]"
+)
+
+def _existing_query(endpoint_type: str) -> str:
+    states = ",".join(f"'{state}'" for state in sorted(INACTIVE_STATES))
+    return _EXISTING_QUERY.format(endpoint_type=endpoint_type, states=states)
+
+# Existing endpoints are looked up once for the whole script
+_PS_EXISTING_LOOKUP = _PSTemplate("""
+# Endpoints that already exist in the VPC are skipped, so re-runs only create what is missing
+$existing = @{}
+$existingRows = & aws ec2 describe-vpc-endpoints --filters "Name=vpc-id,Values=$vpcId" --region $region --query %%query --output text
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "Failed to list existing VPC endpoints" -ForegroundColor Red
+    exit 1
+}
+foreach ($row in @($existingRows)) {
+    $fields = "$row".Trim() -split '\\s+'
+    if ($fields.Length -ge 2) { $existing[$fields[0]] = $fields[1] }
+}
+""")
+
+_PS_SKIP_CHECK = """    if ($existing.ContainsKey($svc.service)) {
+        Write-Host "[SKIP] $($svc.service): Endpoint already exists ($($existing[$svc.service]))" -ForegroundColor Yellow
+        continue
+    }
+
+"""
+
+def _ps_literal(value: str) -> str:
+    """Quote a value as a single-quoted PowerShell string (no interpolation)"""
+    return "'" + value.replace("'", "''") + "'"
+
+def _ps_comment(value: str) -> str:
+    """Keep a value on its comment line"""
+    return value.replace("\r", " ").replace("\n", " ")
+
+def _ps_list(values: Optional[List[str]]) -> str:
+    return ", ".join(_ps_literal(v) for v in values or [])
+
+class ScriptEmitter:
+    """Base class: one output format for an EndpointSpec"""
+
+    format = ""
+    file_extension = ""
+
+    def file_name(self) -> str:
+        return f"vpc-endpoint-script{self.file_extension}"
+
+    def emit(self, spec: EndpointSpec) -> str:
+        raise NotImplementedError
+
+class PowerShellEmitter(ScriptEmitter):
+    """PowerShell script calling the AWS CLI, looping over one row per service"""
+
+    format = "powershell"
+    file_extension = ".ps1"
+
+    def _type_args(self, spec: EndpointSpec) -> str:
+        if spec.is_interface:
+            return _INTERFACE_ARGS.substitute(
+                subnets=_ps_list(spec.subnets),
+                security_groups=_ps_list(spec.security_groups),
+                private_dns_flag="--private-dns-enabled" if spec.private_dns_enabled else "--no-private-dns-enabled"
+            )
+        if spec.is_gateway:
+            if spec.select_all_route_tables:
+                # Don't query AWS during generation - will be queried at execution time
+                # This avoids credential expiration issues during script generation
+                return _GATEWAY_ALL_ROUTE_TABLES_ARGS
+            if spec.route_tables:
+                return _GATEWAY_ARGS.substitute(route_tables=_ps_list(spec.route_tables))
+        return ""
+
+    def emit(self, spec: EndpointSpec) -> str:
+        rows = "\n".join(
+            _SERVICE_ROW.substitute(service=_ps_literal(s.service_name), tag=_ps_literal(s.tag_name))
+            for s in spec.services
+        )
+        return _SCRIPT_TEMPLATE.substitute(
+            endpoint_type=_ps_comment(spec.endpoint_type),
+            vpc_id=_ps_comment(spec.vpc_id),
+            region=_ps_comment(spec.region),
+            service_count=len(spec.services),
+            vpc_id_literal=_ps_literal(spec.vpc_id),
+            region_literal=_ps_literal(spec.region),
+            endpoint_type_literal=_ps_literal(spec.endpoint_type),
+            type_args=self._type_args(spec),
+            service_rows=rows,
+            existing_lookup=(
+                _PS_EXISTING_LOOKUP.substitute(query=_ps_literal(_existing_query(spec.endpoint_type)))
+                if spec.skip_existing else ""
+            ),
+            skip_check=_PS_SKIP_CHECK if spec.skip_existing else ""
+        )
+
+_BASH_TEMPLATE = Template("""#!/usr/bin/env bash
+# AWS VPC Endpoint Generation Script
+# Generated by AWS VPC Endpoint Generator
+# Endpoint Type: ${endpoint_type}
+# VPC ID: ${vpc_id}
+# Region: ${region}
+# Services: ${service_count}
+
+set -euo pipefail
+
+VPC_ID=${vpc_id_literal}
+REGION=${region_literal}
+
+# Arguments shared by every endpoint
+COMMON_ARGS=(--vpc-id "$$VPC_ID" --vpc-endpoint-type ${endpoint_type_literal} --region "$$REGION")
+${type_args}
+# One row per service (SERVICES[i] is tagged TAGS[i])
+SERVICES=(
+${service_rows}
+)
+TAGS=(
+${tag_rows}
+)
+${existing_lookup}
+for i in "$${!SERVICES[@]}"; do
+    service="$${SERVICES[$$i]}"
+    tag="$${TAGS[$$i]}"
+${skip_check}    echo "Creating VPC Endpoint for $$service..."
+
+    if output=$$(aws ec2 create-vpc-endpoint "$${COMMON_ARGS[@]}" \\
+            --service-name "$$service" \\
+            --tag-specifications "ResourceType=vpc-endpoint,Tags=[{Key=Name,Value=$$tag}]" \\
+            --query 'VpcEndpoint.[VpcEndpointId,State]' --output text 2>&1); then
+        read -r endpoint_id state <<< "$$output"
+        echo "[OK] $$service: Endpoint created successfully"
+        echo "ID: $$endpoint_id"
+        echo "State: $$state"
+    else
+        echo "[FAIL] $$service: Failed to create endpoint"
+        echo "$$output"
+        exit 1
+    fi
+done
+""")
+
+_BASH_ALL_ROUTE_TABLES_ARGS = """# Query all route tables in the VPC
+ROUTE_TABLES=$(aws ec2 describe-route-tables --filters "Name=vpc-id,Values=$VPC_ID" --region "$REGION" \\
+    --query "RouteTables[].RouteTableId" --output text)
+if [ -n "$ROUTE_TABLES" ]; then
+    read -r -a ROUTE_TABLE_IDS <<< "$ROUTE_TABLES"
+    COMMON_ARGS+=(--route-table-ids "${ROUTE_TABLE_IDS[@]}")
+fi
+"""
+
+_BASH_EXISTING_LOOKUP = Template("""
+# Endpoints that already exist in the VPC are skipped, so re-runs only create what is missing
+declare -A EXISTING=()
+EXISTING_ROWS=$$(aws ec2 describe-vpc-endpoints --filters "Name=vpc-id,Values=$$VPC_ID" --region "$$REGION" \\
+    --query ${query} --output text)
+while read -r existing_service existing_id; do
+    if [ -n "$$existing_service" ]; then
+        EXISTING["$$existing_service"]="$$existing_id"
+    fi
+done <<< "$$EXISTING_ROWS"
+""")
+
+_BASH_SKIP_CHECK = """    if [ -n "${EXISTING[$service]:-}" ]; then
+        echo "[SKIP] $service: Endpoint already exists (${EXISTING[$service]})"
+        continue
+    fi
+
+"""
+
+def _sh_double_quote(value: str) -> str:
+    """Double-quote a value that needs no expansion, so embedded single quotes stay readable"""
+    if any(ch in value for ch in '"$`\\'):
+        return shlex.quote(value)
+    return f'"{value}"'
+
+def _sh_list(values) -> str:
+    return " ".join(shlex.quote(v) for v in values)
+
+class BashEmitter(ScriptEmitter):
+    """Bash script calling the AWS CLI, for Linux runners"""
+
+    format = "bash"
+    file_extension = ".sh"
+
+    def _type_args(self, spec: EndpointSpec) -> str:
+        if spec.is_interface:
+            dns_flag = "--private-dns-enabled" if spec.private_dns_enabled else "--no-private-dns-enabled"
+            return (
+                f"COMMON_ARGS+=(--subnet-ids {_sh_list(spec.subnets)})\n"
+                f"COMMON_ARGS+=(--security-group-ids {_sh_list(spec.security_groups)})\n"
+                f"COMMON_ARGS+=({dns_flag})\n"
+            )
+        if spec.is_gateway:
+            if spec.select_all_route_tables:
+                return _BASH_ALL_ROUTE_TABLES_ARGS
+            if spec.route_tables:
+                return f"COMMON_ARGS+=(--route-table-ids {_sh_list(spec.route_tables)})\n"
+        return ""
+
+    def emit(self, spec: EndpointSpec) -> str:
+        return _BASH_TEMPLATE.substitute(
+            endpoint_type=_ps_comment(spec.endpoint_type),
+            vpc_id=_ps_comment(spec.vpc_id),
+            region=_ps_comment(spec.region),
+            service_count=len(spec.services),
+            vpc_id_literal=shlex.quote(spec.vpc_id),
+            region_literal=shlex.quote(spec.region),
+            endpoint_type_literal=shlex.quote(spec.endpoint_type),
+            type_args=self._type_args(spec),
+            service_rows="\n".join(f"    {shlex.quote(s.service_name)}" for s in spec.services),
+            tag_rows="\n".join(f"    {shlex.quote(s.tag_name)}" for s in spec.services),
+            existing_lookup=(
+                _BASH_EXISTING_LOOKUP.substitute(query=_sh_double_quote(_existing_query(spec.endpoint_type)))
+                if spec.skip_existing else ""
+            ),
+            skip_check=_BASH_SKIP_CHECK if spec.skip_existing else ""
+        )
+
+_PYTHON_TEMPLATE = Template('''#!/usr/bin/env python3
+"""
+AWS VPC Endpoint Generation Script
+Generated by AWS VPC Endpoint Generator
+Endpoint Type: ${endpoint_type}
+VPC ID: ${vpc_id}
+Region: ${region}
+Services: ${service_count}
+
+Requires boto3 and AWS credentials in the environment.
+"""
+
+import sys
+
+import boto3
+
+REGION = ${region_literal}
+VPC_ID = ${vpc_id_literal}
+SELECT_ALL_ROUTE_TABLES = ${select_all_route_tables}
+SKIP_EXISTING = ${skip_existing}
+
+# Endpoints in these states no longer count as existing
+INACTIVE_STATES = ${inactive_states}
+
+# Arguments shared by every endpoint
+COMMON_PARAMS = ${common_params}
+
+# One row per service: (service name, Name tag)
+SERVICES = [
+${service_rows}
+]
+
+
+def main() -> int:
+    ec2 = boto3.client("ec2", region_name=REGION)
+    params = dict(COMMON_PARAMS)
+
+    if SELECT_ALL_ROUTE_TABLES:
+        # Query all route tables in the VPC once for every service
+        route_tables = []
+        paginator = ec2.get_paginator("describe_route_tables")
+        for page in paginator.paginate(Filters=[{"Name": "vpc-id", "Values": [VPC_ID]}]):
+            route_tables.extend(rt["RouteTableId"] for rt in page["RouteTables"])
+        if route_tables:
+            params["RouteTableIds"] = route_tables
+
+    existing = {}
+    if SKIP_EXISTING:
+        # Endpoints that already exist in the VPC are skipped, so re-runs only create what is missing
+        paginator = ec2.get_paginator("describe_vpc_endpoints")
+        for page in paginator.paginate(Filters=[{"Name": "vpc-id", "Values": [VPC_ID]}]):
+            for endpoint in page["VpcEndpoints"]:
+                if (endpoint["VpcEndpointType"].lower() == params["VpcEndpointType"].lower()
+                        and endpoint["State"].lower() not in INACTIVE_STATES):
+                    existing[endpoint["ServiceName"]] = endpoint["VpcEndpointId"]
+
+    for service, tag in SERVICES:
+        if service in existing:
+            print(f"[SKIP] {service}: Endpoint already exists ({existing[service]})")
+            continue
+        print(f"Creating VPC Endpoint for {service}...")
+        try:
+            endpoint = ec2.create_vpc_endpoint(
+                ServiceName=service,
+                TagSpecifications=[{"ResourceType": "vpc-endpoint", "Tags": [{"Key": "Name", "Value": tag}]}],
+                **params
+            )["VpcEndpoint"]
+        except Exception as e:
+            print(f"[FAIL] {service}: Failed to create endpoint")
+            print(e)
+            return 1
+        print(f"[OK] {service}: Endpoint created successfully")
+        print(f"ID: {endpoint['VpcEndpointId']}")
+        print(f"State: {endpoint['State']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+''')
+
+class Boto3Emitter(ScriptEmitter):
+    """Standalone Python script using boto3"""
+
+    format = "python"
+    file_extension = ".py"
+
+    def _common_params(self, spec: EndpointSpec) -> Dict[str, object]:
+        params: Dict[str, object] = {"VpcId": spec.vpc_id, "VpcEndpointType": spec.endpoint_type}
+        if spec.is_interface:
+            params["SubnetIds"] = list(spec.subnets)
+            params["SecurityGroupIds"] = list(spec.security_groups)
+            params["PrivateDnsEnabled"] = spec.private_dns_enabled
+        elif spec.route_tables:
+            params["RouteTableIds"] = list(spec.route_tables)
+        return params
+
+    def emit(self, spec: EndpointSpec) -> str:
+        return _PYTHON_TEMPLATE.substitute(
+            endpoint_type=_ps_comment(spec.endpoint_type),
+            vpc_id=_ps_comment(spec.vpc_id),
+            region=_ps_comment(spec.region),
+            service_count=len(spec.services),
+            region_literal=repr(spec.region),
+            vpc_id_literal=repr(spec.vpc_id),
+            select_all_route_tables=repr(spec.select_all_route_tables),
+            skip_existing=repr(spec.skip_existing),
+            inactive_states=repr(sorted(INACTIVE_STATES)),
+            common_params=repr(self._common_params(spec)),
+            service_rows="\n".join(f"    ({s.service_name!r}, {s.tag_name!r})," for s in spec.services)
+        )
+
+def _logical_id(index: int, short_name: str) -> str:
+    """CloudFormation logical IDs must be alphanumeric"""
+    cleaned = "".join(ch for ch in short_name.title() if ch.isalnum())
+    return f"Endpoint{index}{cleaned}"
+
+class CloudFormationEmitter(ScriptEmitter):
+    """CloudFormation template (JSON) with one AWS::EC2::VPCEndpoint per service"""
+
+    format = "cloudformation"
+    file_extension = ".json"
+
+    def emit(self, spec: EndpointSpec) -> str:
+        template: Dict[str, object] = {
+            "AWSTemplateFormatVersion": "2010-09-09",
+            "Description": (
+                f"VPC endpoints for {spec.vpc_id} ({spec.endpoint_type}, {len(spec.services)} services) "
+                f"- generated by AWS VPC Endpoint Generator"
+            )
+        }
+        parameters: Dict[str, object] = {}
+        common: Dict[str, object] = {"VpcId": spec.vpc_id, "VpcEndpointType": spec.endpoint_type}
+        if spec.is_interface:
+            common["SubnetIds"] = list(spec.subnets)
+            common["SecurityGroupIds"] = list(spec.security_groups)
+            common["PrivateDnsEnabled"] = spec.private_dns_enabled
+        elif spec.select_all_route_tables:
+            # CloudFormation cannot look route tables up, so the caller supplies them
+            parameters["RouteTableIds"] = {
+                "Type": "List<String>",
+                "Description": f"All route table IDs in {spec.vpc_id}"
+            }
+            common["RouteTableIds"] = {"Ref": "RouteTableIds"}
+        elif spec.route_tables:
+            common["RouteTableIds"] = list(spec.route_tables)
+
+        resources: Dict[str, object] = {}
+        outputs: Dict[str, object] = {}
+        for index, service in enumerate(spec.services):
+            logical_id = _logical_id(index, service.short_name)
+            resources[logical_id] = {
+                "Type": "AWS::EC2::VPCEndpoint",
+                "Properties": {
+                    **common,
+                    "ServiceName": service.service_name,
+                    "Tags": [{"Key": "Name", "Value": service.tag_name}]
+                }
+            }
+            outputs[logical_id] = {"Value": {"Ref": logical_id}, "Description": service.service_name}
+
+        if parameters:
+            template["Parameters"] = parameters
+        template["Resources"] = resources
+        template["Outputs"] = outputs
+        return json.dumps(template, indent=2) + "\n"
+
+def _hcl_string(value: str) -> str:
+    """JSON string escaping plus Terraform's template sequences"""
+    return json.dumps(value).replace("${", "$${").replace("%{", "%%{")
+
+def _hcl_list(values) -> str:
+    return "[" + ", ".join(_hcl_string(v) for v in values) + "]"
+
+class TerraformEmitter(ScriptEmitter):
+    """Terraform configuration with one for_each aws_vpc_endpoint resource"""
+
+    format = "terraform"
+    file_extension = ".tf"
+
+    def emit(self, spec: EndpointSpec) -> str:
+        lines: List[str] = [
+            "# AWS VPC Endpoint Generation Script",
+            "# Generated by AWS VPC Endpoint Generator",
+            f"# Endpoint Type: {_ps_comment(spec.endpoint_type)}",
+            f"# VPC ID: {_ps_comment(spec.vpc_id)}",
+            f"# Region: {_ps_comment(spec.region)}",
+            f"# Services: {len(spec.services)}",
+            "",
+            "terraform {",
+            "  required_providers {",
+            "    aws = {",
+            '      source = "hashicorp/aws"',
+            "    }",
+            "  }",
+            "}",
+            "",
+            'provider "aws" {',
+            f"  region = {_hcl_string(spec.region)}",
+            "}",
+            "",
+            "locals {",
+            f"  vpc_id = {_hcl_string(spec.vpc_id)}",
+            "",
+            "  # One row per service",
+            "  services = {",
+        ]
+        keys = [_hcl_string(s.service_name) for s in spec.services]
+        width = max((len(key) for key in keys), default=0)
+        lines.extend(
+            f"    {key.ljust(width)} = {_hcl_string(s.tag_name)}"
+            for key, s in zip(keys, spec.services)
+        )
+        lines.extend(["  }", "}", ""])
+
+        if spec.select_all_route_tables:
+            lines.extend([
+                'data "aws_route_tables" "all" {',
+                "  vpc_id = local.vpc_id",
+                "}",
+                "",
+            ])
+
+        attributes: List[tuple] = [
+            ("vpc_id", "local.vpc_id"),
+            ("service_name", "each.key"),
+            ("vpc_endpoint_type", _hcl_string(spec.endpoint_type)),
+        ]
+        if spec.is_interface:
+            attributes.extend([
+                ("subnet_ids", _hcl_list(spec.subnets)),
+                ("security_group_ids", _hcl_list(spec.security_groups)),
+                ("private_dns_enabled", "true" if spec.private_dns_enabled else "false"),
+            ])
+        elif spec.select_all_route_tables:
+            attributes.append(("route_table_ids", "data.aws_route_tables.all.ids"))
+        elif spec.route_tables:
+            attributes.append(("route_table_ids", _hcl_list(spec.route_tables)))
+        # Align "=" like terraform fmt
+        width = max(len(name) for name, _ in attributes)
+        lines.extend(['resource "aws_vpc_endpoint" "this" {', "  for_each = local.services", ""])
+        lines.extend(f"  {name.ljust(width)} = {value}" for name, value in attributes)
+        lines.extend([
+            "",
+            "  tags = {",
+            "    Name = each.value",
+            "  }",
+            "}",
+            "",
+            'output "vpc_endpoint_ids" {',
+            "  value = { for service, endpoint in aws_vpc_endpoint.this : service => endpoint.id }",
+            "}",
+        ])
+        return "\n".join(lines) + "\n"
+
+# Registry of output formats selectable through /api/generate's "format" field
+EMITTERS: Dict[str, ScriptEmitter] = {
+    emitter.format: emitter
+    for emitter in (
+        PowerShellEmitter(),
+        BashEmitter(),
+        Boto3Emitter(),
+        CloudFormationEmitter(),
+        TerraformEmitter(),
+    )
+}
+
+def get_emitter(output_format: str) -> Optional[ScriptEmitter]:
+    """Look up an emitter by format name (case-insensitive)"""
+    return EMITTERS.get((output_format or "").lower())
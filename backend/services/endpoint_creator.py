@@ -0,0 +1,181 @@
+"""
+Endpoint Creator - Creates VPC endpoints in-process without PowerShell or the AWS CLI
+"""
+
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+from services.aws_service import AWSService
+from services.creation_scheduler import CreationScheduler, rate_limiters
+from services.endpoint_planner import CREATE, EndpointPlanner
+from utils.metrics import span
+from utils.naming import build_tag_name
+
+class EndpointCreator:
+    """Creates VPC endpoints directly through the pooled EC2 client"""
+
+    def __init__(
+        self,
+        aws_service: Optional[AWSService] = None,
+        scheduler: Optional[CreationScheduler] = None
+    ):
+        self.aws_service = aws_service or AWSService()
+        self.scheduler = scheduler or CreationScheduler()
+        self.planner = EndpointPlanner(self.aws_service)
+
+    def _result_row(self, outcome: Dict[str, Any], tag_name: str) -> Dict[str, Any]:
+        """Turn a scheduler outcome into a per-service result row"""
+        result: Dict[str, Any] = {
+            "service_name": outcome["item"],
+            "tag_name": tag_name,
+            "action": CREATE,
+            "success": False,
+            "endpoint_id": None,
+            "state": None,
+            "error_code": None,
+            "error_message": None,
+            "attempts": outcome["attempts"],
+            "duration_seconds": outcome["duration_seconds"],
+            "changes": None
+        }
+        error = outcome["error"]
+        if error is None:
+            endpoint = outcome["value"]
+            result.update(
+                success=True,
+                endpoint_id=endpoint.get("VpcEndpointId"),
+                state=endpoint.get("State")
+            )
+        elif isinstance(error, ClientError):
+            details = error.response.get("Error", {})
+            result.update(error_code=details.get("Code"), error_message=details.get("Message", str(error)))
+        else:
+            # BotoCoreError, or anything unexpected (e.g. a malformed response): the
+            # service fails on its own and the remaining services still run
+            result.update(error_code=type(error).__name__, error_message=str(error))
+        return result
+
+    def _existing_row(self, entry: Dict[str, Any], tag_name: str) -> Dict[str, Any]:
+        """Result row for a service whose endpoint already exists (plan action skip/modify)"""
+        return {
+            "service_name": entry["service_name"],
+            "tag_name": tag_name,
+            "action": entry["action"],
+            "success": True,
+            "endpoint_id": entry["endpoint_id"],
+            "state": entry["state"],
+            "error_code": None,
+            "error_message": None,
+            "attempts": 0,
+            "duration_seconds": 0.0,
+            "changes": entry["changes"]
+        }
+
+    def iter_create_endpoints(
+        self,
+        endpoint_type: str,
+        region: str,
+        vpc_id: str,
+        service_names: List[str],
+        tag_prefix: Optional[str] = None,
+        tag_suffix: Optional[str] = None,
+        subnets: Optional[List[str]] = None,
+        security_groups: Optional[List[str]] = None,
+        private_dns_enabled: bool = True,
+        route_tables: Optional[List[str]] = None,
+        select_all_route_tables: bool = False,
+        skip_existing: bool = False,
+        subnets_by_service: Optional[Dict[str, List[str]]] = None,
+        existing: Optional[Dict[tuple, Dict[str, Any]]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Create one VPC endpoint per service concurrently, yielding each result as it finishes
+
+        Calls share the per-account/region token bucket and are retried with
+        jittered backoff on RequestLimitExceeded. Unlike the generated script,
+        a failure for one service does not stop the remaining services.
+
+        With skip_existing, the VPC's current endpoints are fetched once and
+        services that already have one are reported (action "skip", or
+        "modify" with the missing settings) instead of created again. Pass
+        existing, the VPC's entry from EndpointPlanner.existing_endpoints(),
+        to reuse a lookup shared with other requests.
+
+        subnets_by_service overrides subnets for individual services, e.g. to
+        leave out subnets in AZs a service is not offered in.
+
+        Yields:
+            Per-service results (action, endpoint_id, state, error_code, duration_seconds)
+            with "index" giving the service's position in service_names
+        """
+        if endpoint_type.lower() == "gateway" and select_all_route_tables:
+            # Resolve once for the whole request rather than once per service
+            route_tables = self.aws_service.describe_route_tables(vpc_id, region)
+
+        tag_names = {name: build_tag_name(name, tag_prefix, tag_suffix) for name in service_names}
+        positions = {name: index for index, name in enumerate(service_names)}
+
+        to_create = list(service_names)
+        if skip_existing:
+            plan = self.planner.plan(
+                endpoint_type=endpoint_type,
+                region=region,
+                vpc_id=vpc_id,
+                service_names=service_names,
+                subnets=subnets,
+                security_groups=security_groups,
+                private_dns_enabled=private_dns_enabled,
+                route_tables=route_tables,
+                existing=existing,
+                subnets_by_service=subnets_by_service
+            )
+            to_create = [entry["service_name"] for entry in plan if entry["action"] == CREATE]
+            for entry in plan:
+                if entry["action"] != CREATE:
+                    name = entry["service_name"]
+                    yield {"index": positions[name], **self._existing_row(entry, tag_names[name])}
+        limiter = rate_limiters.get(self.aws_service.get_account_id(region), region)
+        # One token per service, reused by the scheduler's retries so a retried create cannot duplicate it
+        client_tokens = {name: str(uuid.uuid4()) for name in to_create}
+
+        def create(service_name: str) -> Dict[str, Any]:
+            with span("create_endpoint"):
+                return self.aws_service.create_vpc_endpoint(
+                    endpoint_type=endpoint_type,
+                    region=region,
+                    vpc_id=vpc_id,
+                    service_name=service_name,
+                    tag_name=tag_names[service_name],
+                    subnets=(subnets_by_service or {}).get(service_name, subnets),
+                    security_groups=security_groups,
+                    private_dns_enabled=private_dns_enabled,
+                    route_tables=route_tables,
+                    client_token=client_tokens[service_name]
+                )
+
+        for outcome in self.scheduler.run_iter(to_create, create, limiter):
+            name = outcome["item"]
+            yield {"index": positions[name], **self._result_row(outcome, tag_names[name])}
+
+    def create_endpoints(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Create one VPC endpoint per service and collect the results
+
+        Takes the same arguments as iter_create_endpoints.
+
+        Returns:
+            Dictionary with per-service "results" in request order,
+            "wall_clock_seconds" and "max_workers"
+        """
+        start = time.perf_counter()
+        results = sorted(self.iter_create_endpoints(**kwargs), key=lambda result: result["index"])
+        for result in results:
+            del result["index"]
+        return {
+            "results": results,
+            "wall_clock_seconds": round(time.perf_counter() - start, 3),
+            "max_workers": self.scheduler.max_workers
+        }
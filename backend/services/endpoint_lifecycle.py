@@ -0,0 +1,313 @@
+"""
+Endpoint Lifecycle - Bulk delete, modify and retag of existing VPC endpoints
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from config import settings
+from services.aws_service import AWSService
+from services.creation_scheduler import CreationScheduler, rate_limiters
+from services.endpoint_planner import INACTIVE_STATES
+from services.history_store import service_key
+from utils.naming import build_tag_name
+
+# Operations
+DELETE = "delete"
+MODIFY = "modify"
+RETAG = "retag"
+
+# (error code, message) for one endpoint; None when it succeeded
+ItemError = Optional[Tuple[Optional[str], str]]
+
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    """Split items into consecutive lists of at most size items"""
+    size = max(1, size)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+def _error_fields(error: Exception) -> Tuple[Optional[str], str]:
+    if isinstance(error, ClientError):
+        details = error.response.get("Error", {})
+        return details.get("Code"), details.get("Message", str(error))
+    # BotoCoreError or anything unexpected; it fails its batch only, the others still report
+    return type(error).__name__, str(error)
+
+def _ids(values: List[Dict[str, Any]], key: str) -> List[str]:
+    return [value[key] for value in values]
+
+class EndpointLifecycle:
+    """Applies one operation to many existing endpoints in as few EC2 calls as each API allows"""
+
+    def __init__(
+        self,
+        aws_service: Optional[AWSService] = None,
+        scheduler: Optional[CreationScheduler] = None
+    ):
+        self.aws_service = aws_service or AWSService()
+        self.scheduler = scheduler or CreationScheduler()
+
+    def select(
+        self,
+        region: str,
+        endpoint_ids: Optional[List[str]] = None,
+        vpc_ids: Optional[List[str]] = None,
+        service_names: Optional[List[str]] = None,
+        endpoint_type: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Resolve the active endpoints an operation applies to with one paginated describe
+
+        endpoint_ids takes precedence over vpc_ids for the lookup; the other
+        arguments narrow the selection. service_names match full service
+        names or their region-less form (e.g. "ecr.api").
+
+        Returns:
+            Tuple of (selected VpcEndpoint descriptions, requested endpoint IDs that do not exist)
+        """
+        if endpoint_ids:
+            described = self.aws_service.describe_vpc_endpoints_by_id(endpoint_ids, region)
+        else:
+            described = self.aws_service.describe_vpc_endpoints(vpc_ids or [], region)
+        active = [e for e in described if (e.get("State") or "").lower() not in INACTIVE_STATES]
+
+        found = {e["VpcEndpointId"] for e in active}
+        missing = [i for i in endpoint_ids or [] if i not in found]
+
+        vpcs = set(vpc_ids or [])
+        services = set(service_names or [])
+        selected = [
+            e for e in active
+            if (not vpcs or e["VpcId"] in vpcs)
+            and (not services or e["ServiceName"] in services or service_key(e["ServiceName"]) in services)
+            and (not endpoint_type or (e.get("VpcEndpointType") or "").lower() == endpoint_type.lower())
+        ]
+        return selected, missing
+
+    def _run_batches(
+        self,
+        region: str,
+        batches: List[Any],
+        call: Callable[[Any], Optional[Dict[str, ItemError]]],
+        ids_of: Callable[[Any], List[str]]
+    ) -> Tuple[Dict[str, ItemError], int]:
+        """
+        Run one API call per batch concurrently under the region's mutation rate limit
+
+        call returns per-endpoint errors the API reported for a batch that
+        otherwise succeeded; a failed call fails every endpoint in its batch.
+
+        Returns:
+            Tuple of (errors by endpoint ID, API calls made including retries)
+        """
+        errors: Dict[str, ItemError] = {}
+        calls = 0
+        if not batches:
+            return errors, calls
+        limiter = rate_limiters.get(self.aws_service.get_account_id(region), region)
+        for outcome in self.scheduler.run_iter(batches, call, limiter):
+            calls += outcome["attempts"]
+            if outcome["error"] is not None:
+                error = _error_fields(outcome["error"])
+                for endpoint_id in ids_of(outcome["item"]):
+                    errors.setdefault(endpoint_id, error)
+            else:
+                for endpoint_id, error in (outcome["value"] or {}).items():
+                    errors.setdefault(endpoint_id, error)
+        return errors, calls
+
+    def _report(
+        self,
+        operation: str,
+        endpoints: List[Dict[str, Any]],
+        missing: List[str],
+        errors: Dict[str, ItemError],
+        unchanged: set,
+        calls: int,
+        start: float
+    ) -> Dict[str, Any]:
+        """Per-endpoint results in selection order, then the requested IDs that were not found"""
+        results = []
+        for endpoint in endpoints:
+            error = errors.get(endpoint["VpcEndpointId"])
+            results.append({
+                "endpoint_id": endpoint["VpcEndpointId"],
+                "vpc_id": endpoint["VpcId"],
+                "service_name": endpoint["ServiceName"],
+                "action": operation,
+                "success": error is None,
+                "changed": error is None and endpoint["VpcEndpointId"] not in unchanged,
+                "error_code": error[0] if error else None,
+                "error_message": error[1] if error else None
+            })
+        for endpoint_id in missing:
+            results.append({
+                "endpoint_id": endpoint_id,
+                "vpc_id": None,
+                "service_name": None,
+                "action": operation,
+                "success": False,
+                "changed": False,
+                "error_code": "InvalidVpcEndpointId.NotFound",
+                "error_message": f"VPC endpoint {endpoint_id} does not exist or is already being deleted"
+            })
+        return {
+            "operation": operation,
+            "results": results,
+            "api_calls": calls,
+            "wall_clock_seconds": round(time.perf_counter() - start, 3)
+        }
+
+    def delete(
+        self,
+        region: str,
+        endpoints: List[Dict[str, Any]],
+        missing: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Delete endpoints with multi-ID DeleteVpcEndpoints calls of LIFECYCLE_DELETE_BATCH_SIZE
+
+        Returns:
+            {"operation", "results", "api_calls", "wall_clock_seconds"}
+        """
+        start = time.perf_counter()
+
+        def call(batch: List[str]) -> Dict[str, ItemError]:
+            unsuccessful = self.aws_service.delete_vpc_endpoints(batch, region)
+            return {
+                item["ResourceId"]: (item.get("Error", {}).get("Code"), item.get("Error", {}).get("Message", ""))
+                for item in unsuccessful
+            }
+
+        batches = chunked(_ids(endpoints, "VpcEndpointId"), settings.LIFECYCLE_DELETE_BATCH_SIZE)
+        errors, calls = self._run_batches(region, batches, call, ids_of=lambda batch: batch)
+        return self._report(DELETE, endpoints, missing or [], errors, set(), calls, start)
+
+    def _modifications(
+        self,
+        endpoint: Dict[str, Any],
+        subnets: Optional[List[str]],
+        remove_subnets: Optional[List[str]],
+        security_groups: Optional[List[str]],
+        remove_security_groups: Optional[List[str]],
+        route_tables: Optional[List[str]],
+        remove_route_tables: Optional[List[str]],
+        private_dns_enabled: Optional[bool]
+    ) -> Dict[str, Any]:
+        """ModifyVpcEndpoint arguments for one endpoint, leaving out changes it already has"""
+        changes: Dict[str, Any] = {}
+        endpoint_type = (endpoint.get("VpcEndpointType") or "").lower()
+        if endpoint_type == "interface":
+            current_subnets = set(endpoint.get("SubnetIds", []))
+            current_groups = set(_ids(endpoint.get("Groups", []), "GroupId"))
+            changes["add_subnet_ids"] = [s for s in subnets or [] if s not in current_subnets]
+            changes["remove_subnet_ids"] = [s for s in remove_subnets or [] if s in current_subnets]
+            changes["add_security_group_ids"] = [g for g in security_groups or [] if g not in current_groups]
+            changes["remove_security_group_ids"] = [g for g in remove_security_groups or [] if g in current_groups]
+            if private_dns_enabled is not None and bool(endpoint.get("PrivateDnsEnabled")) != private_dns_enabled:
+                changes["private_dns_enabled"] = private_dns_enabled
+        elif endpoint_type == "gateway":
+            current_route_tables = set(endpoint.get("RouteTableIds", []))
+            changes["add_route_table_ids"] = [rt for rt in route_tables or [] if rt not in current_route_tables]
+            changes["remove_route_table_ids"] = [rt for rt in remove_route_tables or [] if rt in current_route_tables]
+        return {key: value for key, value in changes.items() if value not in (None, [])}
+
+    def modify(
+        self,
+        region: str,
+        endpoints: List[Dict[str, Any]],
+        missing: Optional[List[str]] = None,
+        subnets: Optional[List[str]] = None,
+        remove_subnets: Optional[List[str]] = None,
+        security_groups: Optional[List[str]] = None,
+        remove_security_groups: Optional[List[str]] = None,
+        route_tables: Optional[List[str]] = None,
+        remove_route_tables: Optional[List[str]] = None,
+        private_dns_enabled: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Add or remove subnets, security groups and route tables on every endpoint
+
+        Subnets, security groups and private DNS apply to Interface endpoints,
+        route tables to Gateway endpoints. Additions the endpoint already has
+        and removals it does not have are left out, and endpoints with nothing
+        to change make no call. EC2 modifies one endpoint per call, so the
+        calls run concurrently instead of in batches.
+
+        Returns:
+            {"operation", "results", "api_calls", "wall_clock_seconds"}
+        """
+        start = time.perf_counter()
+        items = []
+        unchanged = set()
+        for endpoint in endpoints:
+            changes = self._modifications(
+                endpoint, subnets, remove_subnets, security_groups, remove_security_groups,
+                route_tables, remove_route_tables, private_dns_enabled
+            )
+            if changes:
+                items.append((endpoint["VpcEndpointId"], changes))
+            else:
+                unchanged.add(endpoint["VpcEndpointId"])
+
+        def call(item: Tuple[str, Dict[str, Any]]) -> None:
+            endpoint_id, changes = item
+            self.aws_service.modify_vpc_endpoint(endpoint_id, region, **changes)
+
+        errors, calls = self._run_batches(region, items, call, ids_of=lambda item: [item[0]])
+        return self._report(MODIFY, endpoints, missing or [], errors, unchanged, calls, start)
+
+    def retag(
+        self,
+        region: str,
+        endpoints: List[Dict[str, Any]],
+        missing: Optional[List[str]] = None,
+        tags: Optional[Dict[str, str]] = None,
+        remove_tags: Optional[List[str]] = None,
+        tag_prefix: Optional[str] = None,
+        tag_suffix: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Set and remove tags with multi-resource CreateTags/DeleteTags calls
+
+        With tag_prefix or tag_suffix, each endpoint's Name tag is rebuilt
+        from its service the way new endpoints are named. Endpoints needing
+        the same tag values share calls of up to LIFECYCLE_TAG_BATCH_SIZE
+        resources; tags an endpoint already has are not written again.
+
+        Returns:
+            {"operation", "results", "api_calls", "wall_clock_seconds"}
+        """
+        start = time.perf_counter()
+        to_set: Dict[Tuple[Tuple[str, str], ...], List[str]] = {}
+        to_remove: Dict[Tuple[str, ...], List[str]] = {}
+        unchanged = set()
+        for endpoint in endpoints:
+            endpoint_id = endpoint["VpcEndpointId"]
+            current = {tag["Key"]: tag["Value"] for tag in endpoint.get("Tags", [])}
+            desired = dict(tags or {})
+            if tag_prefix is not None or tag_suffix is not None:
+                desired["Name"] = build_tag_name(endpoint["ServiceName"], tag_prefix, tag_suffix)
+            changed = tuple(sorted((k, v) for k, v in desired.items() if current.get(k) != v))
+            removed = tuple(sorted(k for k in remove_tags or [] if k in current and k not in desired))
+            if changed:
+                to_set.setdefault(changed, []).append(endpoint_id)
+            if removed:
+                to_remove.setdefault(removed, []).append(endpoint_id)
+            if not changed and not removed:
+                unchanged.add(endpoint_id)
+
+        size = settings.LIFECYCLE_TAG_BATCH_SIZE
+        batches = [("set", pairs, ids) for pairs, group in to_set.items() for ids in chunked(group, size)]
+        batches += [("remove", keys, ids) for keys, group in to_remove.items() for ids in chunked(group, size)]
+
+        def call(batch: Tuple[str, tuple, List[str]]) -> None:
+            kind, payload, ids = batch
+            if kind == "set":
+                self.aws_service.create_tags(ids, dict(payload), region)
+            else:
+                self.aws_service.delete_tags(ids, list(payload), region)
+
+        errors, calls = self._run_batches(region, batches, call, ids_of=lambda batch: batch[2])
+        return self._report(RETAG, endpoints, missing or [], errors, unchanged, calls, start)
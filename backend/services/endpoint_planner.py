@@ -0,0 +1,139 @@
+"""
+Endpoint Planner - Diffs requested endpoints against the ones already in a VPC
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.aws_service import AWSService
+
+# Plan actions
+CREATE = "create"
+SKIP = "skip"
+MODIFY = "modify"
+
+# Endpoints in these states no longer count as existing
+INACTIVE_STATES = frozenset({"deleting", "deleted", "failed", "rejected", "expired"})
+
+# {vpc_id: {(service_name, endpoint_type): VpcEndpoint}}
+EndpointIndex = Dict[str, Dict[Tuple[str, str], Dict[str, Any]]]
+
+def index_endpoints(endpoints: List[Dict[str, Any]]) -> EndpointIndex:
+    """Index active endpoints by VPC, then by (service name, lower-cased endpoint type)"""
+    index: EndpointIndex = {}
+    for endpoint in endpoints:
+        if (endpoint.get("State") or "").lower() in INACTIVE_STATES:
+            continue
+        key = (endpoint["ServiceName"], (endpoint.get("VpcEndpointType") or "").lower())
+        index.setdefault(endpoint["VpcId"], {})[key] = endpoint
+    return index
+
+class EndpointPlanner:
+    """Computes a create/skip/modify plan so re-runs only write what is missing"""
+
+    def __init__(self, aws_service: Optional[AWSService] = None):
+        self.aws_service = aws_service or AWSService()
+
+    def existing_endpoints(self, region: str, vpc_ids: List[str]) -> EndpointIndex:
+        """Fetch and index the active endpoints of every VPC with one paginated call"""
+        return index_endpoints(self.aws_service.describe_vpc_endpoints(vpc_ids, region))
+
+    def _changes(
+        self,
+        endpoint: Dict[str, Any],
+        endpoint_type: str,
+        subnets: Optional[List[str]],
+        security_groups: Optional[List[str]],
+        private_dns_enabled: bool,
+        route_tables: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Settings the request wants that the existing endpoint lacks
+
+        Only additions are reported; extra subnets, groups or route tables on
+        the existing endpoint are left alone.
+        """
+        changes: Dict[str, Any] = {}
+        if endpoint_type.lower() == "interface":
+            missing_subnets = [s for s in subnets or [] if s not in endpoint.get("SubnetIds", [])]
+            if missing_subnets:
+                changes["add_subnet_ids"] = missing_subnets
+            existing_groups = {g["GroupId"] for g in endpoint.get("Groups", [])}
+            missing_groups = [g for g in security_groups or [] if g not in existing_groups]
+            if missing_groups:
+                changes["add_security_group_ids"] = missing_groups
+            if bool(endpoint.get("PrivateDnsEnabled")) != bool(private_dns_enabled):
+                changes["private_dns_enabled"] = bool(private_dns_enabled)
+        elif endpoint_type.lower() == "gateway":
+            missing_route_tables = [rt for rt in route_tables or [] if rt not in endpoint.get("RouteTableIds", [])]
+            if missing_route_tables:
+                changes["add_route_table_ids"] = missing_route_tables
+        return changes
+
+    def plan(
+        self,
+        endpoint_type: str,
+        region: str,
+        vpc_id: str,
+        service_names: List[str],
+        subnets: Optional[List[str]] = None,
+        security_groups: Optional[List[str]] = None,
+        private_dns_enabled: bool = True,
+        route_tables: Optional[List[str]] = None,
+        select_all_route_tables: bool = False,
+        existing: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+        subnets_by_service: Optional[Dict[str, List[str]]] = None,
+        **_: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Decide per service whether to create, skip or modify its endpoint
+
+        Takes the same arguments as EndpointCreator.iter_create_endpoints
+        (tags are not compared). Pass existing, one VPC's entry from
+        existing_endpoints(), to reuse a lookup shared by several requests.
+        subnets_by_service overrides subnets for individual services.
+
+        Returns:
+            One entry per service in request order with service_name, action,
+            endpoint_id, state and changes
+        """
+        if existing is None:
+            existing = self.existing_endpoints(region, [vpc_id]).get(vpc_id, {})
+
+        if endpoint_type.lower() == "gateway" and select_all_route_tables:
+            route_tables = self.aws_service.describe_route_tables(vpc_id, region)
+
+        plan = []
+        for service_name in service_names:
+            endpoint = existing.get((service_name, endpoint_type.lower()))
+            if endpoint is None:
+                plan.append({
+                    "service_name": service_name,
+                    "action": CREATE,
+                    "endpoint_id": None,
+                    "state": None,
+                    "changes": None
+                })
+                continue
+            changes = self._changes(
+                endpoint,
+                endpoint_type,
+                (subnets_by_service or {}).get(service_name, subnets),
+                security_groups,
+                private_dns_enabled,
+                route_tables
+            )
+            plan.append({
+                "service_name": service_name,
+                "action": MODIFY if changes else SKIP,
+                "endpoint_id": endpoint["VpcEndpointId"],
+                "state": endpoint.get("State"),
+                "changes": changes or None
+            })
+        return plan
+
+def summarize(plan: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count plan entries per action"""
+    counts = {CREATE: 0, SKIP: 0, MODIFY: 0}
+    for entry in plan:
+        counts[entry["action"]] += 1
+    return counts
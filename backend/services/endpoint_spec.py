@@ -0,0 +1,79 @@
+"""
+Endpoint Spec - Parsed intermediate representation shared by every script emitter
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from utils.naming import get_service_short_name, build_tag_name
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    """One endpoint to create, with its derived names computed once"""
+    service_name: str
+    short_name: str
+    tag_name: str
+
+@dataclass(frozen=True)
+class EndpointSpec:
+    """Everything an emitter needs to produce a script or template for one request"""
+    endpoint_type: str
+    region: str
+    vpc_id: str
+    services: Tuple[ServiceSpec, ...]
+    subnets: Tuple[str, ...] = ()
+    security_groups: Tuple[str, ...] = ()
+    private_dns_enabled: bool = True
+    route_tables: Tuple[str, ...] = ()
+    select_all_route_tables: bool = False
+    skip_existing: bool = False  # Scripts look up the VPC's endpoints first and skip those that exist
+
+    @property
+    def is_interface(self) -> bool:
+        return self.endpoint_type.lower() == "interface"
+
+    @property
+    def is_gateway(self) -> bool:
+        return self.endpoint_type.lower() == "gateway"
+
+def build_endpoint_spec(
+    endpoint_type: str,
+    region: str,
+    vpc_id: str,
+    service_names: List[str],
+    tag_prefix: Optional[str] = None,
+    tag_suffix: Optional[str] = None,
+    subnets: Optional[List[str]] = None,
+    security_groups: Optional[List[str]] = None,
+    private_dns_enabled: bool = True,
+    route_tables: Optional[List[str]] = None,
+    select_all_route_tables: bool = False,
+    skip_existing: bool = False
+) -> EndpointSpec:
+    """
+    Parse request fields into an EndpointSpec
+
+    Only the fields relevant to the endpoint type are kept, so emitters can
+    rely on e.g. subnets being empty for Gateway endpoints.
+    """
+    is_interface = endpoint_type.lower() == "interface"
+    is_gateway = endpoint_type.lower() == "gateway"
+    return EndpointSpec(
+        endpoint_type=endpoint_type,
+        region=region,
+        vpc_id=vpc_id,
+        services=tuple(
+            ServiceSpec(
+                service_name=name,
+                short_name=get_service_short_name(name),
+                tag_name=build_tag_name(name, tag_prefix, tag_suffix)
+            )
+            for name in service_names
+        ),
+        subnets=tuple(subnets or ()) if is_interface else (),
+        security_groups=tuple(security_groups or ()) if is_interface else (),
+        private_dns_enabled=bool(private_dns_enabled) if is_interface else False,
+        route_tables=tuple(route_tables or ()) if is_gateway and not select_all_route_tables else (),
+        select_all_route_tables=bool(select_all_route_tables) if is_gateway else False,
+        skip_existing=bool(skip_existing)
+    )
@@ -0,0 +1,560 @@
+"""
+History Store - SQLite record of generated scripts, executions and created endpoints
+"""
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    region TEXT,
+    vpc_id TEXT,
+    endpoint_type TEXT,
+    format TEXT,
+    script_id TEXT,
+    success INTEGER,
+    exit_code INTEGER,
+    service_count INTEGER,
+    output TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_created ON events (created_at);
+CREATE INDEX IF NOT EXISTS idx_events_vpc ON events (vpc_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_events_region ON events (region, created_at);
+
+CREATE TABLE IF NOT EXISTS endpoints (
+    id INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    region TEXT,
+    vpc_id TEXT,
+    service_name TEXT NOT NULL,
+    service TEXT NOT NULL,
+    endpoint_id TEXT,
+    action TEXT,
+    status TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_endpoints_created ON endpoints (created_at);
+CREATE INDEX IF NOT EXISTS idx_endpoints_vpc ON endpoints (vpc_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_endpoints_region ON endpoints (region, created_at);
+CREATE INDEX IF NOT EXISTS idx_endpoints_service ON endpoints (service_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_endpoints_service_key ON endpoints (service, created_at);
+CREATE INDEX IF NOT EXISTS idx_endpoints_endpoint_id ON endpoints (endpoint_id);
+CREATE INDEX IF NOT EXISTS idx_endpoints_event ON endpoints (event_id);
+
+CREATE TABLE IF NOT EXISTS scripts (
+    script_id TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    region TEXT,
+    vpc_id TEXT,
+    file_name TEXT,
+    content TEXT NOT NULL
+);
+"""
+
+_INSERTS = {
+    "events": (
+        "INSERT INTO events (event_id, kind, created_at, region, vpc_id, endpoint_type, format, "
+        "script_id, success, exit_code, service_count, output) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    "endpoints": (
+        "INSERT INTO endpoints (event_id, created_at, region, vpc_id, service_name, service, "
+        "endpoint_id, action, status, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    "scripts": (
+        "INSERT OR IGNORE INTO scripts (script_id, format, created_at, region, vpc_id, file_name, content) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)"
+    )
+}
+
+# Endpoint row statuses
+CREATED = "created"
+SKIPPED = "skipped"
+FAILED = "failed"
+DELETED = "deleted"
+MODIFIED = "modified"
+TAGGED = "tagged"
+
+# Statuses after which the endpoint exists
+EXISTING_STATUSES = (CREATED, SKIPPED, MODIFIED, TAGGED)
+
+# Bulk lifecycle operation -> status of the endpoints it changed
+_LIFECYCLE_STATUSES = {"delete": DELETED, "modify": MODIFIED, "retag": TAGGED}
+
+# Header comments and result lines of the generated PowerShell script
+_SCRIPT_HEADER = re.compile(r"^# (Endpoint Type|VPC ID|Region): (.+)$", re.MULTILINE)
+_SCRIPT_RESULT = re.compile(r"^\[(OK|SKIP|FAIL)\] ([^:\s]+): (.*)$")
+_SCRIPT_ENDPOINT_ID = re.compile(r"vpce-[0-9a-f]+")
+
+def service_key(service_name: str) -> str:
+    """
+    Service name without the reverse-DNS and region prefix
+    e.g., "com.amazonaws.us-east-1.ecr.api" -> "ecr.api"
+    """
+    parts = service_name.split(".")
+    if len(parts) > 3 and parts[0] == "com":
+        return ".".join(parts[3:])
+    return service_name
+
+def parse_script_output(output: str) -> List[Dict[str, Any]]:
+    """
+    Per-service results from a generated script's output
+
+    [OK] lines take the endpoint ID from the following "ID: vpce-..." line,
+    [SKIP] lines carry it in parentheses.
+    """
+    results: List[Dict[str, Any]] = []
+    for line in output.splitlines():
+        line = line.strip()
+        match = _SCRIPT_RESULT.match(line)
+        if match:
+            tag, service_name, message = match.groups()
+            endpoint_id = _SCRIPT_ENDPOINT_ID.search(message) if tag == "SKIP" else None
+            results.append({
+                "service_name": service_name,
+                "status": {"OK": CREATED, "SKIP": SKIPPED, "FAIL": FAILED}[tag],
+                "endpoint_id": endpoint_id.group(0) if endpoint_id else None,
+                "error": message if tag == "FAIL" else None
+            })
+        elif line.startswith("ID: ") and results and results[-1]["status"] == CREATED and not results[-1]["endpoint_id"]:
+            results[-1]["endpoint_id"] = line[4:].strip()
+    return results
+
+def parse_script_header(content: str) -> Dict[str, Optional[str]]:
+    """Endpoint type, VPC ID and region from a generated PowerShell script's header comments"""
+    fields = dict(_SCRIPT_HEADER.findall(content[:2000]))
+    return {
+        "endpoint_type": fields.get("Endpoint Type"),
+        "vpc_id": fields.get("VPC ID"),
+        "region": fields.get("Region")
+    }
+
+class HistoryStore:
+    """Append-only provisioning history written by a background thread in batches"""
+
+    def __init__(
+        self,
+        path: str,
+        enabled: bool = True,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        queue_size: int = 10000
+    ):
+        self.path = path
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+        self._writer: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """A connection in WAL mode, creating the database and schema on first use"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """One read connection per thread; WAL lets reads run alongside the writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._writer.start()
+
+    def _enqueue(self, table: str, row: tuple) -> None:
+        """Queue a row without ever blocking the request; rows are dropped when the queue is full"""
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] in _INSERTS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            rows: Dict[str, List[tuple]] = {}
+            control = None
+            for table, payload in batch:
+                if table in _INSERTS:
+                    rows.setdefault(table, []).append(payload)
+                else:
+                    control = (table, payload)
+            if rows:
+                self._write(conn, rows)
+            if control is not None:
+                command, done = control
+                done.set()
+                if command == "stop":
+                    conn.close()
+                    return
+
+    def _write(self, conn: sqlite3.Connection, rows: Dict[str, List[tuple]]) -> None:
+        """Insert a batch in one transaction; a failed batch is counted, never raised"""
+        try:
+            with conn:
+                # Events first so endpoint rows never reference a missing event
+                for table in ("events", "scripts", "endpoints"):
+                    if table in rows:
+                        conn.executemany(_INSERTS[table], rows[table])
+            self.written += sum(len(r) for r in rows.values())
+        except sqlite3.Error:
+            self.write_errors += sum(len(r) for r in rows.values())
+
+    def _control(self, command: str, timeout: float) -> bool:
+        """Queue a command for the writer; False when it is not done within timeout (e.g. a full queue)"""
+        if self._writer is None or not self._writer.is_alive():
+            return True
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put((command, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(0.0, deadline - time.monotonic()))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is written"""
+        return self._control("flush", timeout)
+
+    def close(self, timeout: float = 5.0) -> bool:
+        """Write what is queued and stop the writer thread"""
+        return self._control("stop", timeout)
+
+    def _record_event(
+        self,
+        kind: str,
+        region: Optional[str],
+        vpc_id: Optional[str],
+        endpoint_type: Optional[str] = None,
+        output_format: Optional[str] = None,
+        script_id: Optional[str] = None,
+        success: Optional[bool] = None,
+        exit_code: Optional[int] = None,
+        service_count: Optional[int] = None,
+        output: Optional[str] = None,
+        endpoints: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[str]:
+        if not self.enabled:
+            return None
+        self._ensure_writer()
+        event_id = uuid.uuid4().hex
+        now = time.time()
+        if output is not None:
+            output = output[-settings.HISTORY_MAX_OUTPUT_CHARS:]
+        self._enqueue("events", (
+            event_id, kind, now, region, vpc_id, endpoint_type, output_format, script_id,
+            None if success is None else int(success), exit_code, service_count, output
+        ))
+        for endpoint in endpoints or []:
+            self._enqueue("endpoints", (
+                event_id, now, region, vpc_id,
+                endpoint["service_name"], service_key(endpoint["service_name"]),
+                endpoint.get("endpoint_id"), endpoint.get("action"), endpoint["status"], endpoint.get("error")
+            ))
+        return event_id
+
+    def record_generation(
+        self,
+        region: str,
+        vpc_id: str,
+        endpoint_type: str,
+        output_format: str,
+        script_id: str,
+        file_name: str,
+        content: str,
+        service_count: int
+    ) -> Optional[str]:
+        """Record a /generate call and keep the script (stored once per script_id)"""
+        if not self.enabled:
+            return None
+        self._ensure_writer()
+        self._enqueue("scripts", (script_id, output_format, time.time(), region, vpc_id, file_name, content))
+        return self._record_event(
+            "generate", region, vpc_id, endpoint_type, output_format, script_id, service_count=service_count
+        )
+
+    def record_script_execution(
+        self,
+        ps1_content: str,
+        output: str,
+        exit_code: Optional[int],
+        script_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Record a PowerShell run with the endpoints parsed from its output"""
+        if not self.enabled:
+            return None
+        header = parse_script_header(ps1_content)
+        results = parse_script_output(output or "")
+        return self._record_event(
+            "execute",
+            header["region"],
+            header["vpc_id"],
+            header["endpoint_type"],
+            "powershell",
+            script_id,
+            success=exit_code == 0,
+            exit_code=exit_code,
+            service_count=len(results),
+            output=output,
+            endpoints=results
+        )
+
+    def record_native(
+        self,
+        region: str,
+        vpc_id: str,
+        endpoint_type: str,
+        results: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Record native creation results (rows from EndpointCreator)"""
+        endpoints = [
+            {
+                "service_name": r["service_name"],
+                "endpoint_id": r.get("endpoint_id"),
+                "action": r.get("action"),
+                "status": FAILED if not r["success"] else (CREATED if r.get("action") == "create" else SKIPPED),
+                "error": r.get("error_message")
+            }
+            for r in results
+        ]
+        return self._record_event(
+            "native",
+            region,
+            vpc_id,
+            endpoint_type,
+            success=all(r["success"] for r in results),
+            service_count=len(results),
+            endpoints=endpoints
+        )
+
+    def record_lifecycle(self, operation: str, region: str, results: List[Dict[str, Any]]) -> List[str]:
+        """
+        Record bulk delete/modify/retag results (rows from EndpointLifecycle), one event per VPC
+
+        Only endpoints the operation changed get endpoint rows; a failed or
+        no-op operation leaves the endpoint's latest recorded state as it was.
+        """
+        if not self.enabled:
+            return []
+        by_vpc: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            if result.get("vpc_id"):
+                by_vpc.setdefault(result["vpc_id"], []).append(result)
+        status = _LIFECYCLE_STATUSES[operation]
+        event_ids = []
+        for vpc_id, rows in by_vpc.items():
+            event_ids.append(self._record_event(
+                operation,
+                region,
+                vpc_id,
+                success=all(r["success"] for r in rows),
+                service_count=len(rows),
+                endpoints=[
+                    {"service_name": r["service_name"], "endpoint_id": r["endpoint_id"], "action": operation, "status": status}
+                    for r in rows if r["success"] and r["changed"]
+                ]
+            ))
+        return event_ids
+
+    def get_script(self, script_id: str) -> Optional[Dict[str, Any]]:
+        """A stored script by ID, or None"""
+        row = self._reader().execute("SELECT * FROM scripts WHERE script_id = ?", (script_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _page(
+        self,
+        sql: str,
+        where: List[str],
+        params: List[Any],
+        limit: int,
+        cursor: Optional[int]
+    ) -> Dict[str, Any]:
+        """Keyset paging on id, newest first; next_cursor is None on the last page"""
+        limit = max(1, min(limit, settings.HISTORY_PAGE_MAX))
+        if cursor is not None:
+            where.append("id < ?")
+            params.append(cursor)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        rows = self._reader().execute(sql, (*params, limit + 1)).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        for item in items:
+            if item.get("success") is not None:
+                item["success"] = bool(item["success"])
+        return {"items": items, "next_cursor": items[-1]["id"] if len(rows) > limit else None}
+
+    def _filters(
+        self,
+        region: Optional[str],
+        vpc_id: Optional[str],
+        since: Optional[float],
+        until: Optional[float]
+    ) -> Tuple[List[str], List[Any]]:
+        where, params = [], []
+        for column, value in (("region", region), ("vpc_id", vpc_id)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(until)
+        return where, params
+
+    def _service_filter(self, service: Optional[str], where: List[str], params: List[Any]) -> None:
+        """Match a full name or a region-less one ("ecr.api"); "*" makes it a glob (e.g. "ecr*")"""
+        if not service:
+            return
+        operator = "GLOB" if "*" in service else "="
+        where.append(f"(service_name {operator} ? OR service {operator} ?)")
+        params.extend([service, service])
+
+    def query_events(
+        self,
+        kind: Optional[str] = None,
+        region: Optional[str] = None,
+        vpc_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Generate/execute/native events, newest first (output is left out; see get_event)"""
+        where, params = self._filters(region, vpc_id, since, until)
+        if kind:
+            where.append("kind = ?")
+            params.append(kind)
+        sql = (
+            "SELECT id, event_id, kind, created_at, region, vpc_id, endpoint_type, format, "
+            "script_id, success, exit_code, service_count FROM events"
+        )
+        return self._page(sql, where, params, limit, cursor)
+
+    def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """One event with its output and endpoint rows"""
+        conn = self._reader()
+        row = conn.execute("SELECT * FROM events WHERE event_id = ?", (event_id,)).fetchone()
+        if row is None:
+            return None
+        event = dict(row)
+        if event["success"] is not None:
+            event["success"] = bool(event["success"])
+        event["endpoints"] = [
+            dict(r) for r in conn.execute("SELECT * FROM endpoints WHERE event_id = ? ORDER BY id", (event_id,))
+        ]
+        return event
+
+    def query_endpoints(
+        self,
+        service: Optional[str] = None,
+        status: Optional[str] = None,
+        region: Optional[str] = None,
+        vpc_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Endpoint rows, newest first"""
+        where, params = self._filters(region, vpc_id, since, until)
+        self._service_filter(service, where, params)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        return self._page("SELECT * FROM endpoints", where, params, limit, cursor)
+
+    def vpcs_with_service(
+        self,
+        service: str,
+        region: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        VPCs whose latest recorded result for a service is an existing endpoint
+
+        One row per (region, VPC, service): the newest, kept when it was
+        created, found already existing, modified or retagged (a deletion
+        removes the VPC from the result). Failed attempts are ignored, as
+        they do not change what exists (e.g. a duplicate create failing
+        next to an existing endpoint), matching record_lifecycle.
+        """
+        where, params = self._filters(region, None, None, None)
+        self._service_filter(service, where, params)
+        where.append("status != ?")
+        params.append(FAILED)
+        latest = (
+            "SELECT MAX(id) AS id, region, vpc_id, service_name, service, endpoint_id, status, created_at "
+            "FROM endpoints"
+        )
+        if where:
+            latest += " WHERE " + " AND ".join(where)
+        latest += " GROUP BY region, vpc_id, service_name"
+        sql = f"SELECT * FROM ({latest})"
+        placeholders = ", ".join("?" for _ in EXISTING_STATUSES)
+        return self._page(sql, [f"status IN ({placeholders})"], [*params, *EXISTING_STATUSES], limit, cursor)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors
+        }
+
+history_store = HistoryStore(
+    path=settings.HISTORY_DB_PATH,
+    enabled=settings.HISTORY_ENABLED,
+    batch_size=settings.HISTORY_BATCH_SIZE,
+    flush_interval=settings.HISTORY_FLUSH_INTERVAL_SECONDS,
+    queue_size=settings.HISTORY_QUEUE_MAX
+)
@@ -0,0 +1,315 @@
+"""
+Job Manager - Background execution jobs with status polling and cancellation
+"""
+
+import os
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from services.shared_state import SharedStateStore, shared_state
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = frozenset({SUCCEEDED, FAILED, CANCELLED})
+
+_NAMESPACE = "job"
+
+# Heartbeats of the worker processes that own unfinished jobs, keyed by owner ID
+_OWNER_NAMESPACE = "job_owner"
+
+# Identifies this process as a job owner; the PID alone may be reused after a restart
+_OWNER_ID = f"{os.getpid()}-{secrets.token_hex(4)}"
+
+class JobQueueFull(Exception):
+    """Raised when the number of unfinished jobs reaches JOB_MAX_PENDING"""
+
+class Job:
+    """One background job and its outcome"""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status view of the job (without the result payload)"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Full job state for the shared store, tagged with the process that runs it"""
+        return {**self.to_dict(), "result": self.result, "owner": os.getpid(), "owner_id": _OWNER_ID}
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Job":
+        """A read-only view of a job owned by another worker process"""
+        job = cls(record["kind"])
+        job.id = record["job_id"]
+        job.status = record["status"]
+        job.created_at = record["created_at"]
+        job.started_at = record["started_at"]
+        job.finished_at = record["finished_at"]
+        job.result = record["result"]
+        job.error = record["error"]
+        return job
+
+class JobManager:
+    """
+    Runs jobs on a bounded worker pool and keeps finished jobs under an LRU/TTL cap
+
+    With a shared store (several worker processes), job state is mirrored
+    into it so any worker can report on or cancel any job; the job still
+    runs in the process that accepted it. That process keeps a heartbeat
+    in the store, and an unfinished job whose owner's heartbeat is older
+    than JOB_HEARTBEAT_TIMEOUT_SECONDS is reported as failed.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_completed: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        store: Optional[SharedStateStore] = None
+    ):
+        self.max_pending = max_pending or settings.JOB_MAX_PENDING
+        self.max_completed = max_completed or settings.JOB_MAX_COMPLETED
+        self.ttl_seconds = ttl_seconds or settings.JOB_RESULT_TTL_SECONDS
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or settings.JOB_MAX_WORKERS,
+            thread_name_prefix="job"
+        )
+        self._active: Dict[str, Job] = {}
+        self._completed: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.store = store
+        self._closing = False
+        self._watcher: Optional[threading.Thread] = None
+
+    def _save(self, job: Job) -> None:
+        """
+        Mirror the job into the shared store
+
+        Merged into the stored record rather than replacing it, so a
+        cancel_requested flag set through another worker is never lost.
+        """
+        if self.store is not None and self.store.update(_NAMESPACE, job.id, job.to_record(), self.ttl_seconds) is None:
+            self.store.put(_NAMESPACE, job.id, job.to_record(), self.ttl_seconds)
+
+    def _cancel_requested(self, job: Job) -> bool:
+        """Whether a cancel for the job arrived through another worker process"""
+        if self.store is None:
+            return False
+        record = self.store.get(_NAMESPACE, job.id)
+        return record is not None and bool(record.get("cancel_requested"))
+
+    def _heartbeat(self) -> None:
+        self.store.put(_OWNER_NAMESPACE, _OWNER_ID, {"pid": os.getpid()}, settings.JOB_HEARTBEAT_TIMEOUT_SECONDS)
+
+    def _watch_cancellations(self) -> None:
+        """
+        Keep this worker's heartbeat fresh and apply cancels requested through another worker process
+
+        Each tick also extends the shared records of this worker's unfinished
+        jobs, so a job running longer than JOB_RESULT_TTL_SECONDS stays
+        visible to the other workers.
+        """
+        while True:
+            time.sleep(settings.JOB_CANCEL_POLL_SECONDS)
+            try:
+                self._heartbeat()
+            except Exception:
+                # A busy store delays the heartbeat; readers allow for several missed beats
+                pass
+            with self._lock:
+                active = list(self._active)
+            for job_id in active:
+                try:
+                    record = self.store.update(_NAMESPACE, job_id, {}, self.ttl_seconds)
+                except Exception:
+                    # Retried on the next tick
+                    continue
+                if record is not None and record.get("cancel_requested"):
+                    self.cancel(job_id)
+
+    def _ensure_watcher(self) -> None:
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                # Beat before the first job is saved so no reader sees it ownerless
+                self._heartbeat()
+                self._watcher = threading.Thread(target=self._watch_cancellations, name="job-cancels", daemon=True)
+                self._watcher.start()
+
+    def _prune(self) -> None:
+        """Drop expired and least-recently-used finished jobs (caller holds the lock)"""
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j for j, job in self._completed.items() if job.finished_at < cutoff]:
+            del self._completed[job_id]
+        while len(self._completed) > self.max_completed:
+            self._completed.popitem(last=False)
+
+    def _finish(self, job: Job, status: str) -> None:
+        with self._lock:
+            job.status = status
+            job.finished_at = time.time()
+            self._active.pop(job.id, None)
+            self._completed[job.id] = job
+            self._prune()
+        self._save(job)
+
+    def _run(self, job: Job, func: Callable[[threading.Event], Dict[str, Any]]) -> Dict[str, Any]:
+        if self._cancel_requested(job):
+            # Cancelled through another worker before the watcher's next tick
+            job.cancel_event.set()
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED)
+            return job.result
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._save(job)
+        try:
+            job.result = func(job.cancel_event)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, CANCELLED if job.cancel_event.is_set() else FAILED)
+            raise
+        self._finish(job, CANCELLED if job.cancel_event.is_set() else SUCCEEDED)
+        return job.result
+
+    def submit(self, kind: str, func: Callable[[threading.Event], Dict[str, Any]]) -> Job:
+        """
+        Queue func for background execution
+
+        Args:
+            kind: Short label for the job type, e.g. "script" or "native"
+            func: Called with the job's cancel event; should stop early once it is set
+
+        Returns:
+            The queued Job
+
+        Raises:
+            JobQueueFull when too many jobs are already queued or running, or the server is shutting down
+        """
+        job = Job(kind)
+        with self._lock:
+            if self._closing:
+                raise JobQueueFull("Server is shutting down")
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs (limit {self.max_pending})")
+            self._active[job.id] = job
+        if self.store is not None:
+            self._ensure_watcher()
+        self._save(job)
+        job.future = self._pool.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job; reading a finished job refreshes its LRU position"""
+        with self._lock:
+            job = self._active.get(job_id)
+            if job is None:
+                job = self._completed.get(job_id)
+                if job is not None:
+                    self._completed.move_to_end(job_id)
+        if job is None and self.store is not None:
+            record = self.store.get(_NAMESPACE, job_id)
+            job = Job.from_record(self._reap(record)) if record is not None else None
+        return job
+
+    def _reap(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark an unfinished job of a worker that stopped heartbeating (killed or crashed) as failed"""
+        if record["status"] in FINISHED_STATES:
+            return record
+        if self.store.get(_OWNER_NAMESPACE, record.get("owner_id", "")) is not None:
+            return record
+        fields = {
+            "status": FAILED,
+            "finished_at": time.time(),
+            "error": f"Abandoned: worker {record.get('owner')} stopped while the job was {record['status']}"
+        }
+        return self.store.update(_NAMESPACE, record["job_id"], fields) or {**record, **fields}
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation of a job
+
+        Queued jobs never start; running jobs see their cancel event set.
+
+        Returns:
+            The job, or None when it is unknown
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        if job.future is None:
+            # Owned by another worker process, which picks the request up from the store
+            self.store.update(_NAMESPACE, job_id, {"cancel_requested": True})
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs, optionally waiting for running ones to drain"""
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def drain(self, timeout: float) -> Dict[str, int]:
+        """
+        Graceful shutdown: refuse new jobs, cancel queued ones and let running ones finish
+
+        Jobs still running after timeout seconds are cancelled (their scripts
+        are killed) and given a few seconds to record that.
+
+        Returns:
+            Counts of jobs that finished, were cancelled while queued, and were cancelled while running
+        """
+        with self._lock:
+            self._closing = True
+            jobs = list(self._active.values())
+        queued, running = 0, []
+        for job in jobs:
+            if job.future is None:
+                continue
+            if job.future.cancel():
+                # Had not started yet
+                job.cancel_event.set()
+                self._finish(job, CANCELLED)
+                queued += 1
+            else:
+                running.append(job)
+        _, pending = wait([job.future for job in running], timeout=timeout)
+        for job in running:
+            if job.future in pending:
+                job.cancel_event.set()
+        wait(pending, timeout=5)
+        self.shutdown(wait=False)
+        return {"finished": len(running) - len(pending), "cancelled_queued": queued, "cancelled_running": len(pending)}
+
+# Shared job manager for the process (and across workers through shared_state)
+job_manager = JobManager(store=shared_state)
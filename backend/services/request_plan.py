@@ -0,0 +1,181 @@
+"""
+Request Plan - Validates an endpoint request once and caches the result by content hash
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from config import settings
+from services.emitters import EMITTERS, get_emitter
+from services.endpoint_spec import EndpointSpec, build_endpoint_spec
+from services.script_cache import CachedScript, script_cache
+from services.script_generator import ScriptGenerator
+from utils.timing import StageTimer
+from utils.ttl_cache import TTLCache
+from utils.validators import validate_endpoint_ids
+
+# Plans keyed by the content hash of the request payload
+_plans = TTLCache(
+    max_entries=settings.REQUEST_PLAN_CACHE_SIZE,
+    ttl_seconds=settings.REQUEST_PLAN_TTL_SECONDS
+)
+
+_generator = ScriptGenerator()
+
+@dataclass(frozen=True)
+class RequestPlan:
+    """A validated endpoint request with its derived fields"""
+    key: str
+    service_names: Tuple[str, ...]
+    errors: Tuple[str, ...]
+    field_errors: Dict[str, List[str]]
+    spec: Optional[EndpointSpec]  # None when the request is invalid
+    spec_hash: Optional[str] = None  # Hash of the normalized spec; equal for equivalent requests
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def script_id(self, output_format: str) -> str:
+        """Content address of this request's script in a format"""
+        return hashlib.sha256(f"{self.spec_hash}:{output_format.lower()}".encode()).hexdigest()
+
+    def render(self, output_format: str) -> CachedScript:
+        """
+        Script or template for a format plus the AWS CLI commands, from the shared script cache
+
+        Raises:
+            ValueError: The plan is invalid or the format is unknown
+        """
+        if self.spec is None:
+            raise ValueError("Cannot render an invalid request")
+        output_format = output_format.lower()
+        emitter = get_emitter(output_format)
+        if emitter is None:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        script_id = self.script_id(output_format)
+
+        def render() -> CachedScript:
+            content, commands = _generator.generate_from_spec(self.spec, output_format)
+            return CachedScript(
+                script_id=script_id,
+                format=output_format,
+                file_name=emitter.file_name(),
+                content=content,
+                commands=commands
+            )
+
+        return script_cache.get_or_render(script_id, render)
+
+def content_hash(payload: Mapping[str, Any]) -> str:
+    """SHA-256 of the payload's canonical JSON form"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _validate(payload: Mapping[str, Any]) -> Tuple[List[str], List[str], Dict[str, List[str]]]:
+    """
+    Check required fields and resource IDs of an endpoint request
+
+    Returns:
+        Tuple of (service_names, errors, field_errors)
+    """
+    errors = []
+    endpoint_type = payload.get("endpoint_type") or ""
+
+    if not endpoint_type.strip():
+        errors.append("endpoint_type is required")
+    elif endpoint_type not in ["Interface", "Gateway"]:
+        errors.append("endpoint_type must be 'Interface' or 'Gateway'")
+
+    if not (payload.get("region") or "").strip():
+        errors.append("region is required")
+
+    if not (payload.get("vpc_id") or "").strip():
+        errors.append("vpc_id is required")
+
+    if get_emitter(payload.get("format") or "powershell") is None:
+        errors.append(f"format must be one of: {', '.join(EMITTERS)}")
+
+    # Support both service_names (new) and service_name (legacy); a repeated
+    # service would give emitters duplicate resource keys, so keep the first
+    service_name = payload.get("service_name")
+    service_names = list(dict.fromkeys(payload.get("service_names") or ([service_name] if service_name else [])))
+    if not service_names:
+        errors.append("service_name(s) is required")
+
+    if endpoint_type == "Interface":
+        if not payload.get("subnets"):
+            errors.append("subnets are required for Interface endpoints")
+        if not payload.get("security_groups"):
+            errors.append("security_groups are required for Interface endpoints")
+
+    if endpoint_type == "Gateway":
+        if not payload.get("route_tables") and not payload.get("select_all_route_tables"):
+            errors.append("route_tables are required for Gateway endpoints or select_all_route_tables must be true")
+
+    # Region, ID formats and duplicates for the fields this endpoint type uses
+    is_interface = endpoint_type == "Interface"
+    field_errors = validate_endpoint_ids(
+        payload.get("vpc_id") or None,
+        region=(payload.get("region") or "").strip() or None,
+        subnets=payload.get("subnets") if is_interface else None,
+        security_groups=payload.get("security_groups") if is_interface else None,
+        route_tables=payload.get("route_tables") if endpoint_type == "Gateway" else None
+    )
+    for messages in field_errors.values():
+        errors.extend(messages)
+
+    return service_names, errors, field_errors
+
+def _build(key: str, payload: Mapping[str, Any]) -> RequestPlan:
+    service_names, errors, field_errors = _validate(payload)
+    spec = None
+    if not errors:
+        spec = build_endpoint_spec(
+            endpoint_type=payload["endpoint_type"],
+            region=payload["region"],
+            vpc_id=payload["vpc_id"],
+            service_names=service_names,
+            tag_prefix=payload.get("tag_prefix") or "",
+            tag_suffix=payload.get("tag_suffix") or "",
+            subnets=payload.get("subnets"),
+            security_groups=payload.get("security_groups"),
+            private_dns_enabled=bool(payload.get("private_dns_enabled", True)),
+            route_tables=payload.get("route_tables"),
+            select_all_route_tables=bool(payload.get("select_all_route_tables")),
+            skip_existing=bool(payload.get("skip_existing"))
+        )
+    return RequestPlan(
+        key=key,
+        service_names=tuple(service_names),
+        errors=tuple(errors),
+        field_errors=field_errors,
+        spec=spec,
+        spec_hash=content_hash(asdict(spec)) if spec else None
+    )
+
+def get_request_plan(payload: Mapping[str, Any], timer: Optional[StageTimer] = None) -> RequestPlan:
+    """
+    Return the plan for a request payload, validating and normalizing it on first sight
+
+    Identical payloads (e.g. /api/validate followed by /api/generate) share
+    one cached plan. Records a "plan" stage on timer described as "hit" or
+    "miss".
+    """
+    timer = timer or StageTimer()
+    key = content_hash(payload)
+    built = []
+
+    def load() -> RequestPlan:
+        built.append(True)
+        return _build(key, payload)
+
+    with timer.stage("plan"):
+        plan = _plans.get_or_load(key, load)
+    timer.describe("miss" if built else "hit")
+    return plan
+
+def plan_cache_stats() -> Dict[str, Any]:
+    return _plans.stats()
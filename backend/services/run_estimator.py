@@ -0,0 +1,274 @@
+"""
+Run Estimator - Predicts the AWS calls, duration and endpoint-hours of a native run without writing
+"""
+
+import heapq
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from services.aws_service import AWSService, MAX_FILTER_VALUES
+from services.creation_scheduler import CreationScheduler, rate_limiters
+from services.endpoint_planner import CREATE, EndpointPlanner, summarize
+from utils.metrics import aws_latency
+
+# Calls observed in this process before their mean latency replaces the configured default
+MIN_LATENCY_SAMPLES = 5
+
+# AWS bills endpoint-hours over a 730-hour month
+HOURS_PER_MONTH = 730
+
+def simulate_creates(
+    targets: List[Tuple[int, int]],
+    slots: int,
+    rate: float,
+    burst: int,
+    latency: float
+) -> Dict[str, float]:
+    """
+    Replay one region's create calls against the scheduler's limits
+
+    Targets start in order, `slots` at a time (as BatchRunner does); each
+    runs its calls on its own workers and every call first takes a token
+    from the region's bucket, which starts full. Retries are not modelled.
+
+    Args:
+        targets: (create calls, workers) per target
+        slots: Targets running at once
+        rate: Token refill rate per second
+        burst: Bucket capacity
+        latency: Seconds per create call
+
+    Returns:
+        {"seconds": until the last call returns, "token_wait_seconds": summed over workers}
+    """
+    capacity = float(max(1, burst))
+    tokens, updated, token_wait, finish = capacity, 0.0, 0.0, 0.0
+    remaining = [creates for creates, _ in targets]
+    active = [0] * len(targets)
+    # (time a worker is free, target index)
+    events: List[Tuple[float, int]] = []
+    queued = iter(range(len(targets)))
+
+    def start_next(at: float) -> None:
+        for index in queued:
+            workers = min(targets[index][1], remaining[index])
+            if workers:
+                active[index] = workers
+                for _ in range(workers):
+                    heapq.heappush(events, (at, index))
+                return
+            # Nothing to create: the slot is free again at once
+
+    for _ in range(max(1, slots)):
+        start_next(0.0)
+
+    while events:
+        now, index = heapq.heappop(events)
+        finish = max(finish, now)
+        if not remaining[index]:
+            active[index] -= 1
+            if not active[index]:
+                start_next(now)
+            continue
+        remaining[index] -= 1
+        # Tokens are handed out in call order, never before an earlier grant
+        at = max(now, updated)
+        tokens = min(capacity, tokens + (at - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            at += (1 - tokens) / rate
+            tokens = 0.0
+        updated = at
+        token_wait += at - now
+        heapq.heappush(events, (at + latency, index))
+
+    return {"seconds": finish, "token_wait_seconds": token_wait}
+
+class RunEstimator:
+    """Works out what a native run or batch would do, using only cached or read-only lookups"""
+
+    def __init__(self, aws_service: Optional[AWSService] = None):
+        self.aws_service = aws_service or AWSService()
+        self.planner = EndpointPlanner(self.aws_service)
+
+    def latency(self, operation: str, region: str) -> Tuple[float, str]:
+        """Mean latency of an EC2 operation in a region, observed when enough calls were made"""
+        count, total = aws_latency.totals("ec2", operation, region)
+        if count >= MIN_LATENCY_SAMPLES:
+            return total / count, "observed"
+        if operation == "CreateVpcEndpoint":
+            return settings.PLAN_CREATE_LATENCY_SECONDS, "default"
+        return settings.PLAN_READ_LATENCY_SECONDS, "default"
+
+    def _plan_target(self, target: Dict[str, Any], existing: Optional[Dict[tuple, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """The run's create/skip/modify decision per service; without skip_existing everything is created"""
+        if target["skip_existing"]:
+            return self.planner.plan(**target, existing=existing)
+        if target["endpoint_type"].lower() == "gateway" and target["select_all_route_tables"]:
+            # Warm the cache the run resolves route tables from, as plan() does
+            self.aws_service.describe_route_tables(target["vpc_id"], target["region"])
+        return [
+            {"service_name": name, "action": CREATE, "endpoint_id": None, "state": None, "changes": None}
+            for name in target["service_names"]
+        ]
+
+    def estimate(self, targets: List[Dict[str, Any]], region_concurrency: int = 1) -> Dict[str, Any]:
+        """
+        Estimate a run of one or more targets
+
+        Existing endpoints are looked up once per region, exactly as /batch
+        does. Catalog, subnet and route table lookups come from the caches
+        (and warm them), so a run started within TOPOLOGY_CACHE_TTL_SECONDS
+        makes only the calls counted in "calls"; "cold_cache_calls" counts
+        the lookups it would repeat once those caches expire.
+
+        Args:
+            targets: EndpointCreator arguments per target (see _creation_kwargs)
+                plus "max_workers"
+            region_concurrency: Targets provisioned at once per region
+
+        Returns:
+            Dictionary with per-target plans, per-operation "calls", per-region
+            create timing, the critical-path "duration" and "billing"
+        """
+        regions: Dict[str, List[int]] = {}
+        for index, target in enumerate(targets):
+            regions.setdefault(target["region"], []).append(index)
+
+        # Lookups the run makes, counted the way the caches deduplicate them
+        existing_calls: Dict[str, int] = {}
+        subnet_calls = 0
+        route_table_vpcs = set()
+        existing_by_region: Dict[str, Dict[str, Any]] = {}
+        for region, indexes in regions.items():
+            vpc_ids = list(dict.fromkeys(targets[i]["vpc_id"] for i in indexes if targets[i]["skip_existing"]))
+            existing_calls[region] = math.ceil(len(vpc_ids) / MAX_FILTER_VALUES)
+            existing_by_region[region] = self.planner.existing_endpoints(region, vpc_ids) if vpc_ids else {}
+            seen = set()
+            for i in indexes:
+                target = targets[i]
+                if target["endpoint_type"].lower() == "interface":
+                    missing = [s for s in dict.fromkeys(target["subnets"] or []) if s not in seen]
+                    seen.update(missing)
+                    subnet_calls += math.ceil(len(missing) / MAX_FILTER_VALUES)
+                elif target["select_all_route_tables"]:
+                    route_table_vpcs.add((region, target["vpc_id"]))
+
+        rows = []
+        creates_by_region: Dict[str, List[Tuple[int, int]]] = {region: [] for region in regions}
+        az_hours = interface_endpoints = gateway_endpoints = 0
+        for target in targets:
+            max_workers = CreationScheduler(max_workers=target["max_workers"]).max_workers
+            kwargs = {key: value for key, value in target.items() if key != "max_workers"}
+            plan = self._plan_target(kwargs, existing_by_region[target["region"]].get(target["vpc_id"], {}))
+            target_hours = 0
+            for entry in plan:
+                if entry["action"] != CREATE:
+                    continue
+                if target["endpoint_type"].lower() == "interface":
+                    # One subnet per AZ, and each AZ is billed as an endpoint-hour
+                    subnets = (target["subnets_by_service"] or {}).get(entry["service_name"], target["subnets"])
+                    entry["billable_azs"] = len(subnets or [])
+                    target_hours += entry["billable_azs"]
+                    interface_endpoints += 1
+                else:
+                    entry["billable_azs"] = 0
+                    gateway_endpoints += 1
+            az_hours += target_hours
+            summary = summarize(plan)
+            creates_by_region[target["region"]].append((summary[CREATE], max_workers))
+            rows.append({
+                "region": target["region"],
+                "vpc_id": target["vpc_id"],
+                "endpoint_type": target["endpoint_type"],
+                "max_workers": max_workers,
+                "summary": summary,
+                "endpoint_az_hours_per_hour": target_hours,
+                "plan": plan
+            })
+
+        region_rows = []
+        for region, region_targets in creates_by_region.items():
+            latency, source = self.latency("CreateVpcEndpoint", region)
+            creates = sum(count for count, _ in region_targets)
+            simulated = simulate_creates(
+                region_targets, region_concurrency, rate_limiters.rate, rate_limiters.burst, latency
+            )
+            # Lower bounds: what the token bucket alone and the worker pools alone would allow
+            rate_floor = max(0, creates - rate_limiters.burst) / rate_limiters.rate
+            workers = sum(sorted((w for c, w in region_targets if c), reverse=True)[:region_concurrency])
+            concurrency_floor = math.ceil(creates / workers) * latency if workers else 0.0
+            existing_latency, _ = self.latency("DescribeVpcEndpoints", region)
+            region_rows.append({
+                "region": region,
+                "targets": len(region_targets),
+                "creates": creates,
+                "create_latency_seconds": round(latency, 3),
+                "latency_source": source,
+                "existing_lookup_seconds": round(existing_calls[region] * existing_latency, 3),
+                "create_seconds": round(simulated["seconds"], 3),
+                "token_wait_seconds": round(simulated["token_wait_seconds"], 3),
+                "rate_limit_floor_seconds": round(rate_floor, 3),
+                "concurrency_floor_seconds": round(concurrency_floor, 3),
+                "bottleneck": "rate_limit" if rate_floor > concurrency_floor else "concurrency"
+            })
+
+        # Cold lookups happen before the regions fan out; costed sequentially
+        cold_lookups = {
+            "DescribeVpcEndpointServices": len(regions),
+            "DescribeSubnets": subnet_calls,
+            "DescribeRouteTables": len(route_table_vpcs)
+        }
+        default_region = next(iter(regions))
+        cold_seconds = sum(count * self.latency(op, default_region)[0] for op, count in cold_lookups.items())
+        calls = [
+            {"operation": op, "calls": 0, "cold_cache_calls": count, "rate_limited": False}
+            for op, count in cold_lookups.items() if count
+        ]
+        calls.append({
+            "operation": "DescribeVpcEndpoints",
+            "calls": sum(existing_calls.values()),
+            "cold_cache_calls": sum(existing_calls.values()),
+            "rate_limited": False
+        })
+        calls.append({
+            "operation": "CreateVpcEndpoint",
+            "calls": interface_endpoints + gateway_endpoints,
+            "cold_cache_calls": interface_endpoints + gateway_endpoints,
+            "rate_limited": True
+        })
+
+        # Regions run side by side, so the slowest one is the critical path
+        existing_seconds = max(row["existing_lookup_seconds"] for row in region_rows)
+        create_seconds = max(row["create_seconds"] for row in region_rows)
+        price = settings.PLAN_INTERFACE_ENDPOINT_HOUR_USD
+        return {
+            "targets": rows,
+            "calls": [call for call in calls if call["cold_cache_calls"]],
+            "total_calls": sum(call["calls"] for call in calls),
+            "total_cold_cache_calls": sum(call["cold_cache_calls"] for call in calls),
+            "regions": region_rows,
+            "duration": {
+                "estimated_seconds": round(existing_seconds + create_seconds, 3),
+                "cold_cache_seconds": round(cold_seconds + existing_seconds + create_seconds, 3),
+                "existing_lookup_seconds": existing_seconds,
+                "create_seconds": create_seconds
+            },
+            "billing": {
+                "interface_endpoints": interface_endpoints,
+                "gateway_endpoints": gateway_endpoints,
+                "endpoint_az_hours_per_hour": az_hours,
+                "endpoint_az_hours_per_month": az_hours * HOURS_PER_MONTH,
+                "price_per_endpoint_az_hour_usd": price,
+                "usd_per_hour": round(az_hours * price, 4),
+                "usd_per_month": round(az_hours * price * HOURS_PER_MONTH, 2)
+            },
+            "limits": {
+                "rate_per_second": rate_limiters.rate,
+                "burst": rate_limiters.burst,
+                "region_concurrency": region_concurrency,
+                "max_workers_cap": settings.CREATE_MAX_WORKERS
+            }
+        }
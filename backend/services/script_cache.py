@@ -0,0 +1,95 @@
+"""
+Script Cache - Content-addressed, memory-bounded LRU cache of generated scripts
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+
+@dataclass(frozen=True)
+class CachedScript:
+    """A rendered script or template and the AWS CLI commands it runs"""
+    script_id: str
+    format: str
+    file_name: str
+    content: str
+    commands: List[str]
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.script_id}"'
+
+    @property
+    def size(self) -> int:
+        # Content dominates; commands are roughly one short line per service
+        return len(self.content) + sum(len(c) for c in self.commands)
+
+class ScriptCache:
+    """LRU cache of generated scripts bounded by their total size in characters"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedScript]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, script_id: str) -> Optional[CachedScript]:
+        """Return a cached script by ID (marking it recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(script_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(script_id)
+            self.hits += 1
+            return entry
+
+    def put(self, entry: CachedScript) -> None:
+        """Store a script, evicting least recently used ones beyond max_bytes"""
+        if entry.size > self.max_bytes:
+            # Larger than the whole cache; callers still get it, it just is not kept
+            return
+        with self._lock:
+            previous = self._entries.pop(entry.script_id, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[entry.script_id] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def get_or_render(self, script_id: str, render: Callable[[], CachedScript]) -> CachedScript:
+        """
+        Return the cached script, calling render() on a miss
+
+        Concurrent misses for one ID may both render; the output is identical.
+        """
+        entry = self.get(script_id)
+        if entry is None:
+            entry = render()
+            self.put(entry)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None
+            }
+
+# Shared by /generate (writes) and /execute (reads by script_id)
+script_cache = ScriptCache(max_bytes=settings.SCRIPT_CACHE_MAX_BYTES)
@@ -0,0 +1,168 @@
+"""
+Service Catalog - Region-aware list of VPC endpoint services with an on-disk snapshot
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from services.aws_service import AWSService
+from services.cache_sync import invalidation_bus
+from utils.naming import get_service_short_name
+from utils.ttl_cache import TTLCache
+
+# Bump when the snapshot layout changes so old files are ignored
+SNAPSHOT_VERSION = 1
+
+# Loaded catalogs, keyed by (account, region); filled lazily on first use of a region
+_catalogs = TTLCache(
+    max_entries=settings.SERVICE_CATALOG_MAX_REGIONS,
+    ttl_seconds=settings.SERVICE_CATALOG_TTL_SECONDS
+)
+
+# A refresh through another worker replaces that worker's snapshot file; reload it here too
+invalidation_bus.register(
+    "catalog",
+    lambda event: _catalogs.invalidate(lambda cached_key: cached_key == (event["account"], event["region"]))
+)
+
+def _compact_zones(region: str, zones: List[str]) -> List[str]:
+    """Store "us-east-1a" as "a" when the zone name starts with the region"""
+    return [zone[len(region):] if zone.startswith(region) else zone for zone in zones]
+
+def _expand_zones(region: str, zones: List[str]) -> List[str]:
+    return [zone if zone.startswith(region) else f"{region}{zone}" for zone in zones]
+
+def unsupported_reason(
+    services: Dict[str, Dict[str, Any]],
+    region: str,
+    endpoint_type: str,
+    service_name: str
+) -> Optional[str]:
+    """Why a service cannot be used for endpoint_type in a region's catalog, or None"""
+    entry = services.get(service_name)
+    if entry is None:
+        return f"{service_name} is not offered in {region}"
+    if endpoint_type.lower() not in (t.lower() for t in entry["endpoint_types"]):
+        return (
+            f"{service_name} does not support {endpoint_type} endpoints "
+            f"(supports: {', '.join(entry['endpoint_types'])})"
+        )
+    return None
+
+class ServiceCatalog:
+    """Real VPC endpoint services per region, with endpoint types and availability zones"""
+
+    def __init__(
+        self,
+        aws_service: Optional[AWSService] = None,
+        snapshot_dir: Optional[str] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        self.aws_service = aws_service or AWSService()
+        self.snapshot_dir = snapshot_dir or settings.SERVICE_CATALOG_DIR
+        self.ttl_seconds = ttl_seconds or settings.SERVICE_CATALOG_TTL_SECONDS
+
+    def _snapshot_path(self, account: str, region: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{account}-{region}.json")
+
+    def _read_snapshot(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh snapshot, or None when missing, stale or unreadable"""
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        if snapshot.get("fetched_at", 0) + self.ttl_seconds < time.time():
+            return None
+        return snapshot
+
+    def _write_snapshot(self, path: str, snapshot: Dict[str, Any]) -> None:
+        """Atomically replace the snapshot file; failures only cost a refetch later"""
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _fetch(self, region: str) -> Dict[str, Any]:
+        """Build a compact snapshot from describe-vpc-endpoint-services"""
+        # Some services (e.g. s3) are listed once per endpoint type; merge them.
+        # Only Interface endpoints are zonal, so their AZs win when present.
+        merged: Dict[str, Dict[str, Any]] = {}
+        for detail in self.aws_service.describe_vpc_endpoint_services(region):
+            entry = merged.setdefault(detail["ServiceName"], {"zones": {}, "amazon": False})
+            for service_type in detail.get("ServiceType", []):
+                entry["zones"].setdefault(service_type["ServiceType"], set()).update(
+                    detail.get("AvailabilityZones", [])
+                )
+            entry["amazon"] = entry["amazon"] or detail.get("Owner") == "amazon"
+        rows = []
+        for name, entry in sorted(merged.items()):
+            zones = entry["zones"].get("Interface") or set().union(*entry["zones"].values())
+            rows.append([name, sorted(entry["zones"]), _compact_zones(region, sorted(zones)), entry["amazon"]])
+        return {"version": SNAPSHOT_VERSION, "region": region, "fetched_at": time.time(), "services": rows}
+
+    def _load(self, account: str, region: str, refresh: bool) -> Dict[str, Any]:
+        path = self._snapshot_path(account, region)
+        snapshot = None if refresh else self._read_snapshot(path)
+        source = "snapshot"
+        if snapshot is None:
+            if refresh:
+                self.aws_service.invalidate_topology_cache(region=region)
+            snapshot = self._fetch(region)
+            self._write_snapshot(path, snapshot)
+            source = "aws"
+
+        services = {}
+        for name, types, zones, amazon_owned in snapshot["services"]:
+            services[name] = {
+                "service_name": name,
+                "short_name": get_service_short_name(name),
+                "endpoint_types": types,
+                "availability_zones": _expand_zones(region, zones),
+                "amazon_owned": amazon_owned
+            }
+        return {"region": region, "fetched_at": snapshot["fetched_at"], "source": source, "services": services}
+
+    def get(self, region: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the catalog for a region, loading it on first use
+
+        Lookup order is memory, then the on-disk snapshot, then AWS; both
+        caches expire after SERVICE_CATALOG_TTL_SECONDS.
+
+        Returns:
+            Dictionary with region, fetched_at, source and "services" keyed by service name
+        """
+        account = self.aws_service.get_account_id(region)
+        key = (account, region)
+        if refresh:
+            _catalogs.invalidate(lambda cached_key: cached_key == key)
+        catalog = _catalogs.get_or_load(key, lambda: self._load(account, region, refresh))
+        if refresh:
+            # The snapshot file has been rewritten; other workers reload it from there
+            invalidation_bus.publish("catalog", account=account, region=region)
+        return catalog
+
+    def list_services(self, region: str, endpoint_type: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+        """Catalog for a region as a list, optionally limited to one endpoint type"""
+        catalog = self.get(region, refresh=refresh)
+        services = list(catalog["services"].values())
+        if endpoint_type:
+            services = [s for s in services if endpoint_type.lower() in (t.lower() for t in s["endpoint_types"])]
+        return {
+            "region": region,
+            "fetched_at": catalog["fetched_at"],
+            "source": catalog["source"],
+            "count": len(services),
+            "services": services
+        }
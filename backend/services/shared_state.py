@@ -0,0 +1,140 @@
+"""
+Shared State - SQLite key/value store that every worker process on the host can see
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_state_expires ON state (expires_at);
+"""
+
+def default_state_path() -> str:
+    """
+    SHARED_STATE_PATH, or a file in /dev/shm (memory-backed)
+
+    Raises:
+        RuntimeError when neither is available; the store is on the hot path
+        and is never silently moved to a persistent disk
+    """
+    if settings.SHARED_STATE_PATH:
+        return settings.SHARED_STATE_PATH
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/vpc-endpoint-generator/state.sqlite3"
+    raise RuntimeError("/dev/shm is not available; set SHARED_STATE_PATH to a memory-backed (tmpfs) path")
+
+class SharedStateStore:
+    """Namespaced JSON values with an expiry, stored in one SQLite file in WAL mode"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, creating the database (owner-only) on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Job results and session metadata; create the file readable by this user only
+        os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+        self._local.conn = conn
+        return conn
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, default=str), time.time() + ttl_seconds)
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return a value, or None when it is missing or expired"""
+        row = self._conn().execute(
+            "SELECT value FROM state WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def values(self, namespace: str) -> Dict[str, Dict[str, Any]]:
+        """Every live value in a namespace, by key"""
+        rows = self._conn().execute(
+            "SELECT key, value FROM state WHERE namespace = ? AND expires_at > ?",
+            (namespace, time.time())
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fields: Dict[str, Any],
+        ttl_seconds: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge fields into a live value atomically across processes
+
+        Args:
+            namespace: Value namespace
+            key: Value key
+            fields: Fields to set; fields not named here keep their stored values
+            ttl_seconds: When given, the value expires this long from now instead of at its old expiry
+
+        Returns:
+            The updated value, or None when it is missing or expired
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = self.get(namespace, key)
+            if value is not None:
+                value.update(fields)
+                if ttl_seconds is None:
+                    conn.execute(
+                        "UPDATE state SET value = ? WHERE namespace = ? AND key = ?",
+                        (json.dumps(value, default=str), namespace, key)
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE state SET value = ?, expires_at = ? WHERE namespace = ? AND key = ?",
+                        (json.dumps(value, default=str), time.time() + ttl_seconds, namespace, key)
+                    )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, namespace: str, key: str) -> bool:
+        cursor = self._conn().execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        return cursor.rowcount > 0
+
+    def purge(self) -> int:
+        """Delete expired values; returns how many were removed"""
+        return self._conn().execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),)).rowcount
+
+# Only needed when several worker processes serve the API; one process keeps state in memory
+shared_state = SharedStateStore(default_state_path()) if settings.WORKERS > 1 else None
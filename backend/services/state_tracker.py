@@ -0,0 +1,225 @@
+"""
+State Tracker - Waits for VPC endpoints to settle using one shared, batched describe poller
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
+
+from config import settings
+from services.aws_service import AWSService
+
+# States an endpoint does not leave without further action
+SETTLED_STATES = frozenset({"available", "pendingacceptance", "failed", "rejected", "expired", "deleted"})
+
+def is_settled(state: Optional[str]) -> bool:
+    return (state or "").lower() in SETTLED_STATES
+
+class Watch:
+    """One caller's interest in a set of endpoints; state changes arrive on `changes`"""
+
+    def __init__(self, key: Tuple[str, str], aws_service: AWSService, states: Dict[str, Optional[str]]):
+        self.key = key
+        self.aws_service = aws_service
+        self.states = dict(states)
+        self.changes: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self.done = threading.Event()
+        if not self.pending():
+            self.done.set()
+
+    def pending(self) -> List[str]:
+        return [endpoint_id for endpoint_id, state in self.states.items() if not is_settled(state)]
+
+    def _update(self, endpoint_id: str, state: str) -> None:
+        # Called by the poller thread only
+        if self.states.get(endpoint_id) == state:
+            return
+        self.states[endpoint_id] = state
+        self.changes.put((endpoint_id, state))
+        if not self.pending():
+            self.done.set()
+
+    def iter_changes(self, deadline: float, cancel_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (endpoint_id, state) as states change, until all settle, the deadline passes or cancel"""
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            remaining = deadline - time.monotonic()
+            try:
+                yield self.changes.get(timeout=max(0.0, min(remaining, 0.5)))
+                continue
+            except queue.Empty:
+                pass
+            if self.done.is_set() and self.changes.empty():
+                return
+            if remaining <= 0:
+                return
+
+class EndpointStateTracker:
+    """
+    Collects the pending endpoints of every waiting request and polls them together
+
+    One background thread issues a single multi-ID describe call per
+    (credentials, region) for all pending endpoints, however many requests,
+    jobs or streams are waiting on them. The interval starts at
+    STATE_POLL_MIN_INTERVAL_SECONDS and backs off toward
+    STATE_POLL_MAX_INTERVAL_SECONDS while nothing changes.
+    """
+
+    def __init__(
+        self,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        backoff: Optional[float] = None
+    ):
+        self.min_interval = min_interval or settings.STATE_POLL_MIN_INTERVAL_SECONDS
+        self.max_interval = max_interval or settings.STATE_POLL_MAX_INTERVAL_SECONDS
+        self.backoff = backoff or settings.STATE_POLL_BACKOFF
+        self._watches: List[Watch] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._interval = self.min_interval
+        self._last_poll = time.monotonic()
+        self.polls = 0
+        self.describe_calls = 0
+        self.poll_errors = 0
+
+    def watch(
+        self,
+        aws_service: AWSService,
+        region: str,
+        states: Dict[str, Optional[str]]
+    ) -> Watch:
+        """
+        Start tracking endpoints
+
+        Args:
+            aws_service: Credentials to describe the endpoints with
+            region: Region of the endpoints
+            states: Known state per endpoint ID (e.g. "pending" from the create call)
+        """
+        watch = Watch((aws_service.profile, region), aws_service, states)
+        if watch.done.is_set():
+            return watch
+        with self._condition:
+            if not self._watches:
+                # Coming out of idle: the first poll is one short interval from now
+                self._last_poll = time.monotonic()
+            self._watches.append(watch)
+            # New endpoints move quickly at first; poll them at the short interval
+            self._interval = self.min_interval
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="endpoint-state-poller", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return watch
+
+    def unwatch(self, watch: Watch) -> None:
+        with self._condition:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def iter_wait(
+        self,
+        aws_service: AWSService,
+        region: str,
+        states: Dict[str, Optional[str]],
+        timeout: float,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Generator[Tuple[str, str], None, Dict[str, Any]]:
+        """
+        Yield (endpoint_id, state) as endpoints change, until all settle, the timeout passes or cancel
+
+        Returns (as the generator's return value):
+            {"states": {endpoint_id: state}, "timed_out": bool, "waited_seconds": float}
+        """
+        start = time.monotonic()
+        watch = self.watch(aws_service, region, states)
+        try:
+            yield from watch.iter_changes(start + timeout, cancel_event)
+        finally:
+            self.unwatch(watch)
+        return {
+            "states": dict(watch.states),
+            "timed_out": bool(watch.pending()) and not (cancel_event is not None and cancel_event.is_set()),
+            "waited_seconds": round(time.monotonic() - start, 3)
+        }
+
+    def wait(
+        self,
+        aws_service: AWSService,
+        region: str,
+        states: Dict[str, Optional[str]],
+        timeout: float,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
+        """Block until every endpoint settles (e.g. reaches "available"), the timeout passes or cancel"""
+        changes = self.iter_wait(aws_service, region, states, timeout, cancel_event)
+        while True:
+            try:
+                next(changes)
+            except StopIteration as stop:
+                return stop.value
+
+    def _pending_by_key(self) -> Dict[Tuple[str, str], Tuple[AWSService, List[str]]]:
+        # Caller holds the condition
+        groups: Dict[Tuple[str, str], Tuple[AWSService, List[str]]] = {}
+        for watch in self._watches:
+            _, ids = groups.setdefault(watch.key, (watch.aws_service, []))
+            ids.extend(endpoint_id for endpoint_id in watch.pending() if endpoint_id not in ids)
+        return {key: group for key, group in groups.items() if group[1]}
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                # New watches shorten the interval but don't trigger extra polls
+                while True:
+                    if not self._watches:
+                        self._condition.wait()
+                        continue
+                    remaining = self._last_poll + self._interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(timeout=remaining)
+                groups = self._pending_by_key()
+                watches = list(self._watches)
+
+            changed = False
+            for (_, region), (aws_service, endpoint_ids) in groups.items():
+                try:
+                    endpoints = aws_service.describe_vpc_endpoints_by_id(endpoint_ids, region)
+                except Exception:
+                    # Transient describe failures just delay the next update
+                    self.poll_errors += 1
+                    continue
+                self.describe_calls += 1
+                states = {e["VpcEndpointId"]: e.get("State") for e in endpoints}
+                for watch in watches:
+                    if watch.key[1] != region:
+                        continue
+                    for endpoint_id in watch.pending():
+                        # IDs not visible yet (eventual consistency right after create) stay pending
+                        state = states.get(endpoint_id)
+                        if state is not None and state != watch.states.get(endpoint_id):
+                            watch._update(endpoint_id, state)
+                            changed = True
+
+            with self._condition:
+                self._last_poll = time.monotonic()
+                self.polls += 1
+                self._interval = self.min_interval if changed else min(self.max_interval, self._interval * self.backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "waiting": len(self._watches),
+                "pending_endpoints": sum(len(ids) for _, ids in self._pending_by_key().values()),
+                "interval_seconds": round(self._interval, 3),
+                "polls": self.polls,
+                "describe_calls": self.describe_calls,
+                "poll_errors": self.poll_errors
+            }
+
+# Shared by every waiting request, job and stream in the process
+state_tracker = EndpointStateTracker()
@@ -0,0 +1,59 @@
+"""
+Test fixtures - moto-backed EC2 and an isolated AWSService per test
+"""
+
+import os
+import tempfile
+
+# Settings are read at import time: point every on-disk cache at a scratch
+# directory and use dummy credentials before any backend module is imported
+_SCRATCH = tempfile.mkdtemp(prefix="vpce-tests-")
+os.environ.update({
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_SECURITY_TOKEN": "testing",
+    "AWS_SESSION_TOKEN": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "SERVICE_CATALOG_DIR": os.path.join(_SCRATCH, "service_catalog"),
+    "HISTORY_DB_PATH": os.path.join(_SCRATCH, "history.sqlite3"),
+    "WORKERS": "1"
+})
+os.environ.pop("AWS_ENDPOINT_URL", None)
+os.environ.pop("AWS_PROFILE", None)
+
+import boto3
+import pytest
+from moto import mock_ec2, mock_sts
+
+from services.aws_clients import AWSClientPool
+from services.aws_service import AWSService, topology_cache
+from services.creation_scheduler import CreationScheduler
+from utils.moto_vpc import create_test_vpc
+
+REGION = "us-east-1"
+
+@pytest.fixture
+def ec2():
+    """A raw EC2 client against a fresh moto backend"""
+    with mock_ec2(), mock_sts():
+        yield boto3.client("ec2", region_name=REGION)
+
+@pytest.fixture
+def aws_service(ec2):
+    """AWSService with its own client pool, so no client or cache outlives the test"""
+    pool = AWSClientPool()
+    # A developer's .env may point at a moto server; the in-process mock needs the real URL
+    pool.endpoint_url = None
+    topology_cache.invalidate()
+    yield AWSService(pool=pool)
+    topology_cache.invalidate()
+
+@pytest.fixture
+def vpc(ec2):
+    """A VPC with two subnets in different AZs and a security group"""
+    return create_test_vpc(ec2)
+
+@pytest.fixture
+def scheduler():
+    """A scheduler whose retries back off for milliseconds instead of seconds"""
+    return CreationScheduler(max_workers=4, base_delay=0.001, max_delay=0.001)
@@ -0,0 +1,88 @@
+"""
+AZPreflight - subnet/service AZ checks with subnets resolved from moto EC2
+"""
+
+from services.az_preflight import AZPreflight
+
+REGION = "us-east-1"
+EC2 = f"com.amazonaws.{REGION}.ec2"
+STS = f"com.amazonaws.{REGION}.sts"
+S3 = f"com.amazonaws.{REGION}.s3"
+
+class StaticCatalog:
+    """ServiceCatalog stand-in with fixed AZs per service"""
+
+    def __init__(self, services):
+        self.services = {
+            name: {"service_name": name, "endpoint_types": types, "availability_zones": zones}
+            for name, (types, zones) in services.items()
+        }
+
+    def get(self, region, refresh=False):
+        return {"region": region, "services": self.services}
+
+def _preflight(aws_service, **services):
+    catalog = StaticCatalog({
+        EC2: (["Interface"], [f"{REGION}a", f"{REGION}b", f"{REGION}c"]),
+        STS: (["Interface"], [f"{REGION}a"]),
+        S3: (["Gateway"], []),
+        **services
+    })
+    return AZPreflight(aws_service, catalog)
+
+def test_subnets_in_offered_zones_pass(aws_service, vpc):
+    preflight = _preflight(aws_service)
+    report = preflight.check(REGION, vpc["vpc_id"], "Interface", [EC2], vpc["subnets"])
+
+    assert report["errors"] == []
+    assert report["services"][0]["usable_subnets"] == vpc["subnets"]
+    assert set(report["subnet_zones"].values()) == {f"{REGION}a", f"{REGION}b"}
+    assert preflight.subnets_by_service(report) == {}
+
+def test_subnets_outside_a_service_zones_are_dropped(aws_service, vpc):
+    preflight = _preflight(aws_service)
+    report = preflight.check(REGION, vpc["vpc_id"], "Interface", [EC2, STS], vpc["subnets"])
+
+    sts = report["services"][1]
+    assert report["errors"] == []
+    assert sts["usable_subnets"] == vpc["subnets"][:1]
+    assert sts["dropped_subnets"] == [{"subnet_id": vpc["subnets"][1], "availability_zone": f"{REGION}b"}]
+    assert preflight.subnets_by_service(report) == {STS: vpc["subnets"][:1]}
+
+def test_service_in_none_of_the_subnet_zones_fails(aws_service, vpc):
+    preflight = _preflight(aws_service, **{STS: (["Interface"], [f"{REGION}c"])})
+    report = preflight.check(REGION, vpc["vpc_id"], "Interface", [STS], vpc["subnets"])
+
+    assert len(report["errors"]) == 1
+    assert "not available in any AZ" in report["errors"][0]
+    assert report["services"][0]["usable_subnets"] == []
+
+def test_unknown_and_wrong_type_services_fail(aws_service, vpc):
+    report = _preflight(aws_service).check(
+        REGION, vpc["vpc_id"], "Interface", [S3, f"com.amazonaws.{REGION}.nope"], vpc["subnets"]
+    )
+
+    assert report["errors"] == [
+        f"{S3} does not support Interface endpoints (supports: Gateway)",
+        f"com.amazonaws.{REGION}.nope is not offered in {REGION}"
+    ]
+
+def test_subnet_problems_are_reported(aws_service, vpc, ec2):
+    other_vpc = ec2.create_vpc(CidrBlock="10.1.0.0/16")["Vpc"]["VpcId"]
+    foreign = ec2.create_subnet(VpcId=other_vpc, CidrBlock="10.1.0.0/24")["Subnet"]["SubnetId"]
+    same_zone = ec2.create_subnet(
+        VpcId=vpc["vpc_id"], CidrBlock="10.0.9.0/24", AvailabilityZone=f"{REGION}a"
+    )["Subnet"]["SubnetId"]
+    subnets = [*vpc["subnets"], same_zone, foreign, "subnet-00000000"]
+
+    errors = _preflight(aws_service).check(REGION, vpc["vpc_id"], "Interface", [EC2], subnets)["errors"]
+
+    assert "Subnet subnet-00000000 does not exist" in errors
+    assert f"Subnet {foreign} belongs to {other_vpc}, not {vpc['vpc_id']}" in errors
+    assert any(vpc["subnets"][0] in error and same_zone in error and "at most one subnet per AZ" in error for error in errors)
+
+def test_gateway_requests_ignore_subnets(aws_service, vpc):
+    report = _preflight(aws_service).check(REGION, vpc["vpc_id"], "Gateway", [S3], ["subnet-00000000"])
+
+    assert report["errors"] == []
+    assert report["services"][0]["usable_subnets"] is None
@@ -0,0 +1,135 @@
+"""
+CreationScheduler - retries, rate limiting and bounded concurrency
+"""
+
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from services.creation_scheduler import CreationScheduler, TokenBucket
+from services.endpoint_creator import EndpointCreator
+
+REGION = "us-east-1"
+
+class CountingBucket(TokenBucket):
+    """A bucket that never waits and counts the tokens taken"""
+
+    def __init__(self):
+        super().__init__(rate=1000, burst=1000)
+        self.taken = 0
+
+    def acquire(self) -> float:
+        self.taken += 1
+        return 0.0
+
+def _failing(*errors):
+    """A call raising each error in turn, then returning "ok" """
+    remaining = list(errors)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+    return call, calls
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "CreateVpcEndpoint")
+
+def test_throttling_is_retried_with_one_token_per_attempt(scheduler):
+    bucket = CountingBucket()
+    call, calls = _failing(_client_error("RequestLimitExceeded"), _client_error("Throttling"))
+
+    assert scheduler.call_with_retry(call, bucket) == "ok"
+    assert len(calls) == 3
+    assert bucket.taken == 3
+
+def test_transient_errors_are_retried(scheduler):
+    call, calls = _failing(_client_error("ServiceUnavailable"), EndpointConnectionError(endpoint_url="http://ec2"))
+
+    assert scheduler.call_with_retry(call, CountingBucket()) == "ok"
+    assert len(calls) == 3
+
+def test_other_errors_are_not_retried(scheduler):
+    call, calls = _failing(_client_error("InvalidVpcID.NotFound"))
+
+    with pytest.raises(ClientError):
+        scheduler.call_with_retry(call, CountingBucket())
+    assert len(calls) == 1
+
+def test_gives_up_after_max_retries():
+    scheduler = CreationScheduler(max_retries=2, base_delay=0.001, max_delay=0.001)
+    call, calls = _failing(*[_client_error("RequestLimitExceeded")] * 5)
+
+    with pytest.raises(ClientError) as raised:
+        scheduler.call_with_retry(call, CountingBucket())
+    assert raised.value.response["Error"]["Code"] == "RequestLimitExceeded"
+    assert len(calls) == 3
+
+def test_token_bucket_spends_the_burst_then_waits_for_refills():
+    bucket = TokenBucket(rate=20, burst=2)
+    start = time.monotonic()
+    waits = [bucket.acquire() for _ in range(4)]
+    elapsed = time.monotonic() - start
+
+    assert waits[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in waits[2:])
+    # Two tokens beyond the burst at 20 per second
+    assert 0.09 <= elapsed < 0.5
+
+def test_run_keeps_input_order_and_bounds_concurrency():
+    scheduler = CreationScheduler(max_workers=3)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def work(item):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        if item == 4:
+            raise ValueError("boom")
+        return item * 10
+
+    outcomes = scheduler.run(list(range(10)), work, CountingBucket())
+
+    assert [o["index"] for o in outcomes] == list(range(10))
+    assert outcomes[3]["value"] == 30 and outcomes[3]["attempts"] == 1
+    assert isinstance(outcomes[4]["error"], ValueError)
+    assert peak[0] <= 3
+
+def test_mutating_client_leaves_retries_to_the_scheduler(aws_service):
+    mutating = aws_service.pool.ec2_mutating(REGION, aws_service.profile)
+    reading = aws_service.pool.ec2(REGION, aws_service.profile)
+
+    assert mutating.meta.config.retries["total_max_attempts"] == 1
+    assert reading.meta.config.retries["total_max_attempts"] > 1
+    assert mutating is not reading
+
+def test_retried_create_reuses_its_client_token(aws_service, scheduler, vpc, ec2, monkeypatch):
+    create = aws_service.create_vpc_endpoint
+    tokens = []
+
+    def throttle_first(**kwargs):
+        tokens.append(kwargs["client_token"])
+        if len(tokens) == 1:
+            raise _client_error("RequestLimitExceeded")
+        return create(**kwargs)
+
+    monkeypatch.setattr(aws_service, "create_vpc_endpoint", throttle_first)
+    rows = EndpointCreator(aws_service, scheduler).create_endpoints(
+        endpoint_type="Gateway",
+        region=REGION,
+        vpc_id=vpc["vpc_id"],
+        service_names=[f"com.amazonaws.{REGION}.s3"]
+    )["results"]
+
+    assert rows[0]["success"] and rows[0]["attempts"] == 2
+    assert len(tokens) == 2 and tokens[0] == tokens[1]
+    assert len(ec2.describe_vpc_endpoints()["VpcEndpoints"]) == 1
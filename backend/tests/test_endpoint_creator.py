@@ -0,0 +1,85 @@
+"""
+EndpointCreator - native creates against moto EC2
+"""
+
+from botocore.exceptions import ClientError
+
+from services.endpoint_creator import EndpointCreator
+
+REGION = "us-east-1"
+EC2 = f"com.amazonaws.{REGION}.ec2"
+STS = f"com.amazonaws.{REGION}.sts"
+
+def _create(creator, vpc, service_names, **kwargs):
+    return creator.create_endpoints(
+        endpoint_type="Interface",
+        region=REGION,
+        vpc_id=vpc["vpc_id"],
+        service_names=service_names,
+        tag_prefix="app",
+        subnets=vpc["subnets"],
+        security_groups=vpc["security_groups"],
+        **kwargs
+    )
+
+def test_creates_every_service(aws_service, scheduler, vpc, ec2):
+    result = _create(EndpointCreator(aws_service, scheduler), vpc, [EC2, STS])
+
+    rows = result["results"]
+    assert [row["service_name"] for row in rows] == [EC2, STS]
+    assert all(row["success"] and row["action"] == "create" and row["attempts"] == 1 for row in rows)
+    assert rows[0]["tag_name"] == "app-ec2"
+
+    endpoints = ec2.describe_vpc_endpoints()["VpcEndpoints"]
+    assert sorted(e["VpcEndpointId"] for e in endpoints) == sorted(row["endpoint_id"] for row in rows)
+    tags = {e["ServiceName"]: {t["Key"]: t["Value"] for t in e["Tags"]} for e in endpoints}
+    assert tags[STS]["Name"] == "app-sts"
+
+def test_client_error_fails_only_its_service(aws_service, scheduler, vpc, monkeypatch):
+    create = aws_service.create_vpc_endpoint
+
+    def reject_sts(**kwargs):
+        if kwargs["service_name"] == STS:
+            raise ClientError({"Error": {"Code": "InvalidParameter", "Message": "bad subnet"}}, "CreateVpcEndpoint")
+        return create(**kwargs)
+
+    monkeypatch.setattr(aws_service, "create_vpc_endpoint", reject_sts)
+    rows = _create(EndpointCreator(aws_service, scheduler), vpc, [EC2, STS])["results"]
+
+    assert rows[0]["success"] and rows[0]["endpoint_id"]
+    assert not rows[1]["success"]
+    assert (rows[1]["error_code"], rows[1]["error_message"]) == ("InvalidParameter", "bad subnet")
+    # Not a throttling error: no retry
+    assert rows[1]["attempts"] == 1
+
+def test_missing_vpc_reports_the_ec2_error_code(aws_service, scheduler, vpc):
+    rows = _create(EndpointCreator(aws_service, scheduler), {**vpc, "vpc_id": "vpc-00000000"}, [EC2])["results"]
+
+    assert not rows[0]["success"]
+    assert rows[0]["error_code"] == "InvalidVpcID.NotFound"
+
+def test_unexpected_error_becomes_a_failed_row(aws_service, scheduler, vpc, monkeypatch):
+    create = aws_service.create_vpc_endpoint
+
+    def malformed(**kwargs):
+        if kwargs["service_name"] == EC2:
+            raise KeyError("VpcEndpoint")
+        return create(**kwargs)
+
+    monkeypatch.setattr(aws_service, "create_vpc_endpoint", malformed)
+    rows = _create(EndpointCreator(aws_service, scheduler), vpc, [EC2, STS])["results"]
+
+    assert rows[0]["error_code"] == "KeyError" and not rows[0]["success"]
+    assert rows[1]["success"]
+
+def test_skip_existing_creates_only_missing_services(aws_service, scheduler, vpc, ec2):
+    creator = EndpointCreator(aws_service, scheduler)
+    first = _create(creator, vpc, [EC2])["results"][0]
+
+    rows = _create(creator, vpc, [EC2, STS], skip_existing=True)["results"]
+
+    assert rows[0]["action"] == "skip"
+    assert rows[0]["endpoint_id"] == first["endpoint_id"]
+    assert rows[0]["attempts"] == 0
+    assert rows[1]["action"] == "create" and rows[1]["success"]
+    assert len(ec2.describe_vpc_endpoints()["VpcEndpoints"]) == 2
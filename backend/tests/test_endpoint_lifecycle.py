@@ -0,0 +1,145 @@
+"""
+EndpointLifecycle - bulk delete, modify and retag against moto EC2
+"""
+
+import pytest
+
+from config import settings
+from services.endpoint_lifecycle import EndpointLifecycle, chunked
+
+REGION = "us-east-1"
+SERVICES = [f"com.amazonaws.{REGION}.{name}" for name in ("ec2", "sts", "ssm", "logs", "ecr.api")]
+
+@pytest.fixture
+def endpoints(ec2, vpc):
+    """One Interface endpoint per service, in the first subnet only"""
+    return [
+        ec2.create_vpc_endpoint(
+            VpcId=vpc["vpc_id"],
+            VpcEndpointType="Interface",
+            ServiceName=service_name,
+            SubnetIds=vpc["subnets"][:1],
+            SecurityGroupIds=vpc["security_groups"]
+        )["VpcEndpoint"]["VpcEndpointId"]
+        for service_name in SERVICES
+    ]
+
+@pytest.fixture
+def lifecycle(aws_service, scheduler):
+    return EndpointLifecycle(aws_service, scheduler)
+
+def _recording(monkeypatch, aws_service, name, fail=None):
+    """Record the ID lists passed to an AWSService method; fail(ids) may return an error to raise"""
+    calls = []
+    method = getattr(aws_service, name)
+
+    def wrapper(ids, *args, **kwargs):
+        calls.append(list(ids) if isinstance(ids, list) else ids)
+        error = fail(ids) if fail else None
+        if error is not None:
+            raise error
+        return method(ids, *args, **kwargs)
+
+    monkeypatch.setattr(aws_service, name, wrapper)
+    return calls
+
+def _select(lifecycle, vpc, endpoint_ids):
+    """Selected endpoints by ID (moto cannot filter DescribeVpcEndpoints by vpc-endpoint-id)"""
+    selected, _ = lifecycle.select(REGION, vpc_ids=[vpc["vpc_id"]])
+    return [e for e in selected if e["VpcEndpointId"] in endpoint_ids]
+
+def test_chunked():
+    assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert chunked([], 3) == []
+    assert chunked([1], 0) == [[1]]
+
+def test_select_filters_by_service_and_type(lifecycle, vpc, endpoints):
+    selected, _ = lifecycle.select(REGION, vpc_ids=[vpc["vpc_id"]], service_names=["ecr.api", SERVICES[0]])
+    assert sorted(e["ServiceName"] for e in selected) == sorted([SERVICES[0], SERVICES[4]])
+
+    selected, _ = lifecycle.select(REGION, vpc_ids=[vpc["vpc_id"]], endpoint_type="Gateway")
+    assert selected == []
+
+def test_delete_runs_one_call_per_batch(lifecycle, aws_service, vpc, endpoints, ec2, monkeypatch):
+    monkeypatch.setattr(settings, "LIFECYCLE_DELETE_BATCH_SIZE", 2)
+    calls = _recording(monkeypatch, aws_service, "delete_vpc_endpoints")
+    selected = _select(lifecycle, vpc, endpoints)
+
+    report = lifecycle.delete(REGION, selected, ["vpce-00000000"])
+
+    assert sorted(len(ids) for ids in calls) == [1, 2, 2]
+    assert report["api_calls"] == 3
+    results = {r["endpoint_id"]: r for r in report["results"]}
+    assert all(results[i]["success"] and results[i]["changed"] for i in endpoints)
+    assert results["vpce-00000000"]["error_code"] == "InvalidVpcEndpointId.NotFound"
+    states = {e["VpcEndpointId"]: e["State"] for e in ec2.describe_vpc_endpoints()["VpcEndpoints"]}
+    assert all(states.get(i, "deleted") == "deleted" for i in endpoints)
+
+def test_failed_batch_fails_only_its_endpoints(lifecycle, aws_service, vpc, endpoints, monkeypatch):
+    monkeypatch.setattr(settings, "LIFECYCLE_DELETE_BATCH_SIZE", 2)
+    poisoned = endpoints[2]
+    _recording(
+        monkeypatch, aws_service, "delete_vpc_endpoints",
+        fail=lambda ids: RuntimeError("connection reset") if poisoned in ids else None
+    )
+    selected = _select(lifecycle, vpc, endpoints)
+
+    results = {r["endpoint_id"]: r for r in lifecycle.delete(REGION, selected)["results"]}
+
+    failed = {i for i, r in results.items() if not r["success"]}
+    assert poisoned in failed and len(failed) == 2
+    assert all(results[i]["error_code"] == "RuntimeError" for i in failed)
+    assert all(results[i]["success"] for i in endpoints if i not in failed)
+
+def test_unsuccessful_items_fail_on_their_own(lifecycle, aws_service, vpc, endpoints, monkeypatch):
+    def partial(ids, region):
+        return [{"ResourceId": ids[0], "Error": {"Code": "InvalidVpcEndpoint.NotFound", "Message": "gone"}}]
+
+    monkeypatch.setattr(aws_service, "delete_vpc_endpoints", partial)
+    selected = _select(lifecycle, vpc, endpoints[:2])
+
+    results = lifecycle.delete(REGION, selected)["results"]
+
+    assert [r["success"] for r in results].count(False) == 1
+    failed = next(r for r in results if not r["success"])
+    assert (failed["error_code"], failed["error_message"]) == ("InvalidVpcEndpoint.NotFound", "gone")
+
+def test_modify_calls_only_for_endpoints_that_change(lifecycle, aws_service, vpc, endpoints, ec2, monkeypatch):
+    ec2.modify_vpc_endpoint(VpcEndpointId=endpoints[0], AddSubnetIds=vpc["subnets"][1:])
+    calls = _recording(monkeypatch, aws_service, "modify_vpc_endpoint")
+    selected = _select(lifecycle, vpc, endpoints[:2])
+
+    report = lifecycle.modify(REGION, selected, subnets=vpc["subnets"])
+
+    assert calls == [endpoints[1]]
+    assert report["api_calls"] == 1
+    results = {r["endpoint_id"]: r for r in report["results"]}
+    assert results[endpoints[0]]["success"] and not results[endpoints[0]]["changed"]
+    assert results[endpoints[1]]["changed"]
+    described = ec2.describe_vpc_endpoints(VpcEndpointIds=[endpoints[1]])["VpcEndpoints"][0]
+    assert sorted(described["SubnetIds"]) == sorted(vpc["subnets"])
+
+def test_retag_groups_endpoints_needing_the_same_tags(lifecycle, aws_service, vpc, endpoints, ec2, monkeypatch):
+    ec2.create_tags(Resources=[endpoints[0]], Tags=[{"Key": "team", "Value": "core"}])
+    calls = _recording(monkeypatch, aws_service, "create_tags")
+    selected = _select(lifecycle, vpc, endpoints)
+
+    report = lifecycle.retag(REGION, selected, tags={"team": "core"})
+
+    assert len(calls) == 1 and sorted(calls[0]) == sorted(endpoints[1:])
+    assert report["api_calls"] == 1
+    results = {r["endpoint_id"]: r for r in report["results"]}
+    assert not results[endpoints[0]]["changed"]
+    tags = {
+        e["VpcEndpointId"]: {t["Key"]: t["Value"] for t in e.get("Tags", [])}
+        for e in ec2.describe_vpc_endpoints()["VpcEndpoints"]
+    }
+    assert all(tags[i]["team"] == "core" for i in endpoints)
+
+def test_retag_name_from_prefix_needs_one_call_per_name(lifecycle, aws_service, vpc, endpoints, monkeypatch):
+    calls = _recording(monkeypatch, aws_service, "create_tags")
+    selected = _select(lifecycle, vpc, endpoints[:3])
+
+    lifecycle.retag(REGION, selected, tag_prefix="app")
+
+    assert sorted(len(ids) for ids in calls) == [1, 1, 1]
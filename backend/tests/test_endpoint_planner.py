@@ -0,0 +1,88 @@
+"""
+EndpointPlanner - create/skip/modify decisions against moto EC2
+"""
+
+from services.endpoint_planner import CREATE, MODIFY, SKIP, EndpointPlanner, index_endpoints, summarize
+
+REGION = "us-east-1"
+EC2 = f"com.amazonaws.{REGION}.ec2"
+STS = f"com.amazonaws.{REGION}.sts"
+S3 = f"com.amazonaws.{REGION}.s3"
+
+def _interface(ec2, vpc, service_name, subnets):
+    return ec2.create_vpc_endpoint(
+        VpcId=vpc["vpc_id"],
+        VpcEndpointType="Interface",
+        ServiceName=service_name,
+        SubnetIds=subnets,
+        SecurityGroupIds=vpc["security_groups"],
+        PrivateDnsEnabled=True
+    )["VpcEndpoint"]["VpcEndpointId"]
+
+def _plan(aws_service, vpc, service_names, **kwargs):
+    arguments = {
+        "endpoint_type": "Interface",
+        "region": REGION,
+        "vpc_id": vpc["vpc_id"],
+        "service_names": service_names,
+        "subnets": vpc["subnets"],
+        "security_groups": vpc["security_groups"],
+        **kwargs
+    }
+    return {entry["service_name"]: entry for entry in EndpointPlanner(aws_service).plan(**arguments)}
+
+def test_plans_create_skip_and_modify(aws_service, vpc, ec2):
+    complete = _interface(ec2, vpc, EC2, vpc["subnets"])
+    partial = _interface(ec2, vpc, STS, vpc["subnets"][:1])
+
+    plan = _plan(aws_service, vpc, [EC2, STS, f"com.amazonaws.{REGION}.ssm"])
+
+    assert (plan[EC2]["action"], plan[EC2]["endpoint_id"], plan[EC2]["changes"]) == (SKIP, complete, None)
+    assert plan[STS]["action"] == MODIFY and plan[STS]["endpoint_id"] == partial
+    assert plan[STS]["changes"] == {"add_subnet_ids": vpc["subnets"][1:]}
+    assert plan[f"com.amazonaws.{REGION}.ssm"]["action"] == CREATE
+    assert summarize(list(plan.values())) == {CREATE: 1, SKIP: 1, MODIFY: 1}
+
+def test_extra_settings_on_the_endpoint_are_not_changes(aws_service, vpc, ec2):
+    _interface(ec2, vpc, EC2, vpc["subnets"])
+
+    plan = _plan(aws_service, vpc, [EC2], subnets=vpc["subnets"][:1])
+
+    assert plan[EC2]["action"] == SKIP
+
+def test_private_dns_and_subnets_by_service_are_compared(aws_service, vpc, ec2):
+    _interface(ec2, vpc, EC2, vpc["subnets"][:1])
+
+    plan = _plan(
+        aws_service, vpc, [EC2], private_dns_enabled=False, subnets_by_service={EC2: vpc["subnets"][:1]}
+    )
+
+    assert plan[EC2]["changes"] == {"private_dns_enabled": False}
+
+def test_endpoint_type_must_match(aws_service, vpc, ec2):
+    ec2.create_vpc_endpoint(VpcId=vpc["vpc_id"], VpcEndpointType="Gateway", ServiceName=S3)
+
+    assert _plan(aws_service, vpc, [S3])[S3]["action"] == CREATE
+    assert _plan(aws_service, vpc, [S3], endpoint_type="Gateway")[S3]["action"] == SKIP
+
+def test_gateway_with_all_route_tables_adds_missing_ones(aws_service, vpc, ec2):
+    main = ec2.describe_route_tables(
+        Filters=[{"Name": "vpc-id", "Values": [vpc["vpc_id"]]}]
+    )["RouteTables"][0]["RouteTableId"]
+    extra = ec2.create_route_table(VpcId=vpc["vpc_id"])["RouteTable"]["RouteTableId"]
+    endpoint_id = ec2.create_vpc_endpoint(
+        VpcId=vpc["vpc_id"], VpcEndpointType="Gateway", ServiceName=S3, RouteTableIds=[main]
+    )["VpcEndpoint"]["VpcEndpointId"]
+
+    plan = _plan(aws_service, vpc, [S3], endpoint_type="Gateway", select_all_route_tables=True)
+
+    assert plan[S3]["endpoint_id"] == endpoint_id
+    assert plan[S3]["changes"] == {"add_route_table_ids": [extra]}
+
+def test_inactive_endpoints_do_not_count_as_existing():
+    endpoints = [
+        {"VpcEndpointId": "vpce-1", "VpcId": "vpc-1", "ServiceName": EC2, "VpcEndpointType": "Interface", "State": "deleted"},
+        {"VpcEndpointId": "vpce-2", "VpcId": "vpc-1", "ServiceName": STS, "VpcEndpointType": "Interface", "State": "available"}
+    ]
+
+    assert list(index_endpoints(endpoints)["vpc-1"]) == [(STS, "interface")]
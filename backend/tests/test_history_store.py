@@ -0,0 +1,141 @@
+"""
+HistoryStore - batched writes, keyset paging and the per-service VPC view
+"""
+
+import threading
+import time
+
+import pytest
+
+from config import settings
+from services.history_store import CREATED, DELETED, FAILED, SKIPPED, HistoryStore
+
+REGION = "us-east-1"
+EC2 = f"com.amazonaws.{REGION}.ec2"
+ECR_API = f"com.amazonaws.{REGION}.ecr.api"
+ECR_DKR = f"com.amazonaws.{REGION}.ecr.dkr"
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    yield history
+    history.close()
+
+def _row(service_name, success=True, action="create", endpoint_id="vpce-11111111"):
+    return {
+        "service_name": service_name,
+        "endpoint_id": endpoint_id if success else None,
+        "action": action,
+        "success": success,
+        "error_message": None if success else "boom"
+    }
+
+def _pages(query, **kwargs):
+    """Follow next_cursor to the end, returning every page"""
+    pages, cursor = [], None
+    while True:
+        page = query(cursor=cursor, **kwargs)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_pages_cover_every_event_once_newest_first(store):
+    for index in range(7):
+        store.record_native(REGION, f"vpc-{index:08x}", "Interface", [_row(EC2)])
+    assert store.flush()
+
+    pages = _pages(store.query_events, limit=3)
+
+    assert [len(page["items"]) for page in pages] == [3, 3, 1]
+    vpcs = [item["vpc_id"] for page in pages for item in page["items"]]
+    assert vpcs == [f"vpc-{index:08x}" for index in reversed(range(7))]
+    assert all(item["success"] is True and "output" not in item for page in pages for item in page["items"])
+
+def test_exact_multiple_of_the_page_size_ends_without_an_empty_page(store):
+    for index in range(4):
+        store.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2)])
+    assert store.flush()
+
+    assert [len(page["items"]) for page in _pages(store.query_events, limit=2)] == [2, 2]
+
+def test_limit_is_capped(store, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_PAGE_MAX", 2)
+    store.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2), _row(ECR_API), _row(ECR_DKR)])
+    assert store.flush()
+
+    page = store.query_endpoints(limit=100)
+
+    assert len(page["items"]) == 2 and page["next_cursor"] is not None
+
+def test_endpoint_filters(store):
+    store.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2), _row(ECR_API), _row(ECR_DKR, success=False)])
+    store.record_native("eu-west-1", "vpc-00000002", "Interface", [_row("com.amazonaws.eu-west-1.ecr.api")])
+    assert store.flush()
+
+    def names(**kwargs):
+        return [item["service_name"] for item in store.query_endpoints(**kwargs)["items"]]
+
+    assert names(service="ecr.api", region=REGION) == [ECR_API]
+    assert names(service="ecr*", vpc_id="vpc-00000001") == [ECR_DKR, ECR_API]
+    assert names(status=FAILED) == [ECR_DKR]
+    assert len(names(service="ecr.api")) == 2
+
+def test_vpcs_with_service_uses_the_latest_successful_row(store):
+    store.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2)])
+    # A failed duplicate create leaves the existing endpoint in place
+    store.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2, success=False)])
+    store.record_native(REGION, "vpc-00000002", "Interface", [_row(EC2)])
+    store.record_lifecycle("delete", REGION, [{
+        "endpoint_id": "vpce-11111111", "vpc_id": "vpc-00000002", "service_name": EC2,
+        "success": True, "changed": True
+    }])
+    store.record_native(REGION, "vpc-00000003", "Interface", [_row(EC2, action="skip")])
+    store.record_native(REGION, "vpc-00000004", "Interface", [_row(EC2, success=False)])
+    assert store.flush()
+
+    items = store.vpcs_with_service("ec2", region=REGION)["items"]
+
+    assert {item["vpc_id"]: item["status"] for item in items} == {"vpc-00000001": CREATED, "vpc-00000003": SKIPPED}
+    deleted = store.query_endpoints(status=DELETED)["items"]
+    assert [item["vpc_id"] for item in deleted] == ["vpc-00000002"]
+
+def test_vpcs_with_service_pages(store):
+    for index in range(5):
+        store.record_native(REGION, f"vpc-{index:08x}", "Interface", [_row(EC2)])
+    assert store.flush()
+
+    pages = _pages(store.vpcs_with_service, service=EC2, limit=2)
+
+    assert sorted(item["vpc_id"] for page in pages for item in page["items"]) == [f"vpc-{i:08x}" for i in range(5)]
+
+def test_disabled_store_records_nothing(tmp_path):
+    store = HistoryStore(str(tmp_path / "off.sqlite3"), enabled=False)
+
+    assert store.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2)]) is None
+    assert store.query_events()["items"] == []
+
+def test_flush_gives_up_while_the_queue_stays_full(tmp_path, monkeypatch):
+    history = HistoryStore(str(tmp_path / "full.sqlite3"), queue_size=2)
+    stalled_write, release = threading.Event(), threading.Event()
+    write = history._write
+
+    def stalled(conn, rows):
+        stalled_write.set()
+        release.wait(5)
+        write(conn, rows)
+
+    monkeypatch.setattr(history, "_write", stalled)
+    history.record_native(REGION, "vpc-00000001", "Interface", [_row(EC2)])
+    # The writer is stuck on the first event's rows; the second event fills the queue
+    assert stalled_write.wait(5)
+    history.record_native(REGION, "vpc-00000002", "Interface", [_row(EC2)])
+
+    start = time.monotonic()
+    assert history.flush(timeout=0.2) is False
+    assert time.monotonic() - start < 1
+
+    release.set()
+    assert history.flush()
+    assert len(history.query_events()["items"]) == 2
+    history.close()
@@ -0,0 +1,62 @@
+"""
+JobManager - jobs shared between worker processes through one SharedStateStore
+"""
+
+import threading
+import time
+
+import pytest
+
+from config import settings
+from services.job_manager import CANCELLED, QUEUED, RUNNING, SUCCEEDED, JobManager
+from services.shared_state import SharedStateStore
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStateStore(str(tmp_path / "state.sqlite3"))
+
+def _blocking(release):
+    def run(cancel_event):
+        release.wait(5)
+        return {"ok": True}
+    return run
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_cancel_through_another_worker_stops_a_queued_job(store, monkeypatch):
+    # No watcher tick during the test: the job must see the request when it is dequeued
+    monkeypatch.setattr(settings, "JOB_CANCEL_POLL_SECONDS", 60)
+    owner, other = JobManager(max_workers=1, store=store), JobManager(store=store)
+    release = threading.Event()
+    started = []
+    running = owner.submit("native", _blocking(release))
+    queued = owner.submit("native", lambda cancel_event: started.append(True) or {})
+    _wait_for(lambda: other.get(running.id).status == RUNNING)
+
+    assert other.cancel(queued.id).status == QUEUED
+    release.set()
+    queued.future.result(5)
+
+    assert started == []
+    assert other.get(running.id).status == SUCCEEDED
+    assert other.get(queued.id).status == CANCELLED
+    owner.shutdown()
+
+def test_records_of_running_jobs_outlive_the_result_ttl(store, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CANCEL_POLL_SECONDS", 0.02)
+    owner = JobManager(max_workers=1, ttl_seconds=0.2, store=store)
+    other = JobManager(store=store)
+    release = threading.Event()
+    job = owner.submit("script", _blocking(release))
+
+    time.sleep(0.6)
+    assert other.get(job.id).status == RUNNING
+
+    release.set()
+    job.future.result(5)
+    assert job.status == SUCCEEDED
+    owner.shutdown()
@@ -0,0 +1,77 @@
+"""
+Run estimator - create-phase simulation and a planned run against moto EC2
+"""
+
+import pytest
+
+from services.run_estimator import HOURS_PER_MONTH, RunEstimator, simulate_creates
+
+REGION = "us-east-1"
+
+def test_rate_limit_bound_single_target():
+    # 50 calls from the full bucket, then 250 at 5 per second; the last returns one latency later
+    result = simulate_creates([(300, 8)], slots=1, rate=5, burst=50, latency=1)
+
+    assert result["seconds"] == pytest.approx(51)
+    assert result["token_wait_seconds"] > 0
+
+def test_rate_limit_is_shared_by_concurrent_targets():
+    result = simulate_creates([(10, 8)] * 30, slots=4, rate=5, burst=50, latency=1)
+
+    assert result["seconds"] == pytest.approx(51)
+
+def test_worker_bound_when_tokens_are_plentiful():
+    result = simulate_creates([(16, 4)], slots=1, rate=1000, burst=1000, latency=1)
+
+    assert result == {"seconds": pytest.approx(4), "token_wait_seconds": 0.0}
+
+def test_targets_with_nothing_to_create_free_their_slot():
+    result = simulate_creates([(0, 8), (5, 2)], slots=1, rate=5, burst=50, latency=1)
+
+    assert result == {"seconds": 3.0, "token_wait_seconds": 0.0}
+
+def test_no_targets():
+    assert simulate_creates([], slots=4, rate=5, burst=50, latency=1) == {"seconds": 0.0, "token_wait_seconds": 0.0}
+
+def test_never_beats_either_floor():
+    targets = [(7, 3), (12, 5), (1, 8), (20, 2)]
+    rate, burst, latency, slots = 2.0, 10, 0.5, 2
+    seconds = simulate_creates(targets, slots, rate, burst, latency)["seconds"]
+
+    creates = sum(count for count, _ in targets)
+    assert seconds >= (creates - burst) / rate
+    assert seconds >= max(count / workers for count, workers in targets) * latency
+
+def test_estimate_plans_creates_and_bills_azs(aws_service, vpc, ec2):
+    existing = f"com.amazonaws.{REGION}.ec2"
+    ec2.create_vpc_endpoint(
+        VpcId=vpc["vpc_id"], VpcEndpointType="Interface", ServiceName=existing,
+        SubnetIds=vpc["subnets"], SecurityGroupIds=vpc["security_groups"]
+    )
+    target = {
+        "endpoint_type": "Interface",
+        "region": REGION,
+        "vpc_id": vpc["vpc_id"],
+        "service_names": [existing, f"com.amazonaws.{REGION}.sts", f"com.amazonaws.{REGION}.ssm"],
+        "tag_prefix": None,
+        "tag_suffix": None,
+        "subnets": vpc["subnets"],
+        "security_groups": vpc["security_groups"],
+        "private_dns_enabled": True,
+        "route_tables": None,
+        "select_all_route_tables": False,
+        "skip_existing": True,
+        "subnets_by_service": None,
+        "max_workers": 2
+    }
+
+    estimate = RunEstimator(aws_service).estimate([target])
+
+    assert estimate["targets"][0]["summary"] == {"create": 2, "skip": 1, "modify": 0}
+    calls = {call["operation"]: call["calls"] for call in estimate["calls"]}
+    assert calls["CreateVpcEndpoint"] == 2 and calls["DescribeVpcEndpoints"] == 1
+    billing = estimate["billing"]
+    # Two new endpoints, each in both subnets' AZs
+    assert billing["endpoint_az_hours_per_hour"] == 4
+    assert billing["endpoint_az_hours_per_month"] == 4 * HOURS_PER_MONTH
+    assert len(ec2.describe_vpc_endpoints()["VpcEndpoints"]) == 1
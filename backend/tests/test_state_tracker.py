@@ -0,0 +1,160 @@
+"""
+EndpointStateTracker - settling, timeouts and batched polling
+"""
+
+import threading
+
+from services.state_tracker import EndpointStateTracker, is_settled
+
+REGION = "us-east-1"
+
+class ScriptedEndpoints:
+    """
+    Stands in for AWSService.describe_vpc_endpoints_by_id
+
+    moto cannot filter DescribeVpcEndpoints by vpc-endpoint-id, and its
+    endpoints are available at once; each ID here walks through its
+    scripted states, one per describe call that includes it.
+    """
+
+    profile = "default"
+
+    def __init__(self, states, error_calls=0):
+        self.states = {endpoint_id: list(sequence) for endpoint_id, sequence in states.items()}
+        self.error_calls = error_calls
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def describe_vpc_endpoints_by_id(self, endpoint_ids, region):
+        with self._lock:
+            self.calls.append(sorted(endpoint_ids))
+            if self.error_calls:
+                self.error_calls -= 1
+                raise RuntimeError("throttled")
+            described = []
+            for endpoint_id in endpoint_ids:
+                sequence = self.states.get(endpoint_id)
+                if not sequence:
+                    # Not visible yet
+                    continue
+                state = sequence.pop(0) if len(sequence) > 1 else sequence[0]
+                described.append({"VpcEndpointId": endpoint_id, "State": state})
+            return described
+
+def _tracker():
+    return EndpointStateTracker(min_interval=0.01, max_interval=0.05, backoff=2)
+
+def test_waits_until_every_endpoint_settles():
+    endpoints = ScriptedEndpoints({
+        "vpce-1": ["pending", "pending", "available"],
+        "vpce-2": ["pending", "failed"]
+    })
+    tracker = _tracker()
+
+    result = tracker.wait(endpoints, REGION, {"vpce-1": "pending", "vpce-2": "pending"}, timeout=5)
+
+    assert result["states"] == {"vpce-1": "available", "vpce-2": "failed"}
+    assert not result["timed_out"]
+    # Settled endpoints are not described again
+    assert ["vpce-1"] in endpoints.calls and endpoints.calls[-1] == ["vpce-1"]
+
+def test_times_out_while_endpoints_are_pending():
+    tracker = _tracker()
+
+    result = tracker.wait(ScriptedEndpoints({"vpce-1": ["pending"]}), REGION, {"vpce-1": "pending"}, timeout=0.3)
+
+    assert result["timed_out"]
+    assert result["states"] == {"vpce-1": "pending"}
+    assert 0.3 <= result["waited_seconds"] < 2
+    assert tracker.stats()["waiting"] == 0
+
+def test_invisible_ids_and_describe_errors_stay_pending():
+    endpoints = ScriptedEndpoints({"vpce-1": ["available"]}, error_calls=2)
+    tracker = _tracker()
+
+    result = tracker.wait(endpoints, REGION, {"vpce-1": None, "vpce-2": None}, timeout=0.5)
+
+    assert result["states"] == {"vpce-1": "available", "vpce-2": None}
+    assert result["timed_out"]
+    assert tracker.stats()["poll_errors"] == 2
+
+def test_settled_endpoints_return_without_polling():
+    endpoints = ScriptedEndpoints({})
+    tracker = _tracker()
+
+    result = tracker.wait(endpoints, REGION, {"vpce-1": "available", "vpce-2": "rejected"}, timeout=5)
+
+    assert not result["timed_out"]
+    assert endpoints.calls == []
+    assert is_settled("Available") and not is_settled("pending") and not is_settled(None)
+
+def test_cancel_stops_the_wait_without_timing_out():
+    cancel = threading.Event()
+    cancel.set()
+
+    result = _tracker().wait(ScriptedEndpoints({"vpce-1": ["pending"]}), REGION, {"vpce-1": "pending"}, 5, cancel)
+
+    assert not result["timed_out"]
+    assert result["waited_seconds"] < 1
+
+def test_concurrent_waits_share_describe_calls():
+    endpoints = ScriptedEndpoints({
+        "vpce-1": ["pending", "pending", "pending", "available"],
+        "vpce-2": ["pending", "pending", "pending", "available"]
+    })
+    tracker = EndpointStateTracker(min_interval=0.1, max_interval=0.1, backoff=1)
+    results = {}
+
+    def wait(endpoint_id):
+        results[endpoint_id] = tracker.wait(endpoints, REGION, {endpoint_id: "pending"}, timeout=5)
+
+    threads = [threading.Thread(target=wait, args=(endpoint_id,)) for endpoint_id in ("vpce-1", "vpce-2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result["states"] == {endpoint_id: "available"} for endpoint_id, result in results.items())
+    # Both waits were registered before the first poll, so every call covered both IDs
+    assert all(ids == ["vpce-1", "vpce-2"] for ids in endpoints.calls)
+
+def test_batch_waits_follow_every_target_from_one_thread(monkeypatch):
+    from routes import endpoints as routes
+
+    tracker = _tracker()
+    monkeypatch.setattr(routes, "state_tracker", tracker)
+    endpoints = ScriptedEndpoints({"vpce-1": ["pending", "available"], "vpce-2": ["pending"]})
+    fast = routes.EndpointRequest(endpoint_type="Interface", region=REGION, vpc_id="vpc-1")
+    slow = routes.EndpointRequest(endpoint_type="Interface", region=REGION, vpc_id="vpc-2")
+    waits = [
+        (slow, 0.6, [{"endpoint_id": "vpce-2", "state": "pending"}]),
+        (fast, 5, [{"endpoint_id": "vpce-1", "state": "pending"}])
+    ]
+    threads = threading.active_count()
+
+    rows = list(routes._iter_target_waits(waits, endpoints))
+
+    assert [target.vpc_id for target, _, _ in rows] == ["vpc-1", "vpc-2"]
+    assert rows[0][1][0]["state"] == "available" and not rows[0][2]["timed_out"]
+    assert rows[1][2]["timed_out"] and rows[1][2]["pending"] == ["vpce-2"]
+    # Only the shared poller thread was started
+    assert threading.active_count() <= threads + 1
+
+def test_closing_batch_waits_releases_the_watches(monkeypatch):
+    from routes import endpoints as routes
+
+    tracker = _tracker()
+    monkeypatch.setattr(routes, "state_tracker", tracker)
+    endpoints = ScriptedEndpoints({"vpce-1": ["available"], "vpce-2": ["pending"]})
+    waits = [
+        (routes.EndpointRequest(endpoint_type="Interface", region=REGION, vpc_id=vpc_id), 60, [{"endpoint_id": endpoint_id, "state": "pending"}])
+        for vpc_id, endpoint_id in (("vpc-1", "vpce-1"), ("vpc-2", "vpce-2"))
+    ]
+    waiting = routes._iter_target_waits(waits, endpoints)
+
+    assert next(waiting)[0].vpc_id == "vpc-1"
+    assert tracker.stats()["waiting"] == 1
+    # What a client disconnect does to the response stream
+    waiting.close()
+
+    assert tracker.stats()["waiting"] == 0
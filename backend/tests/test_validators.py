@@ -0,0 +1,64 @@
+"""
+Validators - batched ID format checks, region checks and cross-VPC reuse
+"""
+
+import pytest
+
+from utils.validators import _ID_PATTERNS, find_invalid_ids, validate_endpoint_ids, validate_targets
+
+VPC = "vpc-0123456789abcdef0"
+SUBNET_A = "subnet-0123456789abcdef0"
+SUBNET_B = "subnet-89abcdef"
+
+@pytest.mark.parametrize("ids", [
+    [],
+    [SUBNET_A, SUBNET_B],
+    ["subnet-bad", SUBNET_A],
+    [SUBNET_A, "subnet-bad"],
+    [SUBNET_A, "subnet-bad", "subnet-worse", SUBNET_B],
+    ["", SUBNET_A, ""],
+    ["subnet-0123456789ABCDEF0"],
+    ["subnet-0123456"],
+    ["subnet-0123456789abcdef01"],
+    [f"{SUBNET_A} ", f" {SUBNET_B}"],
+    [f"{SUBNET_A}\n{SUBNET_B}", SUBNET_A],
+    [f"{SUBNET_A}\n", SUBNET_B],
+    ["sg-0123456789abcdef0"],
+])
+def test_matches_checking_each_id_on_its_own(ids):
+    expected = [i for i in ids if _ID_PATTERNS["subnet"].fullmatch(i) is None]
+
+    assert find_invalid_ids(ids, "subnet") == expected
+
+def test_invalid_ids_keep_their_order_and_repeats():
+    assert find_invalid_ids(["a", SUBNET_A, "a", "b"], "subnet") == ["a", "a", "b"]
+
+def test_endpoint_ids_report_formats_duplicates_and_region():
+    errors = validate_endpoint_ids(
+        "vpc-nope",
+        region="us-moon-1",
+        subnets=[SUBNET_A, SUBNET_A, "subnet-x"],
+        security_groups=["sg-0123456789abcdef0"],
+        route_tables=[]
+    )
+
+    assert errors == {
+        "vpc_id": ["Invalid VPC ID format: vpc-nope"],
+        "region": ["Unsupported region: us-moon-1"],
+        "subnets": ["Invalid subnet ID format: subnet-x", f"Duplicate subnet ID: {SUBNET_A}"]
+    }
+
+def test_valid_request_has_no_errors():
+    assert validate_endpoint_ids(VPC, region="eu-south-2", subnets=[SUBNET_A, SUBNET_B]) == {}
+
+def test_targets_sharing_a_subnet_across_vpcs_are_reported():
+    report = validate_targets([
+        {"vpc_id": VPC, "region": "us-east-1", "subnets": [SUBNET_A]},
+        {"vpc_id": "vpc-89abcdef", "region": "us-east-1", "subnets": [SUBNET_A, SUBNET_B]},
+        {"vpc_id": VPC, "region": "nowhere-1", "subnets": [SUBNET_A]}
+    ])
+
+    assert report["target_errors"] == {2: {"region": ["Unsupported region: nowhere-1"]}}
+    assert report["cross_vpc_errors"] == [
+        f"Subnet {SUBNET_A} is used with more than one VPC: {VPC} (target 0), vpc-89abcdef (target 1)"
+    ]
@@ -0,0 +1,19 @@
+"""
+AWS Error Codes - ClientError codes shared by the client pool's metrics and the scheduler's retries
+"""
+
+# EC2 error codes that mean "slow down" rather than "this request is wrong"
+THROTTLE_ERROR_CODES = frozenset({
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+})
+
+# Server-side failures worth another attempt; mutating clients make a single
+# attempt per call, so these are retried by CreationScheduler rather than by botocore
+TRANSIENT_ERROR_CODES = frozenset({
+    "InternalError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "Unavailable",
+})
@@ -0,0 +1,257 @@
+"""
+Metrics - In-process counters and histograms rendered in the Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+
+# Seconds; covers cached renders (sub-millisecond) up to slow AWS calls and script runs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def snapshot(self) -> List[List[Any]]:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, snapshots: List[List[List[Any]]]) -> Dict[Tuple[str, ...], float]:
+        merged: Dict[Tuple[str, ...], float] = {}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                merged[tuple(key)] = merged.get(tuple(key), 0.0) + value
+        return merged
+
+    def render(self, merged: Dict[Tuple[str, ...], float]) -> List[str]:
+        return [f"{self.name}{_label_text(self.labels, key)} {value:g}" for key, value in sorted(merged.items())]
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0]
+                self._values[label_values] = entry
+            entry[0][index] += 1
+            entry[1] += value
+
+    def totals(self, *label_values: str) -> Tuple[int, float]:
+        """(count, sum) observed in this process for one label set"""
+        with self._lock:
+            entry = self._values.get(label_values)
+            return (sum(entry[0]), entry[1]) if entry is not None else (0, 0.0)
+
+    def snapshot(self) -> List[List[Any]]:
+        with self._lock:
+            return [[list(key), list(counts), total] for key, (counts, total) in self._values.items()]
+
+    def merge(self, snapshots: List[List[List[Any]]]) -> Dict[Tuple[str, ...], List[Any]]:
+        merged: Dict[Tuple[str, ...], List[Any]] = {}
+        for snapshot in snapshots:
+            for key, counts, total in snapshot:
+                entry = merged.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0])
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+        return merged
+
+    def render(self, merged: Dict[Tuple[str, ...], List[Any]]) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """All metrics of the process; with several workers, /metrics merges every worker's snapshot"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serialisable values of every metric, for sharing with other workers"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self, snapshots: Optional[List[Dict[str, Any]]] = None) -> str:
+        """
+        Prometheus text exposition (format 0.0.4)
+
+        Args:
+            snapshots: Snapshots to merge (e.g. one per worker); defaults to this process only
+        """
+        snapshots = snapshots if snapshots is not None else [self.snapshot()]
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(metric.merge([s[name] for s in snapshots if name in s])))
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+http_requests = metrics.counter(
+    "vpce_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_latency = metrics.histogram(
+    "vpce_http_request_duration_seconds", "HTTP request latency until the response starts", ("method", "route")
+)
+stage_latency = metrics.histogram(
+    "vpce_stage_duration_seconds", "Duration of pipeline stages (validation, render, spawn, per-service create, ...)", ("stage",)
+)
+aws_latency = metrics.histogram(
+    "vpce_aws_api_duration_seconds", "AWS API call latency including botocore retries", ("service", "operation", "region")
+)
+aws_errors = metrics.counter(
+    "vpce_aws_api_errors_total", "AWS API calls that failed, by error code", ("service", "operation", "region", "code")
+)
+aws_throttles = metrics.counter(
+    "vpce_aws_throttled_total", "AWS API attempts rejected by throttling", ("service", "operation", "region")
+)
+aws_retries = metrics.counter(
+    "vpce_aws_retries_total", "AWS API attempts retried by botocore (read calls; mutating calls are retried by the scheduler)", ("service", "operation", "region")
+)
+scheduler_retries = metrics.counter(
+    "vpce_scheduler_retries_total", "Throttled or transiently failed mutating calls retried by the creation scheduler", ("code",)
+)
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block into vpce_stage_duration_seconds; a block that raises is still recorded"""
+    if not metrics.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency.observe(time.perf_counter() - start, stage)
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them until the response starts, per route template"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                route = scope.get("route")
+                # The template (/api/jobs/{job_id}), not the raw path, keeps label cardinality bounded
+                template = getattr(route, "path", "unmatched")
+                http_latency.observe(time.perf_counter() - start, scope["method"], template)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_requests.inc(scope["method"], getattr(route, "path", "unmatched"), str(status[0]))
+
+# Namespace for per-worker snapshots in the shared state store
+_SNAPSHOT_NAMESPACE = "metrics"
+
+def publish(store: Any, worker: str) -> None:
+    """Share this worker's snapshot; kept for a few publish intervals after the worker stops"""
+    store.put(_SNAPSHOT_NAMESPACE, worker, metrics.snapshot(), settings.METRICS_PUBLISH_SECONDS * 3)
+
+def collect(store: Any = None, worker: Optional[str] = None) -> str:
+    """
+    Render /metrics for this process, or for every worker when a shared state store is given
+
+    Other workers' values are at most METRICS_PUBLISH_SECONDS old.
+    """
+    if store is None:
+        return metrics.render()
+    snapshots = store.values(_SNAPSHOT_NAMESPACE)
+    snapshots[worker] = metrics.snapshot()
+    return metrics.render(list(snapshots.values()))
+
+def start_publisher(store: Any, worker: str) -> threading.Thread:
+    """Publish this worker's snapshot every METRICS_PUBLISH_SECONDS on a daemon thread"""
+    def run() -> None:
+        while True:
+            try:
+                publish(store, worker)
+            except Exception:
+                # A busy or unavailable store only delays the next snapshot
+                pass
+            time.sleep(settings.METRICS_PUBLISH_SECONDS)
+
+    thread = threading.Thread(target=run, name="metrics-publisher", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,31 @@
+"""
+Moto VPC - Builds a throwaway VPC in a moto EC2 backend for the tests and benchmarks
+"""
+
+from typing import Dict
+
+def create_test_vpc(ec2, subnet_count: int = 2) -> Dict[str, object]:
+    """
+    Create a VPC with subnets in different AZs and a security group
+
+    Args:
+        ec2: boto3 EC2 client pointed at moto (mock_ec2 or a moto server)
+        subnet_count: Number of /24 subnets, spread across the region's AZs
+
+    Returns:
+        {"vpc_id": ..., "subnets": [...], "security_groups": [...]}
+    """
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    azs = [az["ZoneName"] for az in ec2.describe_availability_zones()["AvailabilityZones"]]
+    subnets = [
+        ec2.create_subnet(
+            VpcId=vpc_id,
+            CidrBlock=f"10.0.{i}.0/24",
+            AvailabilityZone=azs[i % len(azs)]
+        )["Subnet"]["SubnetId"]
+        for i in range(subnet_count)
+    ]
+    sg_id = ec2.create_security_group(
+        GroupName=f"test-{vpc_id}", Description="moto test VPC", VpcId=vpc_id
+    )["GroupId"]
+    return {"vpc_id": vpc_id, "subnets": subnets, "security_groups": [sg_id]}
@@ -0,0 +1,27 @@
+"""
+Naming - Service short names and Name tag construction shared by all output paths
+"""
+
+from typing import Optional
+
+def get_service_short_name(service_name: str) -> str:
+    """
+    Extract short service name from full service name
+    e.g., "com.amazonaws.ap-southeast-1.ec2" -> "ec2"
+    """
+    parts = service_name.split(".")
+    return parts[-1] if parts else "service"
+
+def build_tag_name(
+    service_name: str,
+    tag_prefix: Optional[str] = None,
+    tag_suffix: Optional[str] = None
+) -> str:
+    """Build the endpoint Name tag, handling empty prefix/suffix"""
+    tag_parts = []
+    if tag_prefix:
+        tag_parts.append(tag_prefix)
+    tag_parts.append(get_service_short_name(service_name))
+    if tag_suffix:
+        tag_parts.append(tag_suffix)
+    return "-".join(tag_parts)
@@ -0,0 +1,30 @@
+"""
+Offload - Runs blocking AWS, SQLite and rendering calls off the event loop
+"""
+
+from typing import Any, Callable, TypeVar
+
+import anyio.to_thread
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+
+T = TypeVar("T")
+
+def configure_thread_pool() -> None:
+    """
+    Size the worker thread pool to BLOCKING_MAX_THREADS
+
+    The same pool serves run_blocking, sync dependencies and streaming
+    responses that iterate blocking generators. Must be called from the
+    running event loop (e.g. an app startup handler).
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.BLOCKING_MAX_THREADS
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call on the worker thread pool and await its result
+
+    Exceptions (including HTTPException) propagate to the caller unchanged.
+    """
+    return await run_in_threadpool(func, *args, **kwargs)
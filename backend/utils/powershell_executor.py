@@ -2,64 +2,429 @@
 PowerShell Executor - Executes PowerShell scripts
 """
 
+import base64
+import json
+import queue
+import shutil
+import signal
 import subprocess
-import tempfile
+import threading
+import time
 import os
-from typing import Tuple
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from utils.metrics import span
+
+# Sentinel pushed by the reader thread once the script's output is exhausted
+_EOF = object()
+
+# Profile selection that must not override a session's explicit credentials
+_PROFILE_VARIABLES = ("AWS_PROFILE", "AWS_DEFAULT_PROFILE")
+
+# Runs one script read from stdin. The script arrives base64-encoded (UTF-8) so
+# it survives any console code page; nothing is written to disk. "exit 0" gives
+# the same exit codes as -File: the script's own exit, 1 on a terminating error,
+# otherwise 0.
+_ONE_SHOT = (
+    "& ([scriptblock]::Create([Text.Encoding]::UTF8.GetString("
+    "[Convert]::FromBase64String([Console]::In.ReadToEnd())))); exit 0"
+)
+
+# Warm host loop: one base64 JSON frame per line ({"script", "env", "unset",
+# "marker"}), output as lines, then "<marker> <exit code>". Environment changes
+# are undone after each script. A script that calls exit ends the host; its
+# exit code is then the process's and the pool starts a replacement.
+_HOST_LOOP = """
+$utf8 = [Text.Encoding]::UTF8
+while ($null -ne ($line = [Console]::In.ReadLine())) {
+    $job = $utf8.GetString([Convert]::FromBase64String($line)) | ConvertFrom-Json
+    $saved = @{}
+    foreach ($name in @($job.unset) + @($job.env.PSObject.Properties.Name)) {
+        if ($name -and -not $saved.ContainsKey($name)) { $saved[$name] = [Environment]::GetEnvironmentVariable($name) }
+    }
+    foreach ($name in $job.unset) { [Environment]::SetEnvironmentVariable($name, $null) }
+    foreach ($p in $job.env.PSObject.Properties) { [Environment]::SetEnvironmentVariable($p.Name, $p.Value) }
+    $code = 0
+    try {
+        & ([scriptblock]::Create($job.script)) *>&1 | Out-String -Stream -Width 4096 | ForEach-Object { [Console]::Out.WriteLine($_) }
+    } catch {
+        [Console]::Out.WriteLine($_.ToString())
+        $code = 1
+    }
+    foreach ($name in $saved.Keys) { [Environment]::SetEnvironmentVariable($name, $saved[$name]) }
+    [Console]::Out.WriteLine("$($job.marker) $code")
+    [Console]::Out.Flush()
+}
+"""
+
+class ExecutionCancelled(Exception):
+    """Raised when a running script is cancelled"""
+
+def powershell_executable() -> str:
+    """POWERSHELL_EXECUTABLE, else pwsh when it is on the PATH, else Windows PowerShell"""
+    return settings.POWERSHELL_EXECUTABLE or shutil.which("pwsh") or "powershell.exe"
+
+def _command(script: str) -> List[str]:
+    return [
+        powershell_executable(),
+        "-NoProfile",
+        "-NonInteractive",
+        "-ExecutionPolicy", "Bypass",
+        "-Command", script
+    ]
+
+def _popen(command: List[str], env: Optional[Dict[str, str]] = None, **kwargs: Any) -> subprocess.Popen:
+    # Own process group on POSIX so a kill also reaches the aws CLI children
+    if os.name == "posix":
+        kwargs["start_new_session"] = True
+    with span("script_spawn"):
+        return subprocess.Popen(command, text=True, env=env, **kwargs)
+
+def _kill(process: subprocess.Popen) -> None:
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass
+    process.kill()
+
+def _encode(content: str) -> str:
+    return base64.b64encode(content.encode("utf-8")).decode("ascii")
+
+class PowerShellHost:
+    """A long-running PowerShell process that runs scripts sent over its stdin, one at a time"""
+
+    def __init__(self):
+        self.process = _popen(
+            _command(_HOST_LOOP),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1
+        )
+        self.runs = 0
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def submit(self, ps1_content: str, env: Optional[Dict[str, str]]) -> str:
+        """
+        Send a script to the host
+
+        Returns:
+            The marker line prefix that ends the script's output, followed by its exit code
+        """
+        marker = f"__vpce_done_{uuid.uuid4().hex}"
+        frame = {
+            "script": ps1_content,
+            # A session's credentials replace the server's profile for this run only
+            "env": env or {},
+            "unset": list(_PROFILE_VARIABLES) if env is not None else [],
+            "marker": marker
+        }
+        self.runs += 1
+        self.process.stdin.write(_encode(json.dumps(frame)) + "\n")
+        self.process.stdin.flush()
+        return marker
+
+    def close(self) -> None:
+        if self.alive():
+            _kill(self.process)
+        self.process.wait()
+
+class PowerShellHostPool:
+    """
+    Warm PowerShell hosts reused across executions, so runs skip interpreter startup
+
+    acquire() never waits: with every host busy (or POWERSHELL_POOL_SIZE=0)
+    the caller starts a one-shot process instead.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_runs: Optional[int] = None):
+        self.size = settings.POWERSHELL_POOL_SIZE if size is None else size
+        self.max_runs = max_runs or settings.POWERSHELL_HOST_MAX_RUNS
+        self._idle: List[PowerShellHost] = []
+        self._live = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.started = 0
+        self.reused = 0
+
+    def acquire(self) -> Optional[PowerShellHost]:
+        """An idle host, a newly started one while under size, or None"""
+        if self.size <= 0:
+            return None
+        with self._lock:
+            if self._closed:
+                return None
+            while self._idle:
+                host = self._idle.pop()
+                if host.alive():
+                    self.reused += 1
+                    return host
+                self._live -= 1
+            if self._live >= self.size:
+                return None
+            self._live += 1
+        try:
+            host = PowerShellHost()
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            return None
+        self.started += 1
+        return host
+
+    def release(self, host: PowerShellHost, reusable: bool) -> None:
+        """Return a host after a run; hosts that died, were killed or are worn out are replaced"""
+        with self._lock:
+            if reusable and not self._closed and host.alive() and host.runs < self.max_runs:
+                self._idle.append(host)
+                return
+            self._live -= 1
+        host.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            hosts, self._idle = self._idle, []
+        for host in hosts:
+            host.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "started": self.started, "reused": self.reused}
+
+# Shared by every executor in the process
+host_pool = PowerShellHostPool()
 
 class PowerShellExecutor:
     """Executes PowerShell scripts"""
-    
-    def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
-    
+
+    def __init__(self, pool: Optional[PowerShellHostPool] = None):
+        self.pool = pool or host_pool
+
+    def _environment(self, env: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """Process environment with a session's credentials taking precedence over any profile"""
+        if env is None:
+            return None
+        merged = {k: v for k, v in os.environ.items() if k not in _PROFILE_VARIABLES}
+        merged.update(env)
+        return merged
+
     def execute(
         self,
         ps1_content: str,
-        script_name: str = "vpc-endpoint-script.ps1"
+        cancel_event: Optional[threading.Event] = None,
+        env: Optional[Dict[str, str]] = None
     ) -> Tuple[str, str, int]:
         """
         Execute a PowerShell script
-        
+
+        The script is passed through stdin (to a warm host when one is free),
+        so nothing is written to disk and concurrent runs cannot collide.
+        On a warm host stderr is merged into stdout.
+
         Args:
             ps1_content: The PowerShell script content
-            script_name: Name of the script file
-        
+            cancel_event: Optional event; when set, the script is killed
+            env: Optional extra environment (e.g. a session's AWS credentials)
+
         Returns:
             Tuple of (stdout, stderr, exit_code)
         """
-        
-        # Create temporary script file
-        script_path = os.path.join(self.temp_dir, script_name)
-        
+        host = self.pool.acquire()
+        if host is not None:
+            return self._execute_on_host(host, ps1_content, cancel_event, env)
+
         try:
-            # Write script to file
-            with open(script_path, 'w', encoding='utf-8') as f:
-                f.write(ps1_content)
-            
             # Execute the script using PowerShell
-            result = subprocess.run(
-                [
-                    "powershell.exe",
-                    "-NoProfile",
-                    "-ExecutionPolicy", "Bypass",
-                    "-File", script_path
-                ],
-                capture_output=True,
-                text=True,
-                timeout=60
+            process = _popen(
+                _command(_ONE_SHOT),
+                self._environment(env),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
             )
-            
-            return result.stdout, result.stderr, result.returncode
-        
+            deadline = time.monotonic() + settings.EXECUTION_TIMEOUT_SECONDS
+            script_input = _encode(ps1_content)
+            while True:
+                try:
+                    # Wake up periodically to honour cancellation and the deadline
+                    # (communicate() keeps feeding the rest of the input across retries)
+                    stdout, stderr = process.communicate(input=script_input, timeout=0.5)
+                    return stdout, stderr, process.returncode
+                except subprocess.TimeoutExpired:
+                    if cancel_event is not None and cancel_event.is_set():
+                        _kill(process)
+                        process.communicate()
+                        raise ExecutionCancelled("PowerShell script execution was cancelled")
+                    if time.monotonic() >= deadline:
+                        _kill(process)
+                        process.communicate()
+                        raise subprocess.TimeoutExpired(process.args, settings.EXECUTION_TIMEOUT_SECONDS)
+
+        except ExecutionCancelled:
+            raise
         except subprocess.TimeoutExpired:
             raise Exception("PowerShell script execution timed out")
         except Exception as e:
             raise Exception(f"Failed to execute PowerShell script: {str(e)}")
-        finally:
-            # Clean up temporary file
-            if os.path.exists(script_path):
+
+    def _execute_on_host(
+        self,
+        host: PowerShellHost,
+        ps1_content: str,
+        cancel_event: Optional[threading.Event],
+        env: Optional[Dict[str, str]]
+    ) -> Tuple[str, str, int]:
+        """execute() on a warm host, built on the streaming reader"""
+        output = []
+        events = self._stream_output(
+            host.process, host, ps1_content, env, settings.EXECUTION_TIMEOUT_SECONDS, cancel_event
+        )
+        for event in events:
+            if event["event"] in ("line", "service"):
+                output.append(event["data"]["line"] + "\n")
+            elif event["event"] == "exit":
+                return "".join(output), "", event["data"]["exit_code"]
+            elif event["event"] == "cancelled":
+                raise ExecutionCancelled("PowerShell script execution was cancelled")
+            else:
+                raise Exception(event["data"]["error"])
+        raise Exception("Failed to execute PowerShell script: no exit status")
+
+    def _classify(self, line: str) -> Dict[str, Any]:
+        """Turn one output line into a stream event"""
+        stripped = line.strip()
+        if stripped.startswith("[OK]"):
+            return {"event": "service", "data": {"status": "ok", "line": line}}
+        if stripped.startswith("[FAIL]"):
+            return {"event": "service", "data": {"status": "failed", "line": line}}
+        if stripped.startswith("[SKIP]"):
+            return {"event": "service", "data": {"status": "skipped", "line": line}}
+        return {"event": "line", "data": {"line": line}}
+
+    def stream(
+        self,
+        ps1_content: str,
+        env: Optional[Dict[str, str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a PowerShell script and yield its output as it is produced
+
+        stdout and stderr are merged. A reader thread feeds a bounded queue, so
+        when the client reads slowly the script blocks on its pipe instead of
+        the server buffering unbounded output. Closing the generator (e.g. on
+        client disconnect) kills the script.
+
+        Yields:
+            {"event": "line" | "service" | "exit" | "error", "data": {...}}
+        """
+        host = self.pool.acquire()
+        if host is not None:
+            process = host.process
+        else:
+            try:
+                process = _popen(
+                    _command(_ONE_SHOT),
+                    self._environment(env),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=1
+                )
+            except Exception as e:
+                yield {"event": "error", "data": {"error": f"Failed to execute PowerShell script: {str(e)}"}}
+                return
+        yield from self._stream_output(process, host, ps1_content, env, settings.STREAM_EXECUTION_TIMEOUT_SECONDS)
+
+    def _stream_output(
+        self,
+        process: subprocess.Popen,
+        host: Optional[PowerShellHost],
+        ps1_content: str,
+        env: Optional[Dict[str, str]],
+        timeout: float,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Send the script to a one-shot process or warm host and yield its output events
+
+        A warm host goes back to the pool only when its script finished
+        normally; on timeout, cancel or an early close it is killed.
+        """
+        marker = None
+        try:
+            if host is not None:
+                marker = host.submit(ps1_content, env)
+            else:
+                # The one-shot bootstrap reads all of stdin before running anything
+                process.stdin.write(_encode(ps1_content))
+                process.stdin.close()
+        except Exception as e:
+            if host is not None:
+                self.pool.release(host, reusable=False)
+            else:
+                _kill(process)
+            yield {"event": "error", "data": {"error": f"Failed to execute PowerShell script: {str(e)}"}}
+            return
+
+        lines: queue.Queue = queue.Queue(maxsize=settings.STREAM_BUFFER_LINES)
+        max_chars = settings.STREAM_MAX_LINE_CHARS
+        stopped = threading.Event()
+        finished = False
+
+        def offer(item: Any) -> bool:
+            while not stopped.is_set():
+                try:
+                    lines.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_output() -> None:
+            for raw in process.stdout:
+                line = raw.rstrip("\r\n")
+                if marker is not None and line.startswith(marker):
+                    # The warm host's end-of-script line carries the exit code
+                    offer(int(line[len(marker):].strip() or 1))
+                    return
+                if not offer(line[:max_chars]):
+                    return
+            offer(_EOF)
+
+        threading.Thread(target=read_output, name="ps-stream-reader", daemon=True).start()
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    yield {"event": "error", "data": {"error": "PowerShell script execution timed out"}}
+                    return
+                if cancel_event is not None and cancel_event.is_set():
+                    yield {"event": "cancelled", "data": {}}
+                    return
                 try:
-                    os.remove(script_path)
-                except:
-                    pass
+                    line = lines.get(timeout=min(remaining, 0.5))
+                except queue.Empty:
+                    continue
+                if line is _EOF:
+                    # The one-shot process finished, or a warm host exited (the script called exit)
+                    yield {"event": "exit", "data": {"exit_code": process.wait()}}
+                    return
+                if isinstance(line, int):
+                    finished = True
+                    yield {"event": "exit", "data": {"exit_code": line}}
+                    return
+                yield self._classify(line)
+        finally:
+            stopped.set()
+            if host is not None:
+                self.pool.release(host, reusable=finished)
+            elif process.poll() is None:
+                _kill(process)
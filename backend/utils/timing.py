@@ -0,0 +1,42 @@
+"""
+Timing - Per-stage request timing reported as a Server-Timing header
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from utils.metrics import span
+
+class StageTimer:
+    """Records how long each stage of a request took"""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float, Optional[str]]] = []
+
+    @contextmanager
+    def stage(self, name: str, desc: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as one stage; a stage that raises is still recorded (also in /metrics)"""
+        start = time.perf_counter()
+        try:
+            with span(name):
+                yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - start) * 1000, desc))
+
+    def describe(self, desc: str) -> None:
+        """Set the description of the most recently recorded stage (e.g. "hit" or "miss")"""
+        if self.stages:
+            name, duration, _ = self.stages[-1]
+            self.stages[-1] = (name, duration, desc)
+
+    def header(self) -> str:
+        """Stages in Server-Timing format, e.g. 'plan;desc="hit";dur=0.041, render;dur=0.312'"""
+        parts = []
+        for name, duration, desc in self.stages:
+            desc_part = f';desc="{desc}"' if desc else ""
+            parts.append(f"{name}{desc_part};dur={duration:.3f}")
+        return ", ".join(parts)
+
+    def headers(self) -> dict:
+        return {"Server-Timing": self.header()}
@@ -3,58 +3,208 @@ Validators - Input validation functions
 """
 
 import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional
 
 # Valid AWS region codes
 VALID_REGIONS = [
     "us-east-1", "us-east-2", "us-west-1", "us-west-2",
-    "af-south-1", "ap-east-1", "ap-south-1", "ap-northeast-1",
+    "af-south-1", "ap-east-1", "ap-south-1", "ap-south-2", "ap-northeast-1",
     "ap-northeast-2", "ap-northeast-3", "ap-southeast-1", "ap-southeast-2",
-    "ca-central-1", "eu-central-1", "eu-west-1", "eu-west-2", "eu-west-3",
-    "eu-north-1", "eu-south-1", "me-south-1", "sa-east-1"
+    "ap-southeast-3", "ap-southeast-4", "ap-southeast-5", "ap-southeast-7",
+    "ca-central-1", "ca-west-1", "eu-central-1", "eu-central-2", "eu-west-1",
+    "eu-west-2", "eu-west-3", "eu-north-1", "eu-south-1", "eu-south-2",
+    "il-central-1", "me-central-1", "me-south-1", "mx-central-1", "sa-east-1"
 ]
 
+_VALID_REGION_SET = frozenset(VALID_REGIONS)
+
+# Resource ID bodies, compiled once; the list patterns below match many IDs in one call
+_ID_BODIES = {
+    "vpc": r"vpc-[0-9a-f]{8,17}",
+    "subnet": r"subnet-[0-9a-f]{8,17}",
+    "sg": r"sg-[0-9a-f]{8,17}",
+    "rtb": r"rtb-[0-9a-f]{8,17}",
+    "vpce": r"vpce-[0-9a-f]{8,17}",
+}
+_ID_PATTERNS = {kind: re.compile(body) for kind, body in _ID_BODIES.items()}
+_ID_LIST_PATTERNS = {kind: re.compile(f"(?:{body}\n)*") for kind, body in _ID_BODIES.items()}
+
+_AWS_KEY_PATTERN = re.compile(r"[A-Z0-9]{20}")
+_AWS_SECRET_PATTERN = re.compile(r"[A-Za-z0-9/+=]{40}")
+_TAG_INPUT_PATTERN = re.compile(r"[a-zA-Z0-9\-_]+")
+
+# Field name -> (ID kind, label used in error messages)
+ID_FIELDS = {
+    "subnets": ("subnet", "subnet"),
+    "security_groups": ("sg", "security group"),
+    "route_tables": ("rtb", "route table"),
+}
+
+# Bulk delete/modify/retag request field -> (ID kind, label)
+LIFECYCLE_ID_FIELDS = {
+    "endpoint_ids": ("vpce", "VPC endpoint"),
+    "vpc_ids": ("vpc", "VPC"),
+    **ID_FIELDS,
+    "remove_subnets": ("subnet", "subnet"),
+    "remove_security_groups": ("sg", "security group"),
+    "remove_route_tables": ("rtb", "route table"),
+}
+
 def validate_vpc_id(vpc_id: str) -> bool:
     """Validate VPC ID format: vpc-xxxxxxxxxxxxxxxx"""
-    pattern = r"^vpc-[0-9a-f]{8,17}$"
-    return bool(re.match(pattern, vpc_id))
+    return _ID_PATTERNS["vpc"].fullmatch(vpc_id) is not None
 
 def validate_subnet_id(subnet_id: str) -> bool:
     """Validate Subnet ID format: subnet-xxxxxxxxxxxxxxxx"""
-    pattern = r"^subnet-[0-9a-f]{8,17}$"
-    return bool(re.match(pattern, subnet_id))
+    return _ID_PATTERNS["subnet"].fullmatch(subnet_id) is not None
 
 def validate_sg_id(sg_id: str) -> bool:
     """Validate Security Group ID format: sg-xxxxxxxxxxxxxxxx"""
-    pattern = r"^sg-[0-9a-f]{8,17}$"
-    return bool(re.match(pattern, sg_id))
+    return _ID_PATTERNS["sg"].fullmatch(sg_id) is not None
 
 def validate_route_table_id(rt_id: str) -> bool:
     """Validate Route Table ID format: rtb-xxxxxxxxxxxxxxxx"""
-    pattern = r"^rtb-[0-9a-f]{8,17}$"
-    return bool(re.match(pattern, rt_id))
+    return _ID_PATTERNS["rtb"].fullmatch(rt_id) is not None
 
 def validate_region(region: str) -> bool:
     """Validate AWS region code"""
-    return region in VALID_REGIONS
+    return region in _VALID_REGION_SET
 
 def validate_aws_key(access_key: str) -> bool:
     """Validate AWS Access Key format (20 alphanumeric characters)"""
-    pattern = r"^[A-Z0-9]{20}$"
-    return bool(re.match(pattern, access_key))
+    return _AWS_KEY_PATTERN.fullmatch(access_key) is not None
 
 def validate_aws_secret(secret_key: str) -> bool:
     """Validate AWS Secret Key format (40 characters, base64-like)"""
-    pattern = r"^[A-Za-z0-9/+=]{40}$"
-    return bool(re.match(pattern, secret_key))
+    return _AWS_SECRET_PATTERN.fullmatch(secret_key) is not None
 
 def validate_tag_input(tag_input: str) -> bool:
     """Validate tag input (no empty strings, no invalid characters)"""
     if not tag_input or not tag_input.strip():
         return False
     # No special characters except hyphens and underscores
-    pattern = r"^[a-zA-Z0-9\-_]+$"
-    return bool(re.match(pattern, tag_input))
+    return _TAG_INPUT_PATTERN.fullmatch(tag_input) is not None
 
 def get_valid_regions() -> list:
     """Return list of valid AWS regions"""
     return VALID_REGIONS
+
+def find_invalid_ids(ids: List[str], kind: str) -> List[str]:
+    """
+    Return the IDs in a list that do not match the format for kind ("vpc", "subnet", "sg", "rtb", "vpce")
+
+    The list is joined and matched in one regex call; each invalid ID only
+    costs a restart of that match just past it.
+    """
+    joined = "\n".join(ids) + "\n"
+    if joined.count("\n") != len(ids):
+        # An ID with an embedded newline would be split in two; check one by one
+        pattern = _ID_PATTERNS[kind]
+        return [i for i in ids if pattern.fullmatch(i) is None]
+
+    list_pattern = _ID_LIST_PATTERNS[kind]
+    invalid = []
+    pos = list_pattern.match(joined).end()
+    while pos < len(joined):
+        end = joined.index("\n", pos)
+        invalid.append(joined[pos:end])
+        pos = list_pattern.match(joined, end + 1).end()
+    return invalid
+
+def find_duplicates(ids: Iterable[str]) -> List[str]:
+    """IDs that appear more than once, in first-seen order"""
+    return [i for i, count in Counter(ids).items() if count > 1]
+
+def _id_list_errors(ids: Optional[List[str]], kind: str, label: str) -> List[str]:
+    if not ids:
+        return []
+    errors = [f"Invalid {label} ID format: {i}" for i in find_invalid_ids(ids, kind)]
+    errors.extend(f"Duplicate {label} ID: {i}" for i in find_duplicates(ids))
+    return errors
+
+def validate_endpoint_ids(
+    vpc_id: Optional[str],
+    region: Optional[str] = None,
+    subnets: Optional[List[str]] = None,
+    security_groups: Optional[List[str]] = None,
+    route_tables: Optional[List[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Validate every ID of one endpoint request in a single pass per field
+
+    Returns:
+        Errors keyed by field name; empty when everything is valid
+    """
+    errors: Dict[str, List[str]] = {}
+    if vpc_id is not None and not validate_vpc_id(vpc_id):
+        errors["vpc_id"] = [f"Invalid VPC ID format: {vpc_id}"]
+    if region is not None and not validate_region(region):
+        errors["region"] = [f"Unsupported region: {region}"]
+
+    values = {"subnets": subnets, "security_groups": security_groups, "route_tables": route_tables}
+    for field, ids in values.items():
+        if not ids:
+            continue
+        field_errors = _id_list_errors(ids, *ID_FIELDS[field])
+        if field_errors:
+            errors[field] = field_errors
+    return errors
+
+def validate_targets(targets: List[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Validate the IDs of many endpoint requests (e.g. a fleet batch) at once
+
+    Besides per-target field errors, reports IDs used with more than one
+    VPC: a subnet, security group or route table belongs to exactly one VPC,
+    so at least one of those targets would fail.
+
+    Args:
+        targets: Mappings with vpc_id, region, subnets, security_groups and route_tables
+
+    Returns:
+        {"target_errors": {index: {field: [errors]}}, "cross_vpc_errors": [errors]}
+    """
+    target_errors: Dict[int, Dict[str, List[str]]] = {}
+    # (field, id) -> {vpc_id: first target index using it}
+    owners: Dict[tuple, Dict[str, int]] = {}
+    for index, target in enumerate(targets):
+        errors = validate_endpoint_ids(
+            target.get("vpc_id"),
+            region=target.get("region"),
+            subnets=target.get("subnets"),
+            security_groups=target.get("security_groups"),
+            route_tables=target.get("route_tables")
+        )
+        if errors:
+            target_errors[index] = errors
+        vpc_id = target.get("vpc_id")
+        for field in ID_FIELDS:
+            for resource_id in target.get(field) or ():
+                owners.setdefault((field, resource_id), {}).setdefault(vpc_id, index)
+
+    cross_vpc_errors = []
+    for (field, resource_id), vpcs in owners.items():
+        if len(vpcs) > 1:
+            label = ID_FIELDS[field][1].capitalize()
+            used_with = ", ".join(f"{vpc} (target {index})" for vpc, index in vpcs.items())
+            cross_vpc_errors.append(f"{label} {resource_id} is used with more than one VPC: {used_with}")
+
+    return {"target_errors": target_errors, "cross_vpc_errors": cross_vpc_errors}
+
+def validate_lifecycle_ids(request: Mapping[str, Any]) -> Dict[str, List[str]]:
+    """
+    Validate every ID of a bulk delete/modify/retag request in a single pass per field
+
+    Returns:
+        Errors keyed by field name; empty when everything is valid
+    """
+    errors: Dict[str, List[str]] = {}
+    vpc_id = request.get("vpc_id")
+    if vpc_id is not None and not validate_vpc_id(vpc_id):
+        errors["vpc_id"] = [f"Invalid VPC ID format: {vpc_id}"]
+    for field, (kind, label) in LIFECYCLE_ID_FIELDS.items():
+        field_errors = _id_list_errors(request.get(field), kind, label)
+        if field_errors:
+            errors[field] = field_errors
+    return errors
@@ -188,6 +188,7 @@ function App() {
             {currentStep === 'select' && (
               <EndpointSelector 
                 onNext={handleSelectNext}
+                region={formData.region}
                 isLocked={!completedSteps.has('configure')}
                 onInputAttempt={handleInputAttempt}
               />
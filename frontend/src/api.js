@@ -0,0 +1,23 @@
+// Credential session returned by /api/configure. Kept per browser tab so two tabs
+// (or two users on one server) never share AWS credentials.
+const SESSION_KEY = 'awsSessionId'
+
+export const getSessionId = () => sessionStorage.getItem(SESSION_KEY)
+
+export const setSessionId = (sessionId) => {
+  if (sessionId) {
+    sessionStorage.setItem(SESSION_KEY, sessionId)
+  } else {
+    sessionStorage.removeItem(SESSION_KEY)
+  }
+}
+
+// fetch() that sends the credential session as the X-Session-Id header
+export const apiFetch = (url, options = {}) => {
+  const sessionId = getSessionId()
+  const headers = { ...(options.headers || {}) }
+  if (sessionId) {
+    headers['X-Session-Id'] = sessionId
+  }
+  return fetch(url, { ...options, headers })
+}
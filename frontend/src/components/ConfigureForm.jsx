@@ -1,4 +1,5 @@
 import { useState } from 'react'
+import { apiFetch, setSessionId } from '../api'
 
 function ConfigureForm({ onNext, isLocked = false }) {
   const [formData, setFormData] = useState({
@@ -33,7 +34,7 @@ function ConfigureForm({ onNext, isLocked = false }) {
 
     try {
       console.log('Sending request to /api/configure with data:', formData)
-      const response = await fetch('/api/configure', {
+      const response = await apiFetch('/api/configure', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -56,6 +57,7 @@ function ConfigureForm({ onNext, isLocked = false }) {
 
       const successData = await response.json()
       console.log('Success response:', successData)
+      setSessionId(successData.session_id)
       onNext(formData)
     } catch (err) {
       console.error('Request error:', err)
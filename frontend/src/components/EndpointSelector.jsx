@@ -1,6 +1,8 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
+import { fallbackCatalog, gatewayServiceList, groupInterfaceServices } from './serviceCatalog'
+import { apiFetch } from '../api'
 
-function EndpointSelector({ onNext, isLocked = false, onInputAttempt = () => {} }) {
+function EndpointSelector({ onNext, region = 'ap-southeast-1', isLocked = false, onInputAttempt = () => {} }) {
   const [selectedEndpoints, setSelectedEndpoints] = useState({
     interface: false,
     gateway: false,
@@ -20,124 +22,36 @@ function EndpointSelector({ onNext, isLocked = false, onInputAttempt = () => {}
   const [interfaceSearch, setInterfaceSearch] = useState('')
   const [gatewaySearch, setGatewaySearch] = useState('')
 
-  const region = 'ap-southeast-1'
-
-  // Comprehensive Interface Services organized by AWS console categories
-  const interfaceServicesByCategory = {
-    'Compute': [
-      { arn: `com.amazonaws.${region}.ec2`, name: 'EC2' },
-      { arn: `com.amazonaws.${region}.ec2.api`, name: 'EC2 API' },
-      { arn: `com.amazonaws.${region}.lambda`, name: 'Lambda' },
-    ],
-    'Storage & CDN': [
-      { arn: `com.amazonaws.${region}.s3`, name: 'S3 (Interface)' },
-      { arn: `com.amazonaws.${region}.ebs`, name: 'EBS' },
-      { arn: `com.amazonaws.${region}.efs`, name: 'EFS' },
-    ],
-    'Database': [
-      { arn: `com.amazonaws.${region}.rds`, name: 'RDS' },
-      { arn: `com.amazonaws.${region}.elasticache`, name: 'ElastiCache' },
-      { arn: `com.amazonaws.${region}.redshift`, name: 'Amazon Redshift' },
-      { arn: `com.amazonaws.${region}.redshift-data`, name: 'Redshift Data API' },
-      { arn: `com.amazonaws.${region}.dynamodb`, name: 'DynamoDB (Interface)' },
-      { arn: `com.amazonaws.${region}.qldb`, name: 'QLDB' },
-    ],
-    'Messaging & Streaming': [
-      { arn: `com.amazonaws.${region}.sns`, name: 'SNS' },
-      { arn: `com.amazonaws.${region}.sqs`, name: 'SQS' },
-      { arn: `com.amazonaws.${region}.kinesis-streams`, name: 'Kinesis Data Streams' },
-      { arn: `com.amazonaws.${region}.kinesis-firehose`, name: 'Kinesis Data Firehose' },
-      { arn: `com.amazonaws.${region}.kafka`, name: 'MSK' },
-      { arn: `com.amazonaws.${region}.kafka-cluster`, name: 'MSK Cluster' },
-    ],
-    'Analytics': [
-      { arn: `com.amazonaws.${region}.athena`, name: 'Athena' },
-      { arn: `com.amazonaws.${region}.emr`, name: 'EMR' },
-      { arn: `com.amazonaws.${region}.elasticmapreduce`, name: 'EMR (Legacy)' },
-      { arn: `com.amazonaws.${region}.glue`, name: 'Glue' },
-      { arn: `com.amazonaws.${region}.databrew`, name: 'Glue DataBrew' },
-      { arn: `com.amazonaws.${region}.dataexchange`, name: 'AWS Data Exchange' },
-    ],
-    'Security, Identity & Compliance': [
-      { arn: `com.amazonaws.${region}.kms`, name: 'KMS' },
-      { arn: `com.amazonaws.${region}.sts`, name: 'STS' },
-      { arn: `com.amazonaws.${region}.secretsmanager`, name: 'Secrets Manager' },
-      { arn: `com.amazonaws.${region}.acm-pca`, name: 'ACM PCA' },
-    ],
-    'Management & Governance': [
-      { arn: `com.amazonaws.${region}.ssm`, name: 'Systems Manager' },
-      { arn: `com.amazonaws.${region}.ssmmessages`, name: 'Session Manager' },
-      { arn: `com.amazonaws.${region}.ec2messages`, name: 'EC2 Systems Manager Messages' },
-      { arn: `com.amazonaws.${region}.monitoring`, name: 'CloudWatch' },
-      { arn: `com.amazonaws.${region}.logs`, name: 'CloudWatch Logs' },
-      { arn: `com.amazonaws.${region}.cloudwatch-events`, name: 'EventBridge' },
-      { arn: `com.amazonaws.${region}.events`, name: 'EventBridge (Events)' },
-      { arn: `com.amazonaws.${region}.cloudformation`, name: 'CloudFormation' },
-      { arn: `com.amazonaws.${region}.config`, name: 'Config' },
-      { arn: `com.amazonaws.${region}.backup`, name: 'AWS Backup' },
-      { arn: `com.amazonaws.${region}.appconfig`, name: 'AppConfig' },
-    ],
-    'Developer Tools': [
-      { arn: `com.amazonaws.${region}.codecommit`, name: 'CodeCommit' },
-      { arn: `com.amazonaws.${region}.codecommit.git`, name: 'CodeCommit Git' },
-      { arn: `com.amazonaws.${region}.codepipeline`, name: 'CodePipeline' },
-      { arn: `com.amazonaws.${region}.codebuild`, name: 'CodeBuild' },
-      { arn: `com.amazonaws.${region}.codedeploy`, name: 'CodeDeploy' },
-      { arn: `com.amazonaws.${region}.codestar`, name: 'CodeStar' },
-    ],
-    'Integration & Orchestration': [
-      { arn: `com.amazonaws.${region}.states`, name: 'Step Functions' },
-      { arn: `com.amazonaws.${region}.apicatalog`, name: 'API Gateway' },
-    ],
-    'Machine Learning': [
-      { arn: `com.amazonaws.${region}.sagemaker.api`, name: 'SageMaker API' },
-      { arn: `com.amazonaws.${region}.sagemaker.runtime`, name: 'SageMaker Runtime' },
-      { arn: `com.amazonaws.${region}.comprehend`, name: 'Comprehend' },
-      { arn: `com.amazonaws.${region}.polly`, name: 'Polly' },
-      { arn: `com.amazonaws.${region}.rekognition`, name: 'Rekognition' },
-      { arn: `com.amazonaws.${region}.textract`, name: 'Textract' },
-    ],
-    'IoT & Edge': [
-      { arn: `com.amazonaws.${region}.iot-core`, name: 'IoT Core' },
-      { arn: `com.amazonaws.${region}.iot-jobs`, name: 'IoT Jobs' },
-      { arn: `com.amazonaws.${region}.iot-data`, name: 'IoT Data Plane' },
-      { arn: `com.amazonaws.${region}.greengrass`, name: 'IoT Greengrass' },
-      { arn: `com.amazonaws.${region}.greengrass-connectors`, name: 'Greengrass Connectors' },
-    ],
-    'Media Services': [
-      { arn: `com.amazonaws.${region}.mediatailor`, name: 'Elemental MediaTailor' },
-      { arn: `com.amazonaws.${region}.transfer`, name: 'Transfer Family' },
-    ],
-    'Migration & Disaster Recovery': [
-      { arn: `com.amazonaws.${region}.datasync`, name: 'DataSync' },
-    ],
-    'Network & Content Delivery': [
-      { arn: `com.amazonaws.${region}.elasticloadbalancing`, name: 'Elastic Load Balancing' },
-      { arn: `com.amazonaws.${region}.route53`, name: 'Route 53' },
-      { arn: `com.amazonaws.${region}.appsync`, name: 'AppSync' },
-    ],
-    'Container Services': [
-      { arn: `com.amazonaws.${region}.ecr.api`, name: 'ECR API' },
-      { arn: `com.amazonaws.${region}.ecr.dkr`, name: 'ECR DKR' },
-      { arn: `com.amazonaws.${region}.ecs-telemetry`, name: 'ECS Telemetry' },
-    ],
-    'Application Services': [
-      { arn: `com.amazonaws.${region}.elasticbeanstalk`, name: 'Elastic Beanstalk' },
-      { arn: `com.amazonaws.${region}.elasticbeanstalk-health`, name: 'Elastic Beanstalk Health' },
-      { arn: `com.amazonaws.${region}.autoscaling`, name: 'Auto Scaling' },
-      { arn: `com.amazonaws.${region}.autoscaling-plans`, name: 'Auto Scaling Plans' },
-      { arn: `com.amazonaws.${region}.servicecatalog`, name: 'Service Catalog' },
-    ],
-    'Frontend Web & Mobile': [
-      { arn: `com.amazonaws.${region}.ampl`, name: 'AWS Amplify' },
-    ],
-  }
+  const [catalog, setCatalog] = useState({ interface: [], gateway: [] })
+  const [catalogStatus, setCatalogStatus] = useState('loading')
+
+  // Load only this region's catalog; fall back to the built-in list if the API is unreachable
+  useEffect(() => {
+    let cancelled = false
+    setCatalogStatus('loading')
+    apiFetch(`/api/services?region=${encodeURIComponent(region)}`)
+      .then(response => (response.ok ? response.json() : Promise.reject(new Error(`HTTP ${response.status}`))))
+      .then(data => {
+        if (cancelled) return
+        setCatalog({
+          interface: data.services.filter(s => s.endpoint_types.includes('Interface')),
+          gateway: data.services.filter(s => s.endpoint_types.includes('Gateway')),
+        })
+        setCatalogStatus('ready')
+      })
+      .catch(() => {
+        if (cancelled) return
+        setCatalog(fallbackCatalog(region))
+        setCatalogStatus('fallback')
+      })
+    return () => { cancelled = true }
+  }, [region])
+
+  // Interface services grouped by AWS console categories
+  const interfaceServicesByCategory = groupInterfaceServices(catalog.interface, region)
 
   // Gateway Services
-  const gatewayServices = [
-    { arn: `com.amazonaws.${region}.s3`, name: 'Amazon S3' },
-    { arn: `com.amazonaws.${region}.dynamodb`, name: 'Amazon DynamoDB' },
-  ]
+  const gatewayServices = gatewayServiceList(catalog.gateway, region)
 
   // Flatten interface services for easier lookup
   const allInterfaceServices = Object.values(interfaceServicesByCategory).flat()
@@ -350,6 +264,18 @@ function EndpointSelector({ onNext, isLocked = false, onInputAttempt = () => {}
             <p>Choose the services you want to create endpoints for</p>
           </div>
 
+          {catalogStatus === 'loading' && (
+            <p style={{ color: '#666', marginBottom: '1rem' }}>Loading services available in {region}...</p>
+          )}
+          {catalogStatus === 'fallback' && (
+            <div className="alert alert-error">
+              <div className="alert-icon">!</div>
+              <div className="alert-content">
+                Could not load the service catalog for {region}; showing the built-in list, which may include services not offered there.
+              </div>
+            </div>
+          )}
+
           {/* Interface Services */}
           {hasInterface && (
             <div className="ep-config-group">
@@ -448,7 +374,7 @@ function EndpointSelector({ onNext, isLocked = false, onInputAttempt = () => {}
                         <div style={{ padding: '1rem', backgroundColor: '#fff', borderTop: '1px solid #e0e0e0' }}>
                           <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(280px, 1fr))', gap: '1rem' }}>
                             {(interfaceSearch ? filteredServices : services).map(service => (
-                              <label key={service.arn} className="service-checkbox-label">
+                              <label key={service.arn} className="service-checkbox-label" title={service.zones?.length ? `Available in ${service.zones.join(', ')}` : undefined}>
                                 <input
                                   type="checkbox"
                                   checked={selectedServices.interface.includes(service.arn)}
@@ -545,7 +471,7 @@ function EndpointSelector({ onNext, isLocked = false, onInputAttempt = () => {}
                 {gatewayServices
                   .filter(service => service.name.toLowerCase().includes(gatewaySearch.toLowerCase()))
                   .map(service => (
-                    <label key={service.arn} className="service-checkbox-label">
+                    <label key={service.arn} className="service-checkbox-label" title={service.zones?.length ? `Available in ${service.zones.join(', ')}` : undefined}>
                       <input
                         type="checkbox"
                         checked={selectedServices.gateway.includes(service.arn)}
@@ -1,20 +1,69 @@
 import { useState } from 'react'
+import { apiFetch } from '../api'
+
+// Keep at most this many output lines in the live log
+const MAX_PROGRESS_LINES = 500
+
+// Parse a fetch() response body as Server-Sent Events, calling onEvent(event, data) per message
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+
+      let event = 'message'
+      let data = ''
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+      }
+      onEvent(event, data ? JSON.parse(data) : {})
+    }
+  }
+}
 
 function ReviewPage({ formData, onSubmit, isLocked = false }) {
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
   const [success, setSuccess] = useState('')
   const [psContent, setPsContent] = useState('')
+  const [scriptId, setScriptId] = useState('')
   const [showCommand, setShowCommand] = useState(false)
+  const [progress, setProgress] = useState([])
+  const [serviceCounts, setServiceCounts] = useState({ ok: 0, failed: 0, skipped: 0 })
 
   const handleGenerate = async () => {
     setLoading(true)
     setError('')
     setSuccess('')
     setPsContent('')
+    setScriptId('')
 
     try {
-      const response = await fetch('/api/generate', {
+      // Pre-flight: catch services not offered in the region or in the subnets' AZs before any AWS writes.
+      // Only a 422 blocks generation; if the check itself cannot run, generate as before.
+      const preflight = await apiFetch('/api/validate?check_availability=true', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(formData),
+      })
+      if (preflight.status === 422) {
+        const preflightData = await preflight.json()
+        if (preflightData.detail?.errors) {
+          throw new Error(`Availability check failed:\n${preflightData.detail.errors.join('\n')}`)
+        }
+      }
+
+      const response = await apiFetch('/api/generate', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(formData),
@@ -40,6 +89,7 @@ function ReviewPage({ formData, onSubmit, isLocked = false }) {
 
       const data = await response.json()
       setPsContent(data.ps1_content)
+      setScriptId(data.script_id || '')
       setSuccess('Script generated successfully!')
     } catch (err) {
       setError(err.message)
@@ -57,14 +107,22 @@ function ReviewPage({ formData, onSubmit, isLocked = false }) {
     setLoading(true)
     setError('')
     setSuccess('')
+    setProgress([])
+    setServiceCounts({ ok: 0, failed: 0, skipped: 0 })
 
     try {
-      const response = await fetch('/api/execute', {
+      const startStream = (body) => apiFetch('/api/execute/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ ps1_content: psContent }),
+        body: JSON.stringify(body),
       })
 
+      // Send the cached script's ID instead of the whole script; re-upload it only if the cache dropped it
+      let response = await startStream(scriptId ? { script_id: scriptId } : { ps1_content: psContent })
+      if (response.status === 404 && scriptId) {
+        response = await startStream({ ps1_content: psContent })
+      }
+
       if (!response.ok) {
         const errorData = await response.json()
         
@@ -99,12 +157,29 @@ function ReviewPage({ formData, onSubmit, isLocked = false }) {
         throw new Error(errorMessage)
       }
 
-      const data = await response.json()
-      
-      if (data.success) {
+      let exitCode = null
+      let streamError = null
+
+      await readEventStream(response, (event, data) => {
+        if (event === 'line' || event === 'service') {
+          setProgress((lines) => [...lines, { event, ...data }].slice(-MAX_PROGRESS_LINES))
+          if (event === 'service') {
+            setServiceCounts((counts) => ({ ...counts, [data.status]: counts[data.status] + 1 }))
+          }
+        } else if (event === 'exit') {
+          exitCode = data.exit_code
+        } else if (event === 'error') {
+          streamError = data.error
+        }
+      })
+
+      if (streamError) {
+        throw new Error(streamError)
+      }
+      if (exitCode === 0) {
         setSuccess('✓ Endpoint created successfully!')
       } else {
-        throw new Error('Execution returned an error')
+        throw new Error(`PowerShell script execution failed\n\nExit Code: ${exitCode}`)
       }
     } catch (err) {
       setError(err.message)
@@ -202,6 +277,23 @@ function ReviewPage({ formData, onSubmit, isLocked = false }) {
         </div>
       )}
 
+      {/* Live Execution Output */}
+      {progress.length > 0 && (
+        <div className="bg-gray-900 text-gray-200 p-4 rounded-lg font-mono text-xs overflow-x-auto max-h-64 overflow-y-auto">
+          <div className="mb-2 text-gray-400">
+            {loading ? 'Running...' : 'Finished'} — {serviceCounts.ok} succeeded, {serviceCounts.skipped} already existed, {serviceCounts.failed} failed
+          </div>
+          {progress.map((entry, idx) => (
+            <div
+              key={idx}
+              className={entry.status === 'ok' ? 'text-green-400' : entry.status === 'failed' ? 'text-red-400' : entry.status === 'skipped' ? 'text-yellow-400' : ''}
+            >
+              {entry.line}
+            </div>
+          ))}
+        </div>
+      )}
+
       {/* PowerShell Script Display */}
       {psContent && (
         <div className="bg-gray-900 text-green-400 p-4 rounded-lg font-mono text-xs overflow-x-auto max-h-64">
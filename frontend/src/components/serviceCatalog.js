@@ -0,0 +1,157 @@
+// Display names and console categories for well-known endpoint services, keyed by
+// short name. Which services exist in a region comes from /api/services; anything
+// not listed here is shown under "Other" with its short name.
+export const SERVICE_CATEGORIES = {
+  'Compute': {
+    ec2: 'EC2',
+    'ec2.api': 'EC2 API',
+    lambda: 'Lambda',
+  },
+  'Storage & CDN': {
+    s3: 'S3 (Interface)',
+    ebs: 'EBS',
+    efs: 'EFS',
+  },
+  'Database': {
+    rds: 'RDS',
+    elasticache: 'ElastiCache',
+    redshift: 'Amazon Redshift',
+    'redshift-data': 'Redshift Data API',
+    dynamodb: 'DynamoDB (Interface)',
+    qldb: 'QLDB',
+  },
+  'Messaging & Streaming': {
+    sns: 'SNS',
+    sqs: 'SQS',
+    'kinesis-streams': 'Kinesis Data Streams',
+    'kinesis-firehose': 'Kinesis Data Firehose',
+    kafka: 'MSK',
+    'kafka-cluster': 'MSK Cluster',
+  },
+  'Analytics': {
+    athena: 'Athena',
+    emr: 'EMR',
+    elasticmapreduce: 'EMR (Legacy)',
+    glue: 'Glue',
+    databrew: 'Glue DataBrew',
+    dataexchange: 'AWS Data Exchange',
+  },
+  'Security, Identity & Compliance': {
+    kms: 'KMS',
+    sts: 'STS',
+    secretsmanager: 'Secrets Manager',
+    'acm-pca': 'ACM PCA',
+  },
+  'Management & Governance': {
+    ssm: 'Systems Manager',
+    ssmmessages: 'Session Manager',
+    ec2messages: 'EC2 Systems Manager Messages',
+    monitoring: 'CloudWatch',
+    logs: 'CloudWatch Logs',
+    'cloudwatch-events': 'EventBridge',
+    events: 'EventBridge (Events)',
+    cloudformation: 'CloudFormation',
+    config: 'Config',
+    backup: 'AWS Backup',
+    appconfig: 'AppConfig',
+  },
+  'Developer Tools': {
+    codecommit: 'CodeCommit',
+    'codecommit.git': 'CodeCommit Git',
+    codepipeline: 'CodePipeline',
+    codebuild: 'CodeBuild',
+    codedeploy: 'CodeDeploy',
+    codestar: 'CodeStar',
+  },
+  'Integration & Orchestration': {
+    states: 'Step Functions',
+    apicatalog: 'API Gateway',
+  },
+  'Machine Learning': {
+    'sagemaker.api': 'SageMaker API',
+    'sagemaker.runtime': 'SageMaker Runtime',
+    comprehend: 'Comprehend',
+    polly: 'Polly',
+    rekognition: 'Rekognition',
+    textract: 'Textract',
+  },
+  'IoT & Edge': {
+    'iot-core': 'IoT Core',
+    'iot-jobs': 'IoT Jobs',
+    'iot-data': 'IoT Data Plane',
+    greengrass: 'IoT Greengrass',
+    'greengrass-connectors': 'Greengrass Connectors',
+  },
+  'Media Services': {
+    mediatailor: 'Elemental MediaTailor',
+    transfer: 'Transfer Family',
+  },
+  'Migration & Disaster Recovery': {
+    datasync: 'DataSync',
+  },
+  'Network & Content Delivery': {
+    elasticloadbalancing: 'Elastic Load Balancing',
+    route53: 'Route 53',
+    appsync: 'AppSync',
+  },
+  'Container Services': {
+    'ecr.api': 'ECR API',
+    'ecr.dkr': 'ECR DKR',
+    'ecs-telemetry': 'ECS Telemetry',
+  },
+  'Application Services': {
+    elasticbeanstalk: 'Elastic Beanstalk',
+    'elasticbeanstalk-health': 'Elastic Beanstalk Health',
+    autoscaling: 'Auto Scaling',
+    'autoscaling-plans': 'Auto Scaling Plans',
+    servicecatalog: 'Service Catalog',
+  },
+  'Frontend Web & Mobile': {
+    ampl: 'AWS Amplify',
+  },
+}
+
+export const GATEWAY_LABELS = {
+  s3: 'Amazon S3',
+  dynamodb: 'Amazon DynamoDB',
+}
+
+// Catalog key for a full service name: "com.amazonaws.<region>.ecr.api" -> "ecr.api"
+const catalogKey = (serviceName, region) => {
+  const prefix = `com.amazonaws.${region}.`
+  return serviceName.startsWith(prefix) ? serviceName.slice(prefix.length) : serviceName
+}
+
+const findLabel = (key) => {
+  for (const [category, labels] of Object.entries(SERVICE_CATEGORIES)) {
+    if (labels[key]) return { category, name: labels[key] }
+  }
+  return { category: 'Other', name: key }
+}
+
+// Group /api/services entries into { category: [{ arn, name, zones }] }, in console order
+export function groupInterfaceServices(services, region) {
+  const groups = Object.fromEntries(Object.keys(SERVICE_CATEGORIES).map(category => [category, []]))
+  groups.Other = []
+  for (const service of services) {
+    const { category, name } = findLabel(catalogKey(service.service_name, region))
+    groups[category].push({ arn: service.service_name, name, zones: service.availability_zones })
+  }
+  return Object.fromEntries(Object.entries(groups).filter(([, entries]) => entries.length > 0))
+}
+
+export function gatewayServiceList(services, region) {
+  return services.map(service => {
+    const key = catalogKey(service.service_name, region)
+    return { arn: service.service_name, name: GATEWAY_LABELS[key] || key, zones: service.availability_zones }
+  })
+}
+
+// Catalog shaped like /api/services, built from the labels above when the API is unreachable
+export function fallbackCatalog(region) {
+  const interfaces = Object.values(SERVICE_CATEGORIES).flatMap(labels => Object.keys(labels))
+  return {
+    interface: interfaces.map(key => ({ service_name: `com.amazonaws.${region}.${key}`, availability_zones: [] })),
+    gateway: Object.keys(GATEWAY_LABELS).map(key => ({ service_name: `com.amazonaws.${region}.${key}`, availability_zones: [] })),
+  }
+}